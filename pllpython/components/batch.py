@@ -0,0 +1,276 @@
+"""Batched PLL Engine
+
+This module provides a batched closed-loop engine that simulates many PLL
+configurations in a single time-step loop, used by `Sweeper.start_batch`.
+
+Every component state that the per-object simulation keeps as a scalar
+(`Vco.last`, `Lpd.ff_up_q`/`ff_down_q`, the `LoopFilter` history,
+`Divider.transition_count`, ...) becomes a NumPy vector over the B
+configurations, and each sample advances all B loops with a fixed number of
+NumPy operations. The Python overhead of a B point sweep is therefore about the
+same as the one of a single run.
+
+The state and parameters are read with the same packing helpers as the fused
+engine (see `pllpython.components.engine`). For noise-free settings every
+configuration follows the same floating point operations as the component
+classes. The phase noise draws of all the configurations come from the noise
+source of the first one, so noisy runs are reproducible for a given
+`settings.seed` but only statistically equivalent to the per-object path. The
+flicker noise of every configuration comes from its own `FlickerNoise`, whose
+values are correlated from one edge to the next.
+"""
+import numpy as np
+from .lpd import Lpd
+from .vco import Vco
+from .lf import LoopFilter
+from .divider import Divider
+from ..utils.noise import NoiseSource
+from .engine import (_pack_params, _pack_state, _unpack_state,
+                     P_VSS, P_VDD, P_CLK_KVT, P_VCO_KVT, P_LF_MODE, P_LF_ALPHA,
+                     P_LF_BETA, P_LF_B0, P_LF_A2, P_LF_PULL_UP, P_LF_PULL_DOWN,
+                     P_LF_SAT, P_LF_MIN, P_LF_MAX, P_DIV_LOWER, P_DIV_UPPER,
+                     P_CLK_FLICKER, P_VCO_FLICKER,
+                     S_CLK_LAST, S_VCO_LAST, S_LPD_UP, S_LPD_DOWN,
+                     S_LPD_LAST_UP, S_LPD_LAST_DOWN, S_LF_OUT, S_LF_X1,
+                     S_LF_X2, S_LF_Y1, S_LF_Y2, S_DIV_COUNT, S_DIV_TON,
+                     S_DIV_LAST, S_DIV_OUT)
+
+# pylint: disable=R0914 disable=R0915
+
+TRACES = ('clk', 'div', 'lpd_a', 'lpd_b', 'lf', 'vco')
+
+
+class _Oscillator:
+    """Vectorized state of B CLKs or B VCOs."""
+
+    def __init__(self, params: np.ndarray, state: np.ndarray, clk: bool,
+                 noise: NoiseSource, flicker: list):
+        p_offset = P_CLK_KVT if clk else P_VCO_KVT
+        s_offset = S_CLK_LAST if clk else S_VCO_LAST
+        self.s_offset = s_offset
+        (self.kvt, self.ang, self.kvco, self.fo, self.h0, self.n1,
+         self.sigma_w, self.sigma_n) = (params[:, p_offset + i].copy()
+                                        for i in range(8))
+        (self.last, self.last_output, self.white, self.low,
+         self.zi) = (state[:, s_offset + i].copy() for i in range(5))
+        self.white_active = self.h0 != 0
+        self.low_active = self.n1 != 0
+        self.noisy = bool(np.any(self.white_active | self.low_active))
+        self.noise = noise if self.noisy else None
+        self.flicker = flicker
+        self.flickering = bool(np.any(params[:, P_CLK_FLICKER if clk else P_VCO_FLICKER]))
+
+    def redraw(self, changed: np.ndarray, control):
+        """Redraws the noise of the oscillators whose output changed."""
+        for active, white in ((self.white_active, True),
+                              (self.low_active, False)):
+            mask = changed & active
+            count = int(np.count_nonzero(mask))
+            if count == 0:
+                continue
+            target = self.kvco[mask] * (control if np.isscalar(control)
+                                        else control[mask]) + self.fo[mask]
+            draws = self.noise.normals(count)
+            if white:
+                if self.flickering:
+                    draws = draws + [0.0 if self.flicker[i] is None
+                                     else self.flicker[i].normal()
+                                     for i in np.flatnonzero(mask)]
+                self.white[mask] = (draws * self.sigma_w[mask]) * \
+                    np.sqrt(target)
+            else:
+                filtered = self.low[mask] + self.zi[mask]
+                zi = -filtered
+                filtered = (draws * self.sigma_n[mask]) * \
+                    np.sqrt(target) + zi
+                self.zi[mask] = -filtered
+                self.low[mask] = filtered
+
+    def store(self, state: np.ndarray):
+        """Writes the oscillator state back into the packed state matrix."""
+        for i, values in enumerate((self.last, self.last_output, self.white,
+                                    self.low, self.zi)):
+            state[:, self.s_offset + i] = values
+
+
+def build_components(settings) -> dict:
+    """
+    Builds a fresh set of PLL components from `settings`.
+
+    The CLK and the VCO get independent noise sources spawned from
+    `settings.seed`, or from fresh entropy when it is `None`.
+
+    :param settings: Simulation settings.
+
+    **Returns**:
+        - dict: The components keyed by `clk`, `lpd`, `lf`, `vco` and `div`.
+    """
+    components = {'clk': Vco(settings=settings, clk=True),
+                  'lpd': Lpd(settings=settings),
+                  'lf': LoopFilter(settings=settings),
+                  'vco': Vco(settings=settings),
+                  'div': Divider(settings=settings)}
+    for component, noise in zip((components['clk'], components['vco']),
+                                NoiseSource(settings.seed).spawn(2)):
+        component.seed(noise)
+    return components
+
+
+def run_batch(components_list: list, sample_count: int,
+              record: tuple = ('lf', 'vco'), progress=None) -> tuple:
+    """
+    Runs B closed loops side by side, one per entry of `components_list`.
+
+    The components must already be built. Their internal state is read before
+    the run and written back afterwards, like with `run_fused`.
+
+    :param components_list: A list of B `Pll.components` dictionaries.
+    :param sample_count: Number of samples to simulate.
+    :param record: Nodes to record, any of `clk`, `div`, `lpd_a`, `lpd_b`,
+        `lf` and `vco`. Each recorded node costs B x `sample_count` samples.
+    :param progress: Optional `tqdm` progress bar updated every sample.
+
+    :raises ValueError: If `components_list` is empty or `record` names an
+        unknown node.
+
+    **Returns**:
+        - tuple: A dictionary of (B, `sample_count`) arrays keyed by the
+          recorded node names, and the array of the B last divider outputs.
+    """
+    if len(components_list) == 0:
+        raise ValueError('At least one configuration is needed')
+    unknown = set(record) - set(TRACES)
+    if unknown:
+        raise ValueError(
+            f'Unknown nodes {sorted(unknown)}, available nodes are {TRACES}')
+
+    params = np.stack([_pack_params(components)
+                       for components in components_list])
+    state = np.stack([_pack_state(components, 0)
+                      for components in components_list])
+    batch = len(components_list)
+
+    low = params[:, P_VSS] + (params[:, P_VDD] - params[:, P_VSS]) * 0
+    high = params[:, P_VSS] + (params[:, P_VDD] - params[:, P_VSS]) * 1
+    clk = _Oscillator(params, state, clk=True,
+                      noise=components_list[0]['clk'].noise,
+                      flicker=[components['clk'].flicker
+                               for components in components_list])
+    vco = _Oscillator(params, state, clk=False,
+                      noise=components_list[0]['vco'].noise,
+                      flicker=[components['vco'].flicker
+                               for components in components_list])
+    clk_increment = 1 * clk.kvt + clk.ang
+
+    up_q = state[:, S_LPD_UP] != 0
+    down_q = state[:, S_LPD_DOWN] != 0
+    last_up = state[:, S_LPD_LAST_UP].copy()
+    last_down = state[:, S_LPD_LAST_DOWN].copy()
+    pull_up = params[:, P_LF_PULL_UP].copy()
+    pull_down = params[:, P_LF_PULL_DOWN].copy()
+
+    biquad = params[:, P_LF_MODE] != 0
+    mixed = bool(np.any(biquad)) and not bool(np.all(biquad))
+    biquad_only = bool(np.all(biquad))
+    alpha, beta = params[:, P_LF_ALPHA].copy(), params[:, P_LF_BETA].copy()
+    b0, b1, b2, a0, a1, a2 = (params[:, i].copy()
+                              for i in range(P_LF_B0, P_LF_A2 + 1))
+    a0[~biquad] = 1
+    saturated = params[:, P_LF_SAT] != 0
+    min_sat = np.where(saturated, params[:, P_LF_MIN], -np.inf)
+    max_sat = np.where(saturated, params[:, P_LF_MAX], np.inf)
+    saturation = bool(np.any(saturated))
+    lf_value = state[:, S_LF_OUT].copy()
+    x1, x2, y1, y2 = (state[:, i].copy() for i in range(S_LF_X1, S_LF_Y2 + 1))
+
+    lower_limit = params[:, P_DIV_LOWER].copy()
+    upper_limit = params[:, P_DIV_UPPER].copy()
+    count = state[:, S_DIV_COUNT].copy()
+    ton = state[:, S_DIV_TON] != 0
+    div_last = state[:, S_DIV_LAST].copy()
+    feedback = state[:, S_DIV_OUT].copy()
+
+    traces = {key: np.empty((sample_count, batch),
+                            dtype=np.uint8 if key in ('lpd_a', 'lpd_b') else float)
+              for key in record}
+    recorders = [(TRACES.index(key), trace) for key, trace in traces.items()]
+
+    for index in range(sample_count):
+        # CLK (Vco with a constant input of 1)
+        clk.last += clk_increment
+        phase = clk.last + clk.white + clk.low if clk.noisy else clk.last
+        clk_value = np.where(np.cos(phase) < 0, high, low)
+        if clk.noisy:
+            clk.redraw(clk.last_output != clk_value, 1)
+        clk.last_output = clk_value
+
+        # LPD
+        edge_a = (clk_value == 1) & (last_up == 0)
+        edge_b = (feedback == 1) & (last_down == 0)
+        last_up = clk_value
+        last_down = feedback
+        reset = up_q & down_q
+        up_q = (up_q | edge_a) & ~reset
+        down_q = (down_q | edge_b) & ~reset
+
+        # Loop filter
+        net_current = up_q * pull_up + down_q * pull_down
+        if biquad_only or mixed:
+            filtered = (b0 * net_current + b1 * x1 + b2 *
+                        x2 - a1 * y1 - a2 * y2) / a0
+            x2 = x1
+            x1 = net_current
+        if not biquad_only:
+            first_order = alpha * lf_value + beta * net_current
+        if mixed:
+            lf_value = np.where(biquad, filtered, first_order)
+        else:
+            lf_value = filtered if biquad_only else first_order
+        if saturation:
+            lf_value = np.minimum(np.maximum(lf_value, min_sat), max_sat)
+        if biquad_only or mixed:
+            y2 = y1
+            y1 = lf_value
+
+        # VCO
+        vco.last += lf_value * vco.kvt + vco.ang
+        phase = vco.last + vco.white + vco.low if vco.noisy else vco.last
+        vco_value = np.where(np.cos(phase) < 0, high, low)
+        if vco.noisy:
+            vco.redraw(vco.last_output != vco_value, lf_value)
+        vco.last_output = vco_value
+
+        # Divider
+        feedback = np.where(ton, high, low)
+        transition = ((div_last == high) & (vco_value == low)) | \
+            ((div_last == low) & (vco_value == high))
+        at_limit = transition & ((count == lower_limit) |
+                                 (count == upper_limit))
+        count = np.where(transition & (count == upper_limit), 0, count +
+                         transition)
+        ton = ton ^ at_limit
+        div_last = vco_value
+
+        nodes = (clk_value, feedback, up_q, down_q, lf_value, vco_value)
+        for position, trace in recorders:
+            trace[index] = nodes[position]
+        if progress is not None:
+            progress.update(1)
+
+    clk.store(state)
+    vco.store(state)
+    state[:, S_LPD_UP] = up_q
+    state[:, S_LPD_DOWN] = down_q
+    state[:, S_LPD_LAST_UP] = last_up
+    state[:, S_LPD_LAST_DOWN] = last_down
+    state[:, S_LF_OUT] = lf_value
+    for offset, values in ((S_LF_X1, x1), (S_LF_X2, x2),
+                           (S_LF_Y1, y1), (S_LF_Y2, y2)):
+        state[biquad, offset] = values[biquad]
+    state[:, S_DIV_COUNT] = count
+    state[:, S_DIV_TON] = ton
+    state[:, S_DIV_LAST] = div_last
+    state[:, S_DIV_OUT] = feedback
+    for components, row in zip(components_list, state):
+        _unpack_state(components, row)
+    return {key: trace.T for key, trace in traces.items()}, feedback
@@ -13,7 +13,7 @@ Attributes:
     - `vss` (float): The low voltage output level.
     - `upper_limit` (int): The upper transition count limit (`2*n - 1`).
     - `lower_limit` (int): The lower transition count limit (`n - 1`).
-    - `io` (dict): Input and output signal buffers, where keys are 'input' and 'output' and values are deques of signal values.
+    - `io` (dict): Input and output signal buffers, where keys are 'input' and 'output' and values are trace buffers of signal values.
     - `transition_count` (int): The current transition count.
     - `ton` (bool): The state of the output signal (`True` for high, `False` for low).
     - `last_sample` (float): The last value of the input sample for edge detection.
@@ -25,11 +25,13 @@ Methods:
     - `_process(self, current_sample: float)`: Processes the current input sample and generates 
       the output signal without monitoring.
     - `start(self, input_array: list[float] | ndarray)`: Starts the divider processing, processing the entire input array.
+    - `divide_edges(self, edge_indices: ndarray)`: Divides precomputed input transition indices.
     - `unit_test(self)`: Runs the unit test for the Divider using pytest.
 """
 import os
-from collections import deque
-import pytest
+import numpy as np
+from ..utils.trace import TraceBuffer
+from ..utils.edges import EdgeTrace
 # pylint: disable=W1203
 
 
@@ -87,7 +89,9 @@ class Divider:
         self.upper_limit: float = self.n * 2 - 1
         self.lower_limit: float = self.n - 1
 
-        self.io = {'input': deque([]), 'output': deque([])}
+        levels = (settings.vss, settings.vdd)
+        self.io = {'input': TraceBuffer.for_settings(settings, levels=levels),
+                   'output': TraceBuffer.for_settings(settings, levels=levels)}
 
         self.transition_count: int = 0
         self.ton: bool = False
@@ -186,23 +190,159 @@ class Divider:
 
         return result
 
+    def update_settings(self, settings):
+        """
+        Re-derives the divider parameters from `settings`.
+
+        The internal state returned by `get_state` and the io buffers are
+        kept, so a running simulation continues with the new parameters.
+
+        :param settings: The new configuration object.
+        """
+        state = self.get_state()
+        io = self.io
+        self.__init__(settings)
+        self.set_state(state)
+        self.io = io
+
+    def get_state(self) -> dict:
+        """
+        Returns the internal state of the divider.
+
+        **Returns**:
+            - dict: The transition count, output state and last input sample.
+        """
+        return {'transition_count': self.transition_count,
+                'ton': self.ton,
+                'last_sample': self.last_sample}
+
+    def set_state(self, state: dict):
+        """
+        Restores an internal state returned by `get_state`.
+
+        :param state: The state to restore.
+        """
+        self.transition_count = int(state['transition_count'])
+        self.ton = bool(state['ton'])
+        self.last_sample = float(state['last_sample'])
+
+    def _toggles(self, transitions: np.ndarray) -> np.ndarray:
+        """
+        Counts the output toggles caused by consecutive input transitions.
+
+        The transition counter wraps modulo `2*n` and the output toggles on
+        the transitions that bring it to a multiple of `n`, so the number of
+        toggles after `k` transitions is `(count + k) // n - count // n`.
+
+        :param transitions: Running number of transitions, starting from the
+            current state.
+
+        **Returns**:
+            - np.ndarray: Running number of toggles.
+        """
+        count = self.transition_count
+        if count > self.upper_limit:
+            # Out of range counts are never reset by `_process`.
+            return np.zeros_like(transitions)
+        n = int(self.n)
+        return (count + transitions) // n - count // n
+
+    def _advance(self, transitions: int, toggles: int):
+        """Moves the counter and the output state by whole transitions."""
+        if self.transition_count > self.upper_limit:
+            self.transition_count += transitions
+        else:
+            self.transition_count = int(
+                (self.transition_count + transitions) % (2 * int(self.n)))
+        self.ton = bool(self.ton ^ (toggles & 1))
+
     def start(self, input_array: list[float]):
         """
         Start the divider processing on an input array.
 
-        This method processes the entire input array, calling `_process` for each 
-        individual sample and storing the output in the `io` buffer.
+        The output only depends on the running number of vdd/vss transitions
+        of the input, so the transitions are detected with a NumPy mask and
+        accumulated with `np.cumsum`, and the output level of every sample is
+        derived in closed form. The output is identical to calling `_process`
+        on every sample: it changes one sample after a toggling transition.
 
-        It places the output directly into the io['output'].
+        It places the output directly into the io['output']. If the input is an
+        `EdgeTrace` its edges are divided with `divide_edges` and the output is
+        stored as an `EdgeTrace` too.
 
-        :param input_array: A list or np.array of input signal values.
+        :param input_array: A list or np.array of input signal values, or an
+            `EdgeTrace`.
 
         :return: None
         """
-        self.io['output'] = deque([], maxlen=self.sample_count)
-        self.io['input'] = input_array
-        for sample in input_array:
-            self.io['output'].append(self._process(current_sample=sample))
+        if isinstance(input_array, EdgeTrace):
+            self._start_edges(input_array)
+            return
+        self.io['input'] = TraceBuffer.from_array(input_array)
+        samples = np.asarray(input_array)
+        if not len(samples):
+            self.io['output'] = TraceBuffer(0, ring=True)
+            return
+        previous = np.concatenate(([self.last_sample], samples[:-1]))
+        is_transition = (((previous == self.vdd) & (samples == self.vss)) |
+                         ((previous == self.vss) & (samples == self.vdd)))
+        # Transitions strictly before every sample set its output level.
+        transitions = np.cumsum(is_transition) - is_transition
+        toggles = self._toggles(transitions)
+        ton = (toggles & 1).astype(bool) ^ self.ton
+        self.io['output'] = TraceBuffer.from_array(
+            np.where(ton, self.vdd, self.vss))
+
+        total = int(transitions[-1] + is_transition[-1])
+        self._advance(total, int(self._toggles(np.array([total]))[0]))
+        self.last_sample = float(samples[-1])
+
+    def _start_edges(self, input_trace: EdgeTrace):
+        """
+        Runs `start` on an edge trace, see `EdgeTrace`.
+
+        :param input_trace: The input signal.
+        """
+        self.io['input'] = input_trace
+        count = len(input_trace)
+        edges = input_trace.edges
+        if count:
+            # The first sample is a transition from the last input of the
+            # previous call.
+            first = input_trace[0]
+            if (self.last_sample == self.vdd and first == self.vss) or \
+                    (self.last_sample == self.vss and first == self.vdd):
+                edges = np.concatenate(([0], edges))
+        ton = self.ton
+        output = self.divide_edges(edges)
+        self.io['output'] = EdgeTrace(output[output < count], count, ton,
+                                      time_step=input_trace.time_step,
+                                      low=self.vss, high=self.vdd)
+        if count:
+            self.last_sample = float(input_trace[-1])
+
+    def divide_edges(self, edge_indices: np.ndarray) -> np.ndarray:
+        """
+        Divides a precomputed array of input transition indices.
+
+        This is the sparse counterpart of `start` for long traces, e.g. the
+        edges of a VCO output found with `np.flatnonzero(np.diff(vco))`: it
+        costs O(number of edges) and never builds a dense output. The
+        transition count and output state are updated; `last_sample` is not,
+        since the input levels are unknown.
+
+        :param edge_indices: Sorted sample indices of the vdd/vss transitions
+            of the input.
+
+        **Returns**:
+            - np.ndarray: Sample indices at which the output changes level,
+              i.e. one sample after every toggling transition.
+        """
+        edge_indices = np.asarray(edge_indices)
+        toggles = self._toggles(np.arange(1, len(edge_indices) + 1))
+        toggling = np.diff(toggles, prepend=0) > 0
+        self._advance(len(edge_indices), int(toggles[-1]) if len(toggles) else 0)
+        return edge_indices[toggling] + 1
 
     def unit_test(self,  test_path):
         """
@@ -215,5 +355,7 @@ class Divider:
         """
         print("Testing Divider")
         if os.path.isfile(path=test_path):
+            # pylint: disable=C0415
+            import pytest
             return pytest.main(["-s", "--durations=0", test_path])
         return f'File {test_path} does not exist'
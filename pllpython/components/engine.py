@@ -0,0 +1,478 @@
+"""Fused PLL Engine
+
+This module provides the fused closed-loop engine used by `Pll.start` and
+`Pll.start_and_monitor` when they are called with `engine='fused'`.
+
+The per-object simulation calls `Vco._process`, `Lpd._process`,
+`LoopFilter._process`, `Vco._process` and `Divider._process` for every sample.
+The fused engine flattens the state of the CLK, LPD, LF, VCO and Divider into
+two float arrays (parameters and state) and advances the whole loop in one typed
+kernel that writes into preallocated NumPy arrays. The kernel is compiled with
+Numba on first use when it is installed and runs as plain Python otherwise.
+Numba itself is only imported then, so importing this module stays cheap.
+
+The kernel performs exactly the same floating point operations, in the same
+order, as the component classes, so both paths produce bit-identical results.
+This includes phase noise: the kernel reads the draws of the CLK and the VCO
+from blocks of their own `NoiseSource` and `FlickerNoise`, and only the draws
+it used are consumed.
+"""
+import math
+from functools import lru_cache
+from importlib.util import find_spec
+import numpy as np
+
+# pylint: disable=R0912 disable=R0914 disable=R0915
+
+# Parameter vector layout.
+P_VSS = 0
+P_VDD = 1
+P_CLK_KVT = 2
+P_CLK_ANG = 3
+P_CLK_KVCO = 4
+P_CLK_FO = 5
+P_CLK_H0 = 6
+P_CLK_N1 = 7
+P_CLK_SIGMA_W = 8
+P_CLK_SIGMA_N = 9
+P_VCO_KVT = 10
+P_VCO_ANG = 11
+P_VCO_KVCO = 12
+P_VCO_FO = 13
+P_VCO_H0 = 14
+P_VCO_N1 = 15
+P_VCO_SIGMA_W = 16
+P_VCO_SIGMA_N = 17
+P_LF_MODE = 18
+P_LF_ALPHA = 19
+P_LF_BETA = 20
+P_LF_B0 = 21
+P_LF_B1 = 22
+P_LF_B2 = 23
+P_LF_A0 = 24
+P_LF_A1 = 25
+P_LF_A2 = 26
+P_LF_PULL_UP = 27
+P_LF_PULL_DOWN = 28
+P_LF_SAT = 29
+P_LF_MIN = 30
+P_LF_MAX = 31
+P_DIV_LOWER = 32
+P_DIV_UPPER = 33
+P_CLK_FLICKER = 34
+P_VCO_FLICKER = 35
+P_SIZE = 36
+
+# State vector layout.
+S_CLK_LAST = 0
+S_CLK_LAST_OUTPUT = 1
+S_CLK_WHITE = 2
+S_CLK_LOW = 3
+S_CLK_ZI = 4
+S_VCO_LAST = 5
+S_VCO_LAST_OUTPUT = 6
+S_VCO_WHITE = 7
+S_VCO_LOW = 8
+S_VCO_ZI = 9
+S_LPD_UP = 10
+S_LPD_DOWN = 11
+S_LPD_LAST_UP = 12
+S_LPD_LAST_DOWN = 13
+S_LF_OUT = 14
+S_LF_X1 = 15
+S_LF_X2 = 16
+S_LF_Y1 = 17
+S_LF_Y2 = 18
+S_DIV_COUNT = 19
+S_DIV_TON = 20
+S_DIV_LAST = 21
+S_DIV_OUT = 22
+S_Z_CLK = 23
+S_Z_VCO = 24
+S_F_CLK = 25
+S_F_VCO = 26
+S_SIZE = 27
+
+
+def _fused_loop(index, stop, params, state, z_clk, z_vco, f_clk, f_vco,
+                clk_out, div_out, lpd_a, lpd_b, lf_out, vco_out, monitor):
+    """
+    Advance the closed loop from sample `index` up to `stop`.
+
+    Every component update mirrors the corresponding `_process` method line by
+    line. The kernel returns early when one of the noise blocks runs out of
+    draws so the caller can refill it.
+
+    :param index: First sample to simulate.
+    :param stop: Sample index at which the simulation stops.
+    :param params: Flattened component parameters (see `P_*`).
+    :param state: Flattened component state (see `S_*`), updated in place.
+    :param z_clk: Standard normal draws for the CLK noise.
+    :param z_vco: Standard normal draws for the VCO noise.
+    :param f_clk: Flicker noise values for the CLK.
+    :param f_vco: Flicker noise values for the VCO.
+    :param monitor: If `True` every node is written, otherwise only `lf_out`
+        and `vco_out`.
+
+    **Returns**:
+        - int: The index of the next sample to simulate.
+    """
+    vss = params[P_VSS]
+    vdd = params[P_VDD]
+    clk_kvt = params[P_CLK_KVT]
+    clk_ang = params[P_CLK_ANG]
+    clk_kvco = params[P_CLK_KVCO]
+    clk_fo = params[P_CLK_FO]
+    clk_h0 = params[P_CLK_H0]
+    clk_n1 = params[P_CLK_N1]
+    clk_sigma_w = params[P_CLK_SIGMA_W]
+    clk_sigma_n = params[P_CLK_SIGMA_N]
+    vco_kvt = params[P_VCO_KVT]
+    vco_ang = params[P_VCO_ANG]
+    vco_kvco = params[P_VCO_KVCO]
+    vco_fo = params[P_VCO_FO]
+    vco_h0 = params[P_VCO_H0]
+    vco_n1 = params[P_VCO_N1]
+    vco_sigma_w = params[P_VCO_SIGMA_W]
+    vco_sigma_n = params[P_VCO_SIGMA_N]
+    clk_flicker = params[P_CLK_FLICKER] != 0
+    vco_flicker = params[P_VCO_FLICKER] != 0
+    lf_mode = params[P_LF_MODE]
+    alpha = params[P_LF_ALPHA]
+    beta = params[P_LF_BETA]
+    b0 = params[P_LF_B0]
+    b1 = params[P_LF_B1]
+    b2 = params[P_LF_B2]
+    a0 = params[P_LF_A0]
+    a1 = params[P_LF_A1]
+    a2 = params[P_LF_A2]
+    pull_up = params[P_LF_PULL_UP]
+    pull_down = params[P_LF_PULL_DOWN]
+    sat = params[P_LF_SAT]
+    min_sat = params[P_LF_MIN]
+    max_sat = params[P_LF_MAX]
+    lower_limit = params[P_DIV_LOWER]
+    upper_limit = params[P_DIV_UPPER]
+
+    clk_last = state[S_CLK_LAST]
+    clk_last_output = state[S_CLK_LAST_OUTPUT]
+    clk_white = state[S_CLK_WHITE]
+    clk_low = state[S_CLK_LOW]
+    clk_zi = state[S_CLK_ZI]
+    vco_last = state[S_VCO_LAST]
+    vco_last_output = state[S_VCO_LAST_OUTPUT]
+    vco_white = state[S_VCO_WHITE]
+    vco_low = state[S_VCO_LOW]
+    vco_zi = state[S_VCO_ZI]
+    up_q = state[S_LPD_UP]
+    down_q = state[S_LPD_DOWN]
+    last_up = state[S_LPD_LAST_UP]
+    last_down = state[S_LPD_LAST_DOWN]
+    lf_value = state[S_LF_OUT]
+    x1 = state[S_LF_X1]
+    x2 = state[S_LF_X2]
+    y1 = state[S_LF_Y1]
+    y2 = state[S_LF_Y2]
+    count = state[S_DIV_COUNT]
+    ton = state[S_DIV_TON]
+    div_last = state[S_DIV_LAST]
+    feedback = state[S_DIV_OUT]
+    zc = int(state[S_Z_CLK])
+    zv = int(state[S_Z_VCO])
+    fc = int(state[S_F_CLK])
+    fv = int(state[S_F_VCO])
+
+    clk_noise = clk_h0 != 0 or clk_n1 != 0
+    vco_noise = vco_h0 != 0 or vco_n1 != 0
+
+    while index < stop:
+        if clk_noise and zc + 2 > z_clk.shape[0]:
+            break
+        if vco_noise and zv + 2 > z_vco.shape[0]:
+            break
+        if clk_flicker and fc + 1 > f_clk.shape[0]:
+            break
+        if vco_flicker and fv + 1 > f_vco.shape[0]:
+            break
+
+        # CLK (Vco with a constant input of 1)
+        clk_last += (1 * clk_kvt + clk_ang)
+        clk_value = vss + (vdd - vss) * \
+            (math.cos(clk_last + clk_white + clk_low) < 0)
+        if clk_last_output != clk_value:
+            target_frequency = (clk_kvco * 1) + clk_fo
+            if clk_h0 != 0:
+                draw = z_clk[zc]
+                zc += 1
+                if clk_flicker:
+                    draw += f_clk[fc]
+                    fc += 1
+                clk_white = (draw * clk_sigma_w) * \
+                    math.sqrt(target_frequency)
+            if clk_n1 != 0:
+                filtered = clk_low + clk_zi
+                clk_zi = -filtered
+                filtered = (z_clk[zc] * clk_sigma_n) * \
+                    math.sqrt(target_frequency) + clk_zi
+                clk_zi = -filtered
+                clk_low = filtered
+                zc += 1
+        clk_last_output = clk_value
+
+        # LPD
+        edge_a = clk_value == 1 and last_up == 0
+        edge_b = feedback == 1 and last_down == 0
+        last_up = clk_value
+        last_down = feedback
+        if up_q != 0 and down_q != 0:
+            up_q = 0.0
+            down_q = 0.0
+        else:
+            if edge_a:
+                up_q = 1.0
+            if edge_b:
+                down_q = 1.0
+
+        # Loop filter
+        net_current = up_q * pull_up + down_q * pull_down
+        if lf_mode == 0:
+            lf_value = alpha * lf_value + beta * net_current
+            if sat != 0:
+                if lf_value < min_sat:
+                    lf_value = min_sat
+                elif lf_value > max_sat:
+                    lf_value = max_sat
+        else:
+            lf_value = (b0 * net_current + b1 * x1 + b2 *
+                        x2 - a1 * y1 - a2 * y2) / a0
+            x2 = x1
+            x1 = net_current
+            if sat != 0:
+                if lf_value < min_sat:
+                    lf_value = min_sat
+                elif lf_value > max_sat:
+                    lf_value = max_sat
+            y2 = y1
+            y1 = lf_value
+
+        # VCO
+        vco_last += (lf_value * vco_kvt + vco_ang)
+        vco_value = vss + (vdd - vss) * \
+            (math.cos(vco_last + vco_white + vco_low) < 0)
+        if vco_last_output != vco_value:
+            target_frequency = (vco_kvco * lf_value) + vco_fo
+            if vco_h0 != 0:
+                draw = z_vco[zv]
+                zv += 1
+                if vco_flicker:
+                    draw += f_vco[fv]
+                    fv += 1
+                vco_white = (draw * vco_sigma_w) * \
+                    math.sqrt(target_frequency)
+            if vco_n1 != 0:
+                filtered = vco_low + vco_zi
+                vco_zi = -filtered
+                filtered = (z_vco[zv] * vco_sigma_n) * \
+                    math.sqrt(target_frequency) + vco_zi
+                vco_zi = -filtered
+                vco_low = filtered
+                zv += 1
+        vco_last_output = vco_value
+
+        # Divider
+        if (div_last == vdd and vco_value == vss) or \
+                (div_last == vss and vco_value == vdd):
+            if count == lower_limit or count == upper_limit:
+                if count == upper_limit:
+                    count = 0.0
+                else:
+                    count += 1
+                ton = 1.0 - ton
+                feedback = vss if ton != 0 else vdd
+            else:
+                count += 1
+                feedback = vdd if ton != 0 else vss
+        else:
+            feedback = vdd if ton != 0 else vss
+        div_last = vco_value
+
+        lf_out[index] = lf_value
+        vco_out[index] = vco_value
+        if monitor:
+            clk_out[index] = clk_value
+            lpd_a[index] = up_q
+            lpd_b[index] = down_q
+            div_out[index] = feedback
+        index += 1
+
+    state[S_CLK_LAST] = clk_last
+    state[S_CLK_LAST_OUTPUT] = clk_last_output
+    state[S_CLK_WHITE] = clk_white
+    state[S_CLK_LOW] = clk_low
+    state[S_CLK_ZI] = clk_zi
+    state[S_VCO_LAST] = vco_last
+    state[S_VCO_LAST_OUTPUT] = vco_last_output
+    state[S_VCO_WHITE] = vco_white
+    state[S_VCO_LOW] = vco_low
+    state[S_VCO_ZI] = vco_zi
+    state[S_LPD_UP] = up_q
+    state[S_LPD_DOWN] = down_q
+    state[S_LPD_LAST_UP] = last_up
+    state[S_LPD_LAST_DOWN] = last_down
+    state[S_LF_OUT] = lf_value
+    state[S_LF_X1] = x1
+    state[S_LF_X2] = x2
+    state[S_LF_Y1] = y1
+    state[S_LF_Y2] = y2
+    state[S_DIV_COUNT] = count
+    state[S_DIV_TON] = ton
+    state[S_DIV_LAST] = div_last
+    state[S_DIV_OUT] = feedback
+    state[S_Z_CLK] = zc
+    state[S_Z_VCO] = zv
+    state[S_F_CLK] = fc
+    state[S_F_VCO] = fv
+    return index
+
+
+BACKEND = 'numba' if find_spec('numba') is not None else 'python'
+
+
+@lru_cache(maxsize=None)
+def _kernel():
+    """Returns the fused loop, compiled with Numba on first use if available."""
+    if BACKEND == 'python':
+        return _fused_loop
+    # pylint: disable=C0415
+    from numba import njit
+    return njit(cache=True, nogil=True)(_fused_loop)
+
+
+def _pack_params(components: dict) -> np.ndarray:
+    """Flattens the component parameters into the kernel parameter vector."""
+    clk, lf, vco, div = (components['clk'], components['lf'],
+                         components['vco'], components['div'])
+    params = np.zeros(P_SIZE)
+    params[P_VSS] = vco.vss
+    params[P_VDD] = vco.vdd
+    for osc, offset in ((clk, P_CLK_KVT), (vco, P_VCO_KVT)):
+        params[offset:offset + 8] = [osc.k_vco_time, osc.angular_time,
+                                     osc.k_vco, osc.fo, osc.h0, osc.n1,
+                                     math.sqrt(osc.h0 / 2),
+                                     math.sqrt(osc.n1 / 2)]
+    params[P_CLK_FLICKER] = clk.flicker is not None
+    params[P_VCO_FLICKER] = vco.flicker is not None
+    if lf.c2 is None:
+        params[P_LF_MODE] = 0
+        params[P_LF_ALPHA] = lf.alpha
+        params[P_LF_BETA] = lf.beta
+    else:
+        params[P_LF_MODE] = 1
+        params[P_LF_B0:P_LF_A2 + 1] = [lf.b0, lf.b1, lf.b2,
+                                       lf.a0, lf.a1, lf.a2]
+    params[P_LF_PULL_UP] = lf.pull_up
+    params[P_LF_PULL_DOWN] = lf.pull_down
+    if lf.settings.lf['min_sat'] is not None and lf.settings.lf['max_sat'] is not None:
+        params[P_LF_SAT] = 1
+        params[P_LF_MIN] = lf.settings.lf['min_sat']
+        params[P_LF_MAX] = lf.settings.lf['max_sat']
+    params[P_DIV_LOWER] = div.lower_limit
+    params[P_DIV_UPPER] = div.upper_limit
+    return params
+
+
+def _pack_state(components: dict, feedback: float) -> np.ndarray:
+    """Flattens the component state into the kernel state vector."""
+    clk, lpd, lf, vco, div = (components['clk'], components['lpd'],
+                              components['lf'], components['vco'],
+                              components['div'])
+    state = np.zeros(S_SIZE)
+    for osc, offset in ((clk, S_CLK_LAST), (vco, S_VCO_LAST)):
+        state[offset:offset + 5] = [osc.last, osc.last_output, osc.white_noise,
+                                    osc.low_freq_noise,
+                                    np.ravel(osc.filter_conditions)[0]]
+    state[S_LPD_UP:S_LPD_LAST_DOWN + 1] = [lpd.ff_up_q, lpd.ff_down_q,
+                                           lpd.last_up, lpd.last_down]
+    state[S_LF_OUT:S_LF_Y2 + 1] = [lf.output_value, *lf.last_inputs,
+                                   *lf.last_outputs]
+    state[S_DIV_COUNT:S_DIV_LAST + 1] = [div.transition_count, div.ton,
+                                         div.last_sample]
+    state[S_DIV_OUT] = feedback
+    return state
+
+
+def _unpack_state(components: dict, state: np.ndarray) -> float:
+    """Writes the kernel state vector back into the components."""
+    clk, lpd, lf, vco, div = (components['clk'], components['lpd'],
+                              components['lf'], components['vco'],
+                              components['div'])
+    for osc, offset in ((clk, S_CLK_LAST), (vco, S_VCO_LAST)):
+        osc.last = float(state[offset])
+        osc.last_output = float(state[offset + 1])
+        osc.white_noise = float(state[offset + 2])
+        osc.low_freq_noise = float(state[offset + 3])
+        osc.filter_conditions = float(state[offset + 4])
+    lpd.ff_up_q = int(state[S_LPD_UP])
+    lpd.ff_down_q = int(state[S_LPD_DOWN])
+    lpd.last_up = float(state[S_LPD_LAST_UP])
+    lpd.last_down = float(state[S_LPD_LAST_DOWN])
+    lf.output_value = float(state[S_LF_OUT])
+    lf.last_inputs = [float(state[S_LF_X1]), float(state[S_LF_X2])]
+    lf.last_outputs = [float(state[S_LF_Y1]), float(state[S_LF_Y2])]
+    div.transition_count = int(state[S_DIV_COUNT])
+    div.ton = bool(state[S_DIV_TON])
+    div.last_sample = float(state[S_DIV_LAST])
+    return float(state[S_DIV_OUT])
+
+
+def run_fused(components: dict, sample_count: int, monitor: bool = True,
+              feedback: float = 0) -> tuple:
+    """
+    Run the closed loop formed by `components` with the fused kernel.
+
+    The components must already be built. Their internal state is read before
+    the run and written back afterwards, so the per-object methods can pick up
+    exactly where the kernel stopped.
+
+    :param components: The `Pll.components` dictionary.
+    :param sample_count: Number of samples to simulate.
+    :param monitor: If `True` the CLK, Divider and LPD outputs are recorded as
+        well as the Loop Filter and VCO outputs.
+    :param feedback: Divider output fed back into the LPD on the first sample.
+
+    **Returns**:
+        - tuple: A dictionary of output arrays keyed by `clk`, `div`,
+          `lpd_a`, `lpd_b`, `lf` and `vco`, and the last divider output.
+    """
+    params = _pack_params(components)
+    state = _pack_state(components, feedback)
+    monitored = sample_count if monitor else 0
+    traces = {'clk': np.empty(monitored),
+              'div': np.empty(monitored),
+              'lpd_a': np.empty(monitored, dtype=np.uint8),
+              'lpd_b': np.empty(monitored, dtype=np.uint8),
+              'lf': np.empty(sample_count),
+              'vco': np.empty(sample_count)}
+
+    # A noisy oscillator needs up to two draws and one flicker value per toggle.
+    clk, vco = components['clk'], components['vco']
+    sources = [(clk.noise if clk.h0 != 0 or clk.n1 != 0 else None, S_Z_CLK, 2),
+               (vco.noise if vco.h0 != 0 or vco.n1 != 0 else None, S_Z_VCO, 2),
+               (clk.flicker, S_F_CLK, 1),
+               (vco.flicker, S_F_VCO, 1)]
+    blocks = [np.zeros(0) if source is None else source.block(minimum)
+              for source, _, minimum in sources]
+    fused_loop = _kernel()
+    index = 0
+    while index < sample_count:
+        index = fused_loop(index, sample_count, params, state, *blocks,
+                           traces['clk'], traces['div'], traces['lpd_a'],
+                           traces['lpd_b'], traces['lf'], traces['vco'],
+                           monitor)
+        for position, (source, slot, minimum) in enumerate(sources):
+            if source is not None:
+                source.consume(state[slot])
+                state[slot] = 0
+                blocks[position] = source.block(minimum)
+
+    return traces, _unpack_state(components, state)
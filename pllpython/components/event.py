@@ -0,0 +1,303 @@
+"""Event-driven PLL Engine
+
+This module provides the event-driven (edge-to-edge) engine used by `Pll.start`
+and `Pll.start_and_monitor` when they are called with `engine='event'`.
+
+Between phase detector edges the LPD outputs, the divider output and the loop
+filter input are constant. The engine therefore only steps the component objects
+sample by sample around events (CLK transitions, the VCO transition that toggles
+the divider, LPD resets) and jumps over the quiet stretches in between:
+
+- The Loop Filter recurrence and the VCO phase accumulator are linear for a
+  constant LF input, so they are advanced analytically with powers of a small
+  augmented state matrix.
+- The next CLK transition follows in closed form from the accumulated CLK phase.
+- The next relevant VCO transition is found by binary lifting over the
+  precomputed matrix powers, using the fact that the VCO phase is monotonic.
+
+Only the event boundaries are recorded while simulating. Dense traces at the
+settings' `time_step` are rebuilt on demand with `EventEngine.rebuild`.
+
+The engine assumes a positive VCO frequency (`fo + k_vco * v_lf > 0`) and does
+not support Loop Filter saturation.
+"""
+from math import floor, pi, ceil, inf
+import numpy as np
+
+# pylint: disable=W0212 disable=R0902 disable=R0914
+
+MARGIN = 2
+
+# Augmented state vector layout.
+Y1 = 0
+Y2 = 1
+X1 = 2
+X2 = 3
+X = 4
+THETA = 5
+ONE = 6
+
+
+def _half_cycles(theta: float) -> int:
+    """Index of the half period of `cos` that contains `theta`.
+
+    The oscillator output is high (`cos < 0`) when the index is even.
+    """
+    return floor((theta - pi / 2) / pi)
+
+
+class EventEngine:
+    """
+    Edge-to-edge simulation of a closed PLL loop.
+
+    :param components: The `Pll.components` dictionary, already built.
+    :param settings: Simulation settings.
+
+    **Attributes**:
+        - `records` (list): Event boundaries needed to rebuild dense traces.
+        - `steps` (int): Number of loop iterations (sample steps and
+          analytic advances) taken by the last run.
+        - `powers` (list): The augmented state matrix raised to `2**j`.
+    """
+
+    def __init__(self, components: dict, settings):
+        """
+        Initialize the engine and precompute the state matrix powers.
+
+        :param components: The `Pll.components` dictionary, already built.
+        :param settings: Simulation settings.
+
+        :raises ValueError: If the Loop Filter saturation is enabled.
+        """
+        if settings.lf['min_sat'] is not None and settings.lf['max_sat'] is not None:
+            raise ValueError(
+                'The event engine does not support Loop Filter saturation')
+        self.components = components
+        self.settings = settings
+        self.records = []
+        self.steps = 0
+        self.sample_count = 0
+
+        lf = components['lf']
+        vco = components['vco']
+        matrix = np.zeros((7, 7))
+        if lf.c2 is None:
+            matrix[Y1, Y1] = lf.alpha
+            matrix[Y1, X] = lf.beta
+        else:
+            matrix[Y1] = [-lf.a1 / lf.a0, -lf.a2 / lf.a0, lf.b1 / lf.a0,
+                          lf.b2 / lf.a0, lf.b0 / lf.a0, 0, 0]
+        matrix[Y2, Y1] = 1
+        matrix[X1, X] = 1
+        matrix[X2, X1] = 1
+        matrix[X, X] = 1
+        matrix[THETA] = vco.k_vco_time * matrix[Y1]
+        matrix[THETA, THETA] = 1
+        matrix[THETA, ONE] = vco.angular_time
+        matrix[ONE, ONE] = 1
+
+        self.powers = [matrix]
+        for _ in range(max(settings.sample_count, 1).bit_length()):
+            self.powers.append(self.powers[-1] @ self.powers[-1])
+
+    def _state(self, net_current: float) -> np.ndarray:
+        """Builds the augmented state vector from the components."""
+        lf = self.components['lf']
+        if lf.c2 is None:
+            y_1, y_2, x_1, x_2 = lf.output_value, 0, 0, 0
+        else:
+            y_1, y_2 = lf.last_outputs
+            x_1, x_2 = lf.last_inputs
+        return np.array([y_1, y_2, x_1, x_2, net_current,
+                         self.components['vco'].last, 1], dtype=float)
+
+    def _power(self, vector: np.ndarray, count: int) -> np.ndarray:
+        """Advances the augmented state vector by `count` samples."""
+        j = 0
+        while count:
+            if count & 1:
+                vector = self.powers[j] @ vector
+            count >>= 1
+            j += 1
+        return vector
+
+    def _lift(self, vector: np.ndarray, limit: int, bound: float) -> int:
+        """Largest `k <= limit` whose VCO phase stays below `bound`."""
+        k = 0
+        for j in range(len(self.powers) - 1, -1, -1):
+            step = 1 << j
+            if k + step > limit:
+                continue
+            candidate = self.powers[j] @ vector
+            if candidate[THETA] < bound:
+                vector = candidate
+                k += step
+        return k
+
+    def _quiet(self, feedback: float) -> bool:
+        """Checks that the LPD inputs and outputs are settled."""
+        clk, lpd, vco, div = (self.components['clk'], self.components['lpd'],
+                              self.components['vco'], self.components['div'])
+        settled = vco.vdd if div.ton else vco.vss
+        if (lpd.ff_up_q and lpd.ff_down_q) or feedback != settled:
+            return False
+        if lpd.last_down != feedback or lpd.last_up != clk.last_output:
+            return False
+        for osc in (clk, vco):
+            high = _half_cycles(osc.last + osc.white_noise +
+                                osc.low_freq_noise) % 2 == 0
+            if high != (osc.last_output == osc.vdd):
+                return False
+        return True
+
+    def _transitions_to_toggle(self) -> int:
+        """VCO transitions left until the divider toggles."""
+        div = self.components['div']
+        if div.transition_count <= div.lower_limit:
+            return div.lower_limit + 1 - div.transition_count
+        return div.upper_limit + 1 - div.transition_count
+
+    def _step(self, index: int, feedback: float) -> float:
+        """Steps every component by one sample, exactly like `Pll.start`."""
+        clk, lpd, lf, vco, div = (self.components['clk'], self.components['lpd'],
+                                  self.components['lf'], self.components['vco'],
+                                  self.components['div'])
+        clk_out = clk._process(1)
+        lpd_out_a, lpd_out_b = lpd._process(clk_out, feedback)
+        lf_out = lf._process(lpd_out_a, lpd_out_b)
+        vco_out = vco._process(lf_out)
+        feedback = div._process(vco_out)
+        self.records.append(('step', index, clk_out, lpd_out_a, lpd_out_b,
+                             lf_out, vco_out, feedback))
+        return feedback
+
+    def _advance(self, index: int, horizon: int, feedback: float) -> int:
+        """Advances analytically up to the next event, returns the length."""
+        clk, lpd, lf, vco, div = (self.components['clk'], self.components['lpd'],
+                                  self.components['lf'], self.components['vco'],
+                                  self.components['div'])
+        net_current = lpd.ff_up_q * lf.pull_up + lpd.ff_down_q * lf.pull_down
+        vector = self._state(net_current)
+
+        clk_offset = clk.white_noise + clk.low_freq_noise
+        clk_increment = clk.k_vco_time + clk.angular_time
+        clk_event = inf
+        if clk_increment > 0:
+            bound = pi / 2 + pi * (_half_cycles(clk.last + clk_offset) + 1)
+            clk_event = max(
+                ceil((bound - clk_offset - clk.last) / clk_increment), 1)
+
+        vco_offset = vco.white_noise + vco.low_freq_noise
+        noisy = vco.h0 != 0 or vco.n1 != 0
+        ahead = 1 if noisy else self._transitions_to_toggle()
+        start_cycles = _half_cycles(vco.last + vco_offset)
+        bound = pi / 2 + pi * (start_cycles + ahead) - vco_offset
+        limit = min(horizon, clk_event) + MARGIN
+        vco_event = self._lift(vector, limit, bound) + 1
+
+        count = min(horizon, clk_event - MARGIN, vco_event - MARGIN)
+        if count < 1:
+            return 0
+
+        self.records.append(('advance', index, count, vector.copy(), vco_offset,
+                             clk.last, clk_offset, lpd.ff_up_q, lpd.ff_down_q, feedback))
+        vector = self._power(vector, count)
+
+        if lf.c2 is None:
+            lf.output_value = float(vector[Y1])
+        else:
+            lf.output_value = float(vector[Y1])
+            lf.last_outputs = [float(vector[Y1]), float(vector[Y2])]
+            lf.last_inputs = [float(vector[X1]), float(vector[X2])]
+
+        vco.last = float(vector[THETA])
+        cycles = _half_cycles(vco.last + vco_offset)
+        if cycles != start_cycles:
+            div.transition_count += cycles - start_cycles
+            vco.last_output = vco.vdd if cycles % 2 == 0 else vco.vss
+            div.last_sample = vco.last_output
+        clk.last += count * clk_increment
+        return count
+
+    def run(self, sample_count: int, feedback: float = 0, progress=None) -> float:
+        """
+        Simulates `sample_count` samples of the loop.
+
+        :param sample_count: Number of samples to simulate.
+        :param feedback: Divider output fed back into the LPD on the first sample.
+        :param progress: Optional `tqdm` progress bar updated with the
+            simulated samples.
+
+        **Returns**:
+            - float: The last divider output.
+        """
+        index = 0
+        while index < sample_count:
+            count = 0
+            if self._quiet(feedback):
+                count = self._advance(index + self.sample_count,
+                                      sample_count - index, feedback)
+            if count == 0:
+                feedback = self._step(index + self.sample_count, feedback)
+                count = 1
+            index += count
+            self.steps += 1
+            if progress is not None:
+                progress.update(count)
+        self.sample_count += sample_count
+        self.components['lf'].io['output'].clear()
+        return feedback
+
+    def rebuild(self) -> dict:
+        """
+        Rebuilds the dense traces of the recorded run at the settings' time step.
+
+        **Returns**:
+            - dict: Arrays keyed by `clk`, `div`, `lpd_a`, `lpd_b`, `lf` and
+              `vco`, each of length `sample_count`.
+        """
+        # pylint: disable=C0415
+        from scipy import signal
+
+        clk, lf, vco = (self.components['clk'], self.components['lf'],
+                        self.components['vco'])
+        traces = {key: np.empty(self.sample_count)
+                  for key in ('clk', 'div', 'lf', 'vco')}
+        traces['lpd_a'] = np.empty(self.sample_count, dtype=np.uint8)
+        traces['lpd_b'] = np.empty(self.sample_count, dtype=np.uint8)
+        b_coef, a_coef = lf.coefficients()
+        vdd, vss = vco.vdd, vco.vss
+        clk_increment = clk.k_vco_time + clk.angular_time
+
+        for record in self.records:
+            if record[0] == 'step':
+                _, index, clk_out, out_a, out_b, lf_out, vco_out, feedback = record
+                for key, value in (('clk', clk_out), ('lpd_a', out_a),
+                                   ('lpd_b', out_b), ('lf', lf_out),
+                                   ('vco', vco_out), ('div', feedback)):
+                    traces[key][index] = value
+                continue
+
+            (_, index, count, vector, vco_offset, clk_last, clk_offset,
+             out_a, out_b, feedback) = record
+            window = slice(index, index + count)
+            if lf.c2 is None:
+                zi = signal.lfiltic(b_coef, a_coef, [vector[Y1]])
+            else:
+                zi = signal.lfiltic(b_coef, a_coef, [vector[Y1], vector[Y2]],
+                                    [vector[X1], vector[X2]])
+            lf_out, _ = signal.lfilter(b_coef, a_coef,
+                                       np.full(count, vector[X]), zi=zi)
+            theta = vector[THETA] + np.cumsum(lf_out * vco.k_vco_time +
+                                              vco.angular_time)
+            clk_theta = clk_last + clk_increment * np.arange(1, count + 1)
+
+            traces['lf'][window] = lf_out
+            traces['vco'][window] = vss + \
+                (vdd - vss) * (np.cos(theta + vco_offset) < 0)
+            traces['clk'][window] = vss + \
+                (vdd - vss) * (np.cos(clk_theta + clk_offset) < 0)
+            traces['lpd_a'][window] = out_a
+            traces['lpd_b'][window] = out_b
+            traces['div'][window] = feedback
+        return traces
@@ -9,9 +9,12 @@ It is commonly used in PLLs to filter the phase difference between two signals
 and provide a control voltage for a Voltage-Controlled Oscillator (VCO).
 """
 import os
-from collections import deque
-import pytest
 import numpy as np
+from ..utils.trace import TraceBuffer
+
+# Longest sub-block filtered at once by `process_block` when the output may
+# saturate; a saturated sample discards the rest of its sub-block.
+SATURATION_BLOCK = 4096
 
 # pylint: disable=W0612 disable=W1203
 
@@ -71,9 +74,9 @@ class LoopFilter:
         """
         self.settings = settings
         self.io = {
-            'input_a': deque([], maxlen=settings.sample_count),
-            'input_b': deque([], maxlen=settings.sample_count),
-            'output': deque([], maxlen=settings.sample_count)
+            'input_a': TraceBuffer.for_settings(settings),
+            'input_b': TraceBuffer.for_settings(settings),
+            'output': TraceBuffer.for_settings(settings)
         }
 
         self.time_step: float = float(settings.time_step)
@@ -85,6 +88,10 @@ class LoopFilter:
             settings.lf['C2']) if settings.lf['C2'] is not None else None
         self.pull_up: float = float(settings.lf['pull_up'])
         self.pull_down: float = -1 * float(settings.lf['pull_down'])
+        self.saturated: bool = (settings.lf['min_sat'] is not None and
+                                settings.lf['max_sat'] is not None)
+        self.min_sat: float = float(settings.lf['min_sat']) if self.saturated else None
+        self.max_sat: float = float(settings.lf['max_sat']) if self.saturated else None
 
         self.last_inputs: list = [0.0, 0.0]
         self.last_outputs: list = [0.0, 0.0]
@@ -111,8 +118,19 @@ class LoopFilter:
                 self.a2 = rcc2 * k**2 - cc2 * k
 
     def update_settings(self, settings):
-        """Update Settings"""
-        self.settings = settings
+        """
+        Re-derives the filter parameters from `settings`.
+
+        The internal state returned by `get_state` and the io buffers are
+        kept, so a running simulation continues with the new parameters.
+
+        :param settings: The new configuration object.
+        """
+        state = self.get_state()
+        io = self.io
+        self.__init__(settings)
+        self.set_state(state)
+        self.io = io
 
     def _process(self, input_a: float, input_b: float) -> float:
         """
@@ -130,39 +148,151 @@ class LoopFilter:
         **Returns**:
             - float: The filtered output value after applying the phase loop filter.
         """
-        up_current = input_a * self.pull_up
-        down_current = input_b * self.pull_down
-        net_current = up_current + down_current
+        self.io['output'].append(
+            self._step(input_a * self.pull_up + input_b * self.pull_down))
+        return self.output_value
 
+    def _step(self, net_current: float) -> float:
+        """Filters and clamps one net current sample, without monitoring."""
         if self.c2 is None:
-            self.output_value = self.alpha * self.output_value + self.beta * net_current
-            if self.settings.lf['min_sat'] is not None and self.settings.lf['max_sat'] is not None:
-                if self.output_value < self.settings.lf['min_sat']:
-                    self.output_value = self.settings.lf['min_sat']
-                elif self.output_value > self.settings.lf['max_sat']:
-                    self.output_value = self.settings.lf['max_sat']
+            output_value = self.alpha * self.output_value + self.beta * net_current
         else:
-            self.output_value = (self.b0 * net_current +
-                                 self.b1 * self.last_inputs[0] +
-                                 self.b2 * self.last_inputs[1] -
-                                 self.a1 * self.last_outputs[0] -
-                                 self.a2 * self.last_outputs[1]) / self.a0
-            self.last_inputs = [net_current, self.last_inputs[0]]
-            if self.settings.lf['min_sat'] is not None and self.settings.lf['max_sat'] is not None:
-                if self.output_value < self.settings.lf['min_sat']:
-                    self.output_value = self.settings.lf['min_sat']
-                elif self.output_value > self.settings.lf['max_sat']:
-                    self.output_value = self.settings.lf['max_sat']
-            self.last_outputs = [self.output_value, self.last_outputs[0]]
-        self.io['output'].append(self.output_value)
-        return self.output_value
+            last_inputs, last_outputs = self.last_inputs, self.last_outputs
+            output_value = (self.b0 * net_current +
+                            self.b1 * last_inputs[0] +
+                            self.b2 * last_inputs[1] -
+                            self.a1 * last_outputs[0] -
+                            self.a2 * last_outputs[1]) / self.a0
+            last_inputs[1], last_inputs[0] = last_inputs[0], net_current
+        if self.saturated:
+            if output_value < self.min_sat:
+                output_value = self.min_sat
+            elif output_value > self.max_sat:
+                output_value = self.max_sat
+        if self.c2 is not None:
+            self.last_outputs[1], self.last_outputs[0] = self.last_outputs[0], output_value
+        self.output_value = output_value
+        return output_value
+
+    def coefficients(self) -> tuple[list[float], list[float]]:
+        """
+        Returns the filter as `lfilter` coefficients of the net current.
+
+        **Returns**:
+            - tuple: The numerator and denominator coefficients.
+        """
+        if self.c2 is None:
+            return [self.beta], [1.0, -self.alpha]
+        return [self.b0, self.b1, self.b2], [self.a0, self.a1, self.a2]
+
+    def _linear_block(self, net_current: np.ndarray) -> np.ndarray:
+        """
+        Filters a block of net current from the current state, unclamped.
+
+        The state is not updated, see `_accept`.
+        """
+        # pylint: disable=C0415
+        from scipy import signal
+
+        b_coef, a_coef = self.coefficients()
+        # Transposed direct form II state, as `signal.lfiltic` would build it.
+        if self.c2 is None:
+            zi = [self.alpha * self.output_value]
+        else:
+            (x_1, x_2), (y_1, y_2) = self.last_inputs, self.last_outputs
+            zi = [(self.b1 * x_1 + self.b2 * x_2 - self.a1 * y_1 - self.a2 * y_2) / self.a0,
+                  (self.b2 * x_1 - self.a2 * y_1) / self.a0]
+        return signal.lfilter(b_coef, a_coef, net_current, zi=zi)[0]
+
+    def _accept(self, net_current: np.ndarray, output: np.ndarray):
+        """Moves the state past a filtered block of at least one sample."""
+        self.output_value = float(output[-1])
+        if self.c2 is not None:
+            inputs = np.concatenate((self.last_inputs[::-1], net_current[-2:]))
+            outputs = np.concatenate((self.last_outputs[::-1], output[-2:]))
+            self.last_inputs = [float(inputs[-1]), float(inputs[-2])]
+            self.last_outputs = [float(outputs[-1]), float(outputs[-2])]
+
+    def process_block(self, input_a, input_b) -> np.ndarray:
+        """
+        Filters a block of input samples at once, carrying the state.
+
+        Equivalent to calling `_process` on every sample. The recurrence is
+        applied with `scipy.signal.lfilter`, starting from the filter state,
+        so consecutive blocks continue each other. When saturation is enabled
+        the block is filtered in sub-blocks: the samples before the first one
+        outside of the limits are kept, and the filter falls back to clamping
+        sample by sample until its output is back within the limits.
+
+        :param input_a: Block of `input_a` samples, e.g. the LPD UP output.
+        :param input_b: Block of `input_b` samples, e.g. the LPD DOWN output.
+
+        **Returns**:
+            - np.ndarray: The filtered output, also appended to io['output'].
+        """
+        net_current = (np.asarray(input_a, dtype=float) * self.pull_up +
+                       np.asarray(input_b, dtype=float) * self.pull_down)
+        count = len(net_current)
+        if not self.saturated:
+            output = self._linear_block(net_current)
+            if count:
+                self._accept(net_current, output)
+            self.io['output'].extend(output)
+            return output
+
+        output = np.empty(count)
+        start, length = 0, SATURATION_BLOCK
+        while start < count:
+            stop = min(start + length, count)
+            block = self._linear_block(net_current[start:stop])
+            outside = np.flatnonzero((block < self.min_sat) | (block > self.max_sat))
+            valid = outside[0] if len(outside) else len(block)
+            if valid:
+                output[start:start + valid] = block[:valid]
+                self._accept(net_current[start:start + valid], block[:valid])
+            start += valid
+            if not len(outside):
+                length = min(2 * length, SATURATION_BLOCK)
+                continue
+            # Clamp sample by sample until an output is within the limits,
+            # then resume with short sub-blocks.
+            while start < count:
+                output[start] = self._step(net_current[start])
+                start += 1
+                if self.min_sat < output[start - 1] < self.max_sat:
+                    break
+            length = 64
+        self.io['output'].extend(output)
+        return output
+
+    def get_state(self) -> dict:
+        """
+        Returns the internal state of the filter.
+
+        **Returns**:
+            - dict: The output value and the input and output history.
+        """
+        return {'output_value': self.output_value,
+                'last_inputs': np.array(self.last_inputs, dtype=float),
+                'last_outputs': np.array(self.last_outputs, dtype=float)}
+
+    def set_state(self, state: dict):
+        """
+        Restores an internal state returned by `get_state`.
+
+        :param state: The state to restore.
+        """
+        self.output_value = float(state['output_value'])
+        self.last_inputs = [float(value) for value in state['last_inputs']]
+        self.last_outputs = [float(value) for value in state['last_outputs']]
 
     def start(self, input_array_a: list[float], input_array_b: list[float]):
         """
         Process preloaded input signals and compute the filtered output.
 
         This method processes an array of input signals (`input_array_a` and `input_array_b`) 
-        using the preloaded signals and computes the output for each sample.
+        using the preloaded signals and computes the output for each sample with
+        `process_block`.
 
         :param input_array_a: List of input signals `a` to be processed.
         :param input_array_b: List of input signals `b` to be processed.
@@ -170,12 +300,10 @@ class LoopFilter:
         **Returns**:
             - None
         """
-        self.io['input_a'] = np.array(input_array_a)
-        self.io['input_b'] = np.array(input_array_b)
-        for index, __ in enumerate(range(self.sample_count)):
-            self._process(
-                input_a=input_array_a[index], input_b=input_array_b[index])
-        self.io['output'] = np.array(self.io['output'])
+        self.io['input_a'] = TraceBuffer.from_array(input_array_a)
+        self.io['input_b'] = TraceBuffer.from_array(input_array_b)
+        self.process_block(np.asarray(input_array_a)[:self.sample_count],
+                           np.asarray(input_array_b)[:self.sample_count])
 
     def unit_test(self, test_path):
         """
@@ -191,5 +319,7 @@ class LoopFilter:
         """
         print("Testing LoopFilter")
         if os.path.isfile(path=test_path):
+            # pylint: disable=C0415
+            import pytest
             return pytest.main(["-s", "--durations=0", test_path])
         return f'File {test_path} does not exist'
@@ -0,0 +1,152 @@
+"""Lock Detector Class.
+
+This class models a lock detector watching the outputs of the phase detector
+(`Lpd`) and of the loop filter (`LoopFilter`) of a phase-locked loop (PLL).
+
+Every reference cycle the phase detector emits one pulse on `output_a` and/or
+`output_b`. Once the loop is locked these pulses shrink to the reset delay of
+the phase detector and the loop filter output stops drifting from one cycle to
+the next. The detector declares lock after a configurable number of
+consecutive reference cycles meeting both conditions, so the simulation can be
+stopped early.
+"""
+import numpy as np
+
+# pylint: disable=R0902
+
+
+class LockDetector:
+    """
+    Lock Detector Class.
+
+    A reference cycle is stable when the phase detector pulse lasted at most
+    `max_pulse_width` and the loop filter output, sampled at the end of the
+    pulse, moved by at most `max_ripple` since the previous pulse.
+
+    :param settings: Configuration object containing the `lock` settings.
+
+    **Attributes**:
+        - `cycles` (int): Number of consecutive stable cycles needed for lock.
+        - `max_width` (int): Largest stable pulse width, in samples.
+        - `max_ripple` (float): Largest stable cycle-to-cycle LF change.
+        - `hold_off` (int): Samples to keep simulating after lock is declared.
+        - `lock_index` (int): Sample at which the first cycle of the stable
+          streak ended, `None` until lock is declared.
+        - `index_at_lock` (int): Number of samples processed when lock was
+          declared.
+        - `index` (int): Number of samples processed so far.
+    """
+
+    def __init__(self, settings):
+        """
+        Initialize the Lock Detector with the given settings.
+
+        :param settings: Configuration object containing `lock` settings like
+            `cycles`, `max_pulse_width`, `max_ripple` and `hold_off`, and the
+            simulation `time_step`.
+        """
+        self.time_step: float = settings.time_step
+        self.cycles: int = int(settings.lock['cycles'])
+        self.max_width: int = max(
+            int(round(settings.lock['max_pulse_width'] / settings.time_step)), 1)
+        self.max_ripple: float = float(settings.lock['max_ripple'])
+        self.hold_off: int = int(
+            round(settings.lock['hold_off'] / settings.time_step))
+
+        self.index: int = 0
+        self.lock_index: int = None
+        self.index_at_lock: int = None
+        self.width: int = 0
+        self.last_lf: float = None
+        self.streak: int = 0
+        self.streak_index: int = 0
+
+    @property
+    def locked(self) -> bool:
+        """`True` once lock has been declared."""
+        return self.lock_index is not None
+
+    @property
+    def lock_time(self) -> float:
+        """Time at which lock was acquired, `None` if not locked."""
+        if self.lock_index is None:
+            return None
+        return self.lock_index * self.time_step
+
+    @property
+    def stop_index(self) -> int:
+        """Sample after which the simulation can stop, `None` if not locked."""
+        if self.lock_index is None:
+            return None
+        return max(self.lock_index + self.hold_off, self.index_at_lock)
+
+    def _pulse(self, width: int, lf_value: float, index: int):
+        """Updates the stable cycle streak with one finished pulse."""
+        stable = (width <= self.max_width and self.last_lf is not None and
+                  abs(lf_value - self.last_lf) <= self.max_ripple)
+        self.last_lf = lf_value
+        if not stable:
+            self.streak = 0
+            return
+        if self.streak == 0:
+            self.streak_index = index
+        self.streak += 1
+        if self.streak >= self.cycles and self.lock_index is None:
+            self.lock_index = self.streak_index
+            self.index_at_lock = index + 1
+
+    def _process(self, input_a: float, input_b: float, lf_value: float) -> bool:
+        """
+        Process one sample of the LPD outputs and of the LF output.
+
+        :param input_a: LPD `output_a` sample.
+        :param input_b: LPD `output_b` sample.
+        :param lf_value: LF output sample.
+
+        **Returns**:
+            - bool: `True` if the loop is locked.
+        """
+        if input_a or input_b:
+            self.width += 1
+        elif self.width:
+            self._pulse(self.width, lf_value, self.index)
+            self.width = 0
+        self.index += 1
+        return self.lock_index is not None
+
+    def process_block(self, input_a: np.ndarray, input_b: np.ndarray,
+                      lf_values: np.ndarray) -> bool:
+        """
+        Process a block of samples, with the same result as `_process`.
+
+        Pulse boundaries are located with NumPy, so only one Python iteration
+        per reference cycle is needed.
+
+        :param input_a: LPD `output_a` samples.
+        :param input_b: LPD `output_b` samples.
+        :param lf_values: LF output samples.
+
+        **Returns**:
+            - bool: `True` if the loop is locked.
+        """
+        active = (np.asarray(input_a) != 0) | (np.asarray(input_b) != 0)
+        count = len(active)
+        if count == 0:
+            return self.lock_index is not None
+        previous = np.concatenate(([self.width > 0], active[:-1]))
+        starts = np.flatnonzero(active & ~previous)
+        ends = np.flatnonzero(~active & previous)
+
+        positions = np.searchsorted(starts, ends)
+        for end, position in zip(ends, positions):
+            start = starts[position - 1] if position else -self.width
+            self._pulse(int(end - start), float(lf_values[end]),
+                        self.index + int(end))
+
+        if active[-1]:
+            self.width = count - int(starts[-1]) if len(starts) else \
+                self.width + count
+        else:
+            self.width = 0
+        self.index += count
+        return self.lock_index is not None
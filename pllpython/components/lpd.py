@@ -10,8 +10,9 @@ The class extends the `Settings` class to retrieve configuration parameters
 such as sample count.
 """
 import os
-from collections import deque
-import pytest
+import numpy as np
+from ..utils.trace import TraceBuffer
+from ..utils.edges import EdgeTrace
 
 # pylint: disable=W1203
 
@@ -30,9 +31,9 @@ class Lpd:
         `sample_count` to set up the size of the input/output buffers.
 
     **Attributes**:
-        - `io` (dict): A dictionary containing deques for monitoring input 
-          (`input_a`, `input_b`) and output (`output_a`, `output_b`) signals 
-          during simulation.
+        - `io` (dict): A dictionary containing trace buffers for monitoring
+          input (`input_a`, `input_b`) and output (`output_a`, `output_b`)
+          signals during simulation. The outputs are stored as `uint8`.
         - `ff_up_q` (int): The flip-flop state for `output_a`.
         - `ff_down_q` (int): The flip-flop state for `output_b`.
         - `last_up` (int): The previous value of `input_a` for edge detection.
@@ -43,7 +44,7 @@ class Lpd:
         """
         Initialize the Linear Phase Detector (LPD) with given settings.
 
-        This method sets up the input/output buffers (as deques) and initializes
+        This method sets up the input/output trace buffers and initializes
         the flip-flop states and edge detection values. The simulation parameters 
         (such as `sample_count`) are fetched from the provided `settings` object.
 
@@ -57,11 +58,12 @@ class Lpd:
             - `last_up` (int): Stores the last value of `input_a`.
             - `last_down` (int): Stores the last value of `input_b`.
         """
+        levels = (settings.vss, settings.vdd)
         self.io = {
-            'input_a': deque([], maxlen=settings.sample_count),
-            'input_b': deque([], maxlen=settings.sample_count),
-            'output_a': deque([], maxlen=settings.sample_count),
-            'output_b': deque([], maxlen=settings.sample_count)
+            'input_a': TraceBuffer.for_settings(settings, levels=levels),
+            'input_b': TraceBuffer.for_settings(settings, levels=levels),
+            'output_a': TraceBuffer.for_settings(settings, dtype=np.uint8, levels=(0, 1)),
+            'output_b': TraceBuffer.for_settings(settings, dtype=np.uint8, levels=(0, 1))
         }
 
         self.sample_count = settings.sample_count
@@ -151,13 +153,63 @@ class Lpd:
 
         return self.ff_up_q, self.ff_down_q
 
+    def update_settings(self, settings):
+        """
+        Re-derives the phase detector parameters from `settings`.
+
+        The internal state returned by `get_state` and the io buffers are
+        kept, so a running simulation continues with the new parameters.
+
+        :param settings: The new configuration object.
+        """
+        state = self.get_state()
+        io = self.io
+        self.__init__(settings)
+        self.set_state(state)
+        self.io = io
+
+    def get_state(self) -> dict:
+        """
+        Returns the internal state of the phase detector.
+
+        **Returns**:
+            - dict: The flip-flop states and the last input values.
+        """
+        return {'ff_up_q': self.ff_up_q,
+                'ff_down_q': self.ff_down_q,
+                'last_up': self.last_up,
+                'last_down': self.last_down}
+
+    def set_state(self, state: dict):
+        """
+        Restores an internal state returned by `get_state`.
+
+        :param state: The state to restore.
+        """
+        self.ff_up_q = int(state['ff_up_q'])
+        self.ff_down_q = int(state['ff_down_q'])
+        self.last_up = float(state['last_up'])
+        self.last_down = float(state['last_down'])
+
+    @staticmethod
+    def _rising_edges(input_array: np.ndarray, last: float) -> np.ndarray:
+        """Indices where the input goes from 0 to 1, `last` preceding it."""
+        previous = np.concatenate(([last], input_array[:-1]))
+        return np.flatnonzero((input_array == 1) & (previous == 0))
+
     def start(self, input_array_a: list[float], input_array_b: list[float]) -> None:
         """
         Same as process but optimized for preloaded input.
 
         This method processes preloaded input arrays and stores the output values
-        in the monitoring buffers. It iterates over the `input_array_a` and 
-        `input_array_b` signals and updates the output arrays accordingly.
+        in the monitoring buffers. The rising edges of both inputs are located
+        with NumPy, and the flip-flop and reset logic is only replayed at those
+        edges and at the resets they trigger one sample later. The outputs are
+        then expanded with `np.repeat`, sample-identical to `_process`.
+
+        If either input is an `EdgeTrace` its rising edges are read directly,
+        the other input is converted, and the outputs are stored as
+        `EdgeTrace` objects instead of being expanded.
 
         :param input_array_a: A list of input signals for `input_a`.
         :param input_array_b: A list of input signals for `input_b`.
@@ -165,13 +217,110 @@ class Lpd:
         **Returns**:
             - None
         """
-        self.io['input_a'] = input_array_a
-        self.io['input_b'] = input_array_b
-        for index, __ in enumerate(range(self.sample_count)):
-            out_a, out_b = self._process(
-                input_a=input_array_a[index], input_b=input_array_b[index])
-            self.io['output_a'].append(out_a)
-            self.io['output_b'].append(out_b)
+        if isinstance(input_array_a, EdgeTrace) or isinstance(input_array_b, EdgeTrace):
+            self._start_edges(input_array_a, input_array_b)
+            return
+
+        self.io['input_a'] = TraceBuffer.from_array(input_array_a)
+        self.io['input_b'] = TraceBuffer.from_array(input_array_b)
+        input_a = np.asarray(input_array_a)[:self.sample_count]
+        input_b = np.asarray(input_array_b)[:self.sample_count]
+        count = len(input_a)
+
+        starts, ups, downs = self._replay(self._rising_edges(input_a, self.last_up),
+                                          self._rising_edges(input_b, self.last_down),
+                                          count)
+
+        lengths = np.diff(np.append(starts, count))
+        self.io['output_a'] = TraceBuffer.from_array(
+            np.repeat(np.array(ups, dtype=np.uint8), lengths))
+        self.io['output_b'] = TraceBuffer.from_array(
+            np.repeat(np.array(downs, dtype=np.uint8), lengths))
+        if count:
+            self.last_up = float(input_a[-1])
+            self.last_down = float(input_b[-1])
+
+    def _start_edges(self, input_a, input_b):
+        """
+        Runs `start` on edge traces, see `EdgeTrace`.
+
+        :param input_a: The `input_a` signal, dense or an `EdgeTrace`.
+        :param input_b: The `input_b` signal, dense or an `EdgeTrace`.
+        """
+        time_step = (input_a if isinstance(input_a, EdgeTrace) else input_b).time_step
+        input_a, input_b = (trace if isinstance(trace, EdgeTrace) else
+                            EdgeTrace.from_dense(trace, time_step=time_step)
+                            for trace in (input_a, input_b))
+        self.io['input_a'], self.io['input_b'] = input_a, input_b
+        count = min(len(input_a), self.sample_count)
+        input_a, input_b = input_a[:count], input_b[:count]
+
+        edges = []
+        for trace, last in ((input_a, self.last_up), (input_b, self.last_down)):
+            # The first sample rises from the last input of the previous call.
+            first = [0] if count and trace.initial and last == 0 else []
+            edges.append(np.concatenate((first, trace.rising)).astype(np.int64))
+        starts, ups, downs = self._replay(edges[0], edges[1], count)
+
+        starts = np.array(starts)
+        for key, levels in (('output_a', ups), ('output_b', downs)):
+            levels = np.array(levels, dtype=bool)
+            changed = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+            self.io[key] = EdgeTrace(starts[changed], count, levels[0],
+                                     time_step=time_step, dtype=np.uint8)
+        if count:
+            self.last_up = float(input_a[-1])
+            self.last_down = float(input_b[-1])
+
+    def _replay(self, edges_a: np.ndarray, edges_b: np.ndarray, count: int) -> tuple:
+        """
+        Replays the flip-flop and reset logic at the rising edges of the inputs.
+
+        The flip-flop states are left at the end of the `count` samples.
+
+        :param edges_a: Sorted sample indices of the rising edges of `input_a`.
+        :param edges_b: Sorted sample indices of the rising edges of `input_b`.
+        :param count: Number of samples.
+
+        **Returns**:
+            - tuple: The first sample of every run of constant outputs, and
+              the `output_a` and `output_b` levels of the runs.
+        """
+        events = np.union1d(edges_a, edges_b)
+
+        up, down = self.ff_up_q, self.ff_down_q
+        starts, ups, downs = [0], [up], [down]
+
+        def record(index, up, down):
+            if starts[-1] == index:
+                ups[-1], downs[-1] = up, down
+            else:
+                starts.append(index)
+                ups.append(up)
+                downs.append(down)
+
+        reset_at = 0 if up and down else None
+        for index, edge_a, edge_b in zip(events.tolist(),
+                                         np.isin(events, edges_a).tolist(),
+                                         np.isin(events, edges_b).tolist()):
+            if reset_at is not None and reset_at <= index:
+                record(reset_at, 0, 0)
+                up = down = 0
+                if reset_at == index:
+                    reset_at = None
+                    continue
+                reset_at = None
+            if (edge_a and not up) or (edge_b and not down):
+                up, down = up or int(edge_a), down or int(edge_b)
+                record(index, up, down)
+                if up and down:
+                    reset_at = index + 1
+        if reset_at is not None and reset_at < count:
+            record(reset_at, 0, 0)
+            up = down = 0
+
+        self.ff_up_q, self.ff_down_q = up, down
+        return starts, ups, downs
 
     def unit_test(self,  test_path):
         """
@@ -185,5 +334,7 @@ class Lpd:
         """
         print("Testing LPD")
         if os.path.isfile(path=test_path):
+            # pylint: disable=C0415
+            import pytest
             return pytest.main(["-s", "--durations=0", test_path])
         return f'File {test_path} does not exist'
\ No newline at end of file
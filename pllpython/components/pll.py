@@ -11,24 +11,40 @@ Modules involved in the simulation include:
 - `Divider`: Divider for clock signal.
 
 The simulation can be visualized locally or using web-based plots.
+
+Both `start` and `start_and_monitor` accept an `engine` argument. The default
+'python' engine steps every component object once per sample, the 'fused'
+engine runs the whole loop in a single compiled kernel (see
+`pllpython.components.engine`) and the 'event' engine only processes the
+samples around phase detector edges (see `pllpython.components.event`).
 """
 
-from collections import deque
-from matplotlib import pyplot as plt
+import os
+import copy
 import numpy as np
-from tqdm import tqdm
-from bokeh.plotting import figure, show, output_file, save
-from bokeh.layouts import gridplot
-from .lpd import Lpd
-from .vco import Vco
-from .lf import LoopFilter
-from .divider import Divider
+from .lock import LockDetector
+from .probe import JitterProbe
+from .batch import build_components
+from .engine import run_fused
+from .event import EventEngine
 from ..utils.scope import Scope
+from ..utils.decimate import decimate
+from ..utils.pyramid import TracePyramid, load_pyramids
+from ..utils.viewer import PyramidView
 from ..utils.logger import setup_log, save_io
-from ..utils.formatter import get_time_format, get_volts_format
+from ..utils.trace import TraceBuffer
+from ..utils.digital import DigitalBuffer
+from ..utils.cache import ResultCache
+from ..utils.writer import TraceWriter, load_traces, TRACE_HEADERS
 
 # pylint: disable=W0212
 
+LOCK_BLOCK = 8192
+WRITE_CHUNK = 65536
+# Traces holding two levels, at the supply levels unless listed.
+DIGITAL_TRACES = ('clk', 'div', 'lpd_a', 'lpd_b', 'vco')
+PULSE_LEVELS = {'lpd_a': (0, 1), 'lpd_b': (0, 1)}
+
 scope = Scope()
 
 
@@ -43,8 +59,31 @@ class Pll:
         settings (object): Settings for the simulation such as time step and sample count.
         components (dict): Dictionary containing the components of the PLL system.
         scope (Scope): Instance of the Scope class for monitoring the PLL's behavior.
-        output (deque): Holds the output of the VCO for visualization.
-        time_array (ndarray): Time array used for plotting simulation results.
+        output (TraceBuffer): Holds the output of the VCO for visualization.
+            In monitored runs it is the VCO output io itself.
+        events (EventEngine): Engine of the last event-driven run whose dense
+            traces have not been rebuilt yet, otherwise `None`.
+        lock (LockDetector): Lock detector of the last run, `None` if lock
+            detection was not requested.
+        lock_time (float): Lock time of the last run in seconds, `None` if the
+            loop did not lock or lock detection was not requested.
+        probe (JitterProbe): Jitter probe on the VCO output of the last run,
+            `None` if probing was not requested.
+        feedback (float): Last divider output, fed back on the next sample.
+        samples (int): Number of samples simulated since the components were
+            built, including resumed and extended runs.
+        start_sample (int): Index of the first sample of the current traces.
+        start_feedback (float): Divider output fed back on that first sample.
+        prefix (list): Traces recorded before the current ones, shared with
+            the PLL this one was forked from, see `fork`.
+        time_array (ndarray): Time array used for plotting simulation results,
+            built on first use.
+        writer (TraceWriter): Writer streaming the traces of the current run
+            to `io_file`, or to `settings.storage['path']` in disk mode.
+            `None` when the traces are neither saved nor stored on disk.
+        traces_path (str): JSON sidecar of the traces last streamed by the
+            writer, with their min/max pyramids when
+            `settings.storage['pyramid']` is `True`. `None` before.
     """
 
     def __init__(self, settings, scope_fit='stretch_width'):
@@ -59,33 +98,48 @@ class Pll:
                            'lf': None, 'vco': None,
                            'div': None}
         self.scope = Scope(fit=scope_fit)
-        self.output = deque([], maxlen=settings.sample_count)
-        self.time_array = self.settings.time_array
+        self.events = None
+        self.lock = None
+        self.lock_time = None
+        self.probe = None
+        self.output = TraceBuffer.for_settings(settings,
+                                               levels=(settings.vss, settings.vdd))
+        self.feedback = 0
+        self.samples = 0
+        self.start_sample = 0
+        self.start_feedback = 0
+        self.prefix = []
+        self._time_array = None
+        self.writer = None
+        self.traces_path = None
+        self._buffer_start = 0
         self.id = settings.pll['id']
         self.log = None
         self.io_file = None
 
-    def update_logger(self):
-        """Updates logger"""
+    def update_logger(self, csv: bool = True):
+        """Updates logger
+
+        :param csv: If `True` an io CSV file is created next to the log.
+        """
         self.settings.pll['id'] += 1
         self.id = self.settings.pll['id']
         self.log, self.io_file = setup_log(
-            name=str(__name__).replace('.', '_'), id=self.id, settings=self.settings)
+            name=str(__name__).replace('.', '_'), id=self.id, settings=self.settings,
+            csv=csv)
 
     def start_cdr(self, data):
         """Starts clock and data recovery mode for PLL"""
+        # pylint: disable=C0415
+        from tqdm import tqdm
+
         self.update_logger()
         progress_bar = tqdm(total=self.settings.sample_count,
                             desc='Recovering CLK',
                             position=0)
-        clk = Vco(settings=self.settings, clk=True)
-        lpd = Lpd(settings=self.settings)
-        lf = LoopFilter(settings=self.settings)
-        vco = Vco(settings=self.settings)
-        div = Divider(settings=self.settings)
-
-        self.components = {'clk': clk, 'lpd': lpd,
-                           'lf': lf, 'vco': vco, 'div': div}
+        self._build_components()
+        lpd, lf, vco, div = (self.components['lpd'], self.components['lf'],
+                             self.components['vco'], self.components['div'])
 
         lf_out = 0
         div_out = 0
@@ -112,9 +166,548 @@ class Pll:
                            vco.io['output']],
                 headers=['Time', 'Data', 'Divider Output', 'LPD Output A',
                          'LPD Output B', 'Loop Filter Output', 'VCO Output'],
-                io_file=self.io_file)
+                io_file=self.io_file,
+                names=['time', 'data', 'div', 'lpd_a', 'lpd_b', 'lf', 'vco'])
 
-    def start_and_monitor(self):
+    def _build_components(self):
+        """Builds a fresh set of components from the current settings.
+
+        The noise sources of the CLK and the VCO are seeded from `settings.seed`.
+        """
+        self.components = build_components(self.settings)
+        self.feedback = 0
+        self.samples = 0
+        self.prefix = []
+
+    @property
+    def output(self):
+        """VCO output of the last run, rebuilt on demand after an event run."""
+        if self.events is not None:
+            self.rebuild_io()
+        return self._output
+
+    @output.setter
+    def output(self, value):
+        self._output = value
+
+    def _assign_traces(self, traces: dict, monitor: bool):
+        """Stores the traces returned by the fused or event engines.
+
+        :param traces: Arrays keyed by `clk`, `div`, `lpd_a`, `lpd_b`, `lf`
+            and `vco`, possibly memory-mapped, or trace buffers.
+        :param monitor: If `True` every component io is filled, otherwise only
+            the Loop Filter output and the PLL output are kept.
+        """
+        clk, lpd, lf, vco, div = (self.components['clk'], self.components['lpd'],
+                                  self.components['lf'], self.components['vco'],
+                                  self.components['div'])
+        whole = self._memory() and not self._compact() and \
+            not isinstance(traces['vco'], np.memmap)
+        traces = {key: self._wrap_trace(key, trace)
+                  for key, trace in traces.items()}
+        lf.io['output'] = traces['lf']
+        self._output = traces['vco']
+        if monitor:
+            clk.io['input'] = TraceBuffer.from_array(
+                np.broadcast_to(np.float64(1), len(traces['clk'])))
+            clk.io['output'] = traces['clk']
+            lpd.io['input_a'] = traces['clk']
+            # The shifted feedback is only kept for whole traces in memory.
+            if whole:
+                lpd.io['input_b'] = TraceBuffer.from_array(
+                    np.concatenate(([self.start_feedback], traces['div'][:-1])))
+            lpd.io['output_a'] = traces['lpd_a']
+            lpd.io['output_b'] = traces['lpd_b']
+            vco.io['input'] = traces['lf']
+            vco.io['output'] = traces['vco']
+            div.io['input'] = traces['vco']
+            div.io['output'] = traces['div']
+
+    def _levels(self, key: str):
+        """`(low, high)` values of a two-level trace, `None` for the others."""
+        if key not in DIGITAL_TRACES:
+            return None
+        return PULSE_LEVELS.get(key, (self.settings.vss, self.settings.vdd))
+
+    def _wrap_trace(self, key: str, trace):
+        """Wraps an array in a trace buffer, compact for two-level traces
+        when `settings.storage['digital']` is set."""
+        if not isinstance(trace, np.ndarray):
+            return trace
+        if self._compact() and key in DIGITAL_TRACES:
+            return DigitalBuffer.from_array(trace, self._levels(key),
+                                            self.settings.storage['digital'])
+        return TraceBuffer.from_array(trace, ring=True)
+
+    def _start_fused(self, monitor: bool, sample_count: int,
+                     stop_on_lock: bool = False) -> int:
+        """Runs the loop with the fused engine and stores the traces.
+
+        With a lock detector the kernel runs in blocks of `LOCK_BLOCK` samples
+        and the detector checks every block, so an early stop happens at the
+        end of the block holding the stop sample. With a trace writer, a jitter
+        probe or outside memory mode the kernel runs in blocks of
+        `_chunk_size()` samples, each one streamed and probed while the next
+        one is simulated. In disk mode the blocks are not kept in memory, the
+        traces are mapped back from disk once the run is over, and in none
+        mode only the last block is kept. With compact digital traces the
+        blocks are also run in chunks, each one encoded as it is simulated.
+
+        :param monitor: If `True` every component io is filled, otherwise only
+            the Loop Filter output and the PLL output are kept.
+        :param sample_count: Number of samples to simulate.
+        :param stop_on_lock: If `True` the run stops once the lock detector
+            hold-off has elapsed.
+
+        **Returns**:
+            - int: The number of simulated samples.
+        """
+        compact = self._compact()
+        if self.lock is None and self.writer is None and self.probe is None and \
+                self._memory() and not compact:
+            traces, self.feedback = run_fused(components=self.components,
+                                              sample_count=sample_count,
+                                              monitor=monitor,
+                                              feedback=self.feedback)
+            self._assign_traces(traces, monitor)
+            return sample_count
+
+        block = LOCK_BLOCK if self.lock is not None else self._chunk_size()
+        memory, disk = self._memory(), self._disk()
+        blocks = []
+        done = 0
+        while done < sample_count:
+            count = min(block, sample_count - done)
+            traces, self.feedback = run_fused(components=self.components,
+                                              sample_count=count, monitor=True,
+                                              feedback=self.feedback)
+            if self.writer is not None:
+                self._stream(traces)
+            kept = traces if monitor else {key: traces[key] for key in ('lf', 'vco')}
+            if compact:
+                if not blocks:
+                    blocks = [{key: DigitalBuffer(self._levels(key),
+                                                  self.settings.storage['digital'],
+                                                  values.dtype, sample_count)
+                               if key in DIGITAL_TRACES else
+                               TraceBuffer(sample_count, dtype=values.dtype)
+                               for key, values in kept.items()}]
+                for key, values in kept.items():
+                    blocks[0][key].extend(values)
+            elif memory:
+                blocks.append(kept)
+            elif not disk:
+                blocks = [kept]
+            if self.probe is not None:
+                self.probe.process_block(traces['vco'])
+            done += count
+            if self.lock is None:
+                continue
+            self.lock.process_block(traces['lpd_a'], traces['lpd_b'],
+                                    traces['lf'])
+            if stop_on_lock and self.lock.locked and \
+                    self.lock.index >= self.lock.stop_index:
+                break
+        if len(blocks) == 1:
+            self._assign_traces(blocks[0], monitor)
+        elif blocks:
+            self._assign_traces({key: np.concatenate([block[key] for block in blocks])
+                                 for key in blocks[0]}, monitor)
+        return done
+
+    def _start_python(self, monitor: bool, sample_count: int, progress_bar=None,
+                      stop_on_lock: bool = False) -> int:
+        """Runs the loop by stepping every component object once per sample.
+
+        :param monitor: If `True` the components record their io.
+        :param sample_count: Number of samples to simulate.
+        :param progress_bar: Optional `tqdm` progress bar.
+        :param stop_on_lock: If `True` the run stops once the lock detector
+            hold-off has elapsed.
+
+        **Returns**:
+            - int: The number of simulated samples.
+        """
+        clk, lpd, lf, vco, div = (self.components['clk'], self.components['lpd'],
+                                  self.components['lf'], self.components['vco'],
+                                  self.components['div'])
+        if monitor:
+            clk_process, lpd_process, vco_process, div_process = (
+                clk._process_and_monitor, lpd._process_and_monitor,
+                vco._process_and_monitor, div._process_and_monitor)
+        else:
+            clk_process, lpd_process, vco_process, div_process = (
+                clk._process, lpd._process, vco._process, div._process)
+
+        chunk = self._chunk_size()
+        if monitor:
+            self.output = vco.io['output']
+        elif self._compact():
+            self.output = DigitalBuffer((self.settings.vss, self.settings.vdd),
+                                        self.settings.storage['digital'],
+                                        capacity=sample_count)
+        else:
+            self.output = TraceBuffer(sample_count if self._memory() else chunk,
+                                      ring=True)
+        output = None if monitor else self.output
+        lock = self.lock
+        probe = self.probe
+        writer = self.writer
+        div_out = self.feedback
+        count = 0
+        for _ in range(sample_count):
+            clk_out = clk_process(1)
+            lpd_out_a, lpd_out_b = lpd_process(clk_out, div_out)
+            lf_out = lf._process(lpd_out_a, lpd_out_b)
+            vco_out = vco_process(lf_out)
+            div_out = div_process(vco_out)
+
+            if output is not None:
+                output.append(vco_out)
+            if probe is not None:
+                probe._process(vco_out)
+            count += 1
+            if progress_bar is not None:
+                progress_bar.update(1)
+            if writer is not None and count % chunk == 0:
+                self._stream_buffers(count)
+            if lock is not None and lock._process(lpd_out_a, lpd_out_b, lf_out) \
+                    and stop_on_lock and lock.index >= lock.stop_index:
+                break
+        self.feedback = div_out
+        return count
+
+    def _run(self, engine: str, monitor: bool, sample_count: int,
+             progress_bar=None, stop_on_lock: bool = False):
+        """Runs `sample_count` samples from the current component state.
+
+        The loop starts from the divider output in `feedback`. Afterwards
+        `feedback` holds the last divider output, and `samples` is the number
+        of samples simulated since the components were built.
+
+        :param engine: 'python', 'fused' or 'event'.
+        :param monitor: If `True` every component io is filled.
+        :param sample_count: Number of samples to simulate.
+        :param progress_bar: Optional `tqdm` progress bar.
+        :param stop_on_lock: If `True` the run stops once the lock detector
+            hold-off has elapsed.
+        """
+        self.events = None
+        self.start_sample = self.samples
+        self.start_feedback = self.feedback
+        if engine == 'fused':
+            count = self._start_fused(monitor, sample_count, stop_on_lock)
+            if progress_bar is not None:
+                progress_bar.update(count)
+        elif engine == 'event':
+            self.events = EventEngine(self.components, self.settings)
+            self.feedback = self.events.run(sample_count, feedback=self.feedback,
+                                            progress=progress_bar)
+            count = sample_count
+            if monitor:
+                self.rebuild_io()
+        else:
+            count = self._start_python(monitor, sample_count, progress_bar,
+                                       stop_on_lock)
+        self.samples += count
+
+        if self.lock is not None:
+            self.lock_time = self.lock.lock_time
+            if self.lock_time is not None:
+                print(f'PLL locked at {self.lock_time:.3e} s')
+        self._update_time_array()
+
+    def _start_cached(self, engine: str, monitor: bool, stop_on_lock: bool,
+                      bypass_cache: bool, progress_bar=None):
+        """Runs a fresh simulation, or loads its result from the cache.
+
+        The cache configured by `settings.cache` is skipped when
+        `bypass_cache` is set, when phase noise is enabled without a seed
+        since the result would not be reproducible, outside memory mode where
+        the traces are not kept, and with a jitter probe whose statistics are
+        not cached.
+
+        :param engine: 'python', 'fused' or 'event'.
+        :param monitor: If `True` every component io is filled.
+        :param stop_on_lock: If `True` the run stops once the lock detector
+            hold-off has elapsed.
+        :param bypass_cache: If `True` the cache is neither read nor written.
+        :param progress_bar: Optional `tqdm` progress bar.
+        """
+        noisy = any(block[name] != 0 for block in (self.settings.clk, self.settings.vco)
+                    for name in ('white_phase_noise_spectral_density',
+                                 'low_frequency_phase_noise'))
+        cache = None
+        if not bypass_cache and self._memory() and self.probe is None and \
+                not (noisy and self.settings.seed is None):
+            cache = ResultCache.from_settings(self.settings)
+
+        if cache is not None:
+            key = ResultCache.key(self.settings, engine=engine, monitor=monitor,
+                                  detect_lock=self.lock is not None,
+                                  stop_on_lock=stop_on_lock)
+            entry = cache.load(key)
+            if entry is not None:
+                self._load_result(entry, monitor)
+                if progress_bar is not None:
+                    progress_bar.update(self.samples)
+                return
+
+        self._run(engine, monitor, self.settings.sample_count, progress_bar,
+                  stop_on_lock)
+        if cache is not None:
+            cache.store(key, self._result_arrays(monitor))
+
+    def _state_arrays(self) -> dict:
+        """Flattens the state of the components and of the loop."""
+        arrays = {'pll.feedback': self.feedback, 'pll.samples': self.samples}
+        for name, component in self.components.items():
+            for key, value in component.get_state().items():
+                arrays[f'{name}.{key}'] = np.asarray(value)
+        return arrays
+
+    def _set_state_arrays(self, arrays: dict):
+        """Restores a state flattened by `_state_arrays`."""
+        for name, component in self.components.items():
+            component.set_state({key.split('.', 1)[1]: value
+                                 for key, value in arrays.items()
+                                 if key.split('.', 1)[0] == name})
+        self.feedback = float(arrays['pll.feedback'])
+        self.samples = int(arrays['pll.samples'])
+
+    def _result_arrays(self, monitor: bool) -> dict:
+        """Collects the traces, final state and metrics of the last run."""
+        clk, lpd, lf, div = (self.components['clk'], self.components['lpd'],
+                             self.components['lf'], self.components['div'])
+        arrays = self._state_arrays()
+        arrays['pll.lock_time'] = np.nan if self.lock_time is None else self.lock_time
+        arrays['trace.lf'] = np.asarray(lf.io['output'])
+        arrays['trace.vco'] = np.asarray(self.output)
+        if monitor:
+            arrays['trace.clk'] = np.asarray(clk.io['output'])
+            arrays['trace.div'] = np.asarray(div.io['output'])
+            arrays['trace.lpd_a'] = np.asarray(lpd.io['output_a'])
+            arrays['trace.lpd_b'] = np.asarray(lpd.io['output_b'])
+        return arrays
+
+    def _load_result(self, arrays: dict, monitor: bool):
+        """Restores a run collected by `_result_arrays`."""
+        self._set_state_arrays(arrays)
+        self.events = None
+        self.start_sample = 0
+        self.start_feedback = 0
+        self._assign_traces({key[len('trace.'):]: value for key, value in arrays.items()
+                             if key.startswith('trace.')}, monitor)
+        lock_time = float(arrays['pll.lock_time'])
+        self.lock_time = None if np.isnan(lock_time) else lock_time
+        self._update_time_array()
+
+    def _setup_lock(self, engine: str, detect_lock: bool, stop_on_lock: bool):
+        """Creates the lock detector of a run if one is requested.
+
+        :raises ValueError: If lock detection is requested with the event engine.
+        """
+        self.lock = None
+        self.lock_time = None
+        if not (detect_lock or stop_on_lock):
+            return
+        if engine == 'event':
+            raise ValueError(
+                'Lock detection is not supported by the event engine')
+        self.lock = LockDetector(settings=self.settings)
+
+    def _setup_probe(self, engine: str, probe_jitter: bool):
+        """Creates the jitter probe of a run if one is requested.
+
+        The probed edge times count from the start of the simulation, see
+        `samples`.
+
+        :raises ValueError: If probing is requested with the event engine.
+        """
+        self.probe = None
+        if not probe_jitter:
+            return
+        if engine == 'event':
+            raise ValueError(
+                'Jitter probing is not supported by the event engine')
+        self.probe = JitterProbe(settings=self.settings)
+
+    @property
+    def time_array(self) -> np.ndarray:
+        """Time of every sample of the current traces, built on first use."""
+        if self._time_array is None:
+            # In none mode the traces only hold the end of the run.
+            start = self.start_sample if self._memory() else \
+                self.samples - len(self.output)
+            self._time_array = (start + np.arange(len(self.output))) * \
+                self.settings.time_step
+        return self._time_array
+
+    @time_array.setter
+    def time_array(self, value):
+        self._time_array = value
+
+    def _update_time_array(self):
+        """Matches the time array to the samples of the current traces."""
+        self._time_array = None
+
+    def _memory(self) -> bool:
+        """`True` if the whole traces are kept in memory, see `settings.storage`."""
+        return self.settings.storage['mode'] == 'memory'
+
+    def _compact(self) -> bool:
+        """`True` if two-level traces are kept in `DigitalBuffer` objects."""
+        return self._memory() and bool(self.settings.storage['digital'])
+
+    def _disk(self) -> bool:
+        """`True` if the traces are stored on disk, see `settings.storage`."""
+        return self.settings.storage['mode'] == 'disk'
+
+    def _chunk_size(self) -> int:
+        """Number of samples streamed at once to the trace writer."""
+        return WRITE_CHUNK if self._memory() else self.settings.storage['chunk']
+
+    def _check_engine(self, engine: str):
+        """Checks that `engine` exists and supports the storage mode.
+
+        :raises ValueError: If the engine or the storage mode is unknown, or
+            the event engine is used outside memory mode.
+        """
+        if engine not in ('python', 'fused', 'event'):
+            raise ValueError(
+                f'Unknown engine {engine}, use python, fused or event')
+        mode = self.settings.storage['mode']
+        if mode not in ('memory', 'disk', 'none'):
+            raise ValueError(
+                f'Unknown storage mode {mode}, use memory, disk or none')
+        if engine == 'event' and mode != 'memory':
+            raise ValueError(
+                'The event engine only supports traces kept in memory')
+
+    def _open_writer(self, save: bool, monitor: bool = True):
+        """Starts streaming the traces of the next run.
+
+        The traces go to `io_file` when they are saved in the binary format.
+        In disk mode they are streamed in any case, to `io_file` or to a file
+        in `settings.storage['path']`. Nothing is streamed otherwise, the CSV
+        format of `settings.log['format']` is written by `_save_io`.
+
+        :param save: If `True` the traces of the next run are saved.
+        :param monitor: If `False` only the LF and VCO outputs are streamed.
+        """
+        self.writer = None
+        self._buffer_start = 0
+        binary = save and not self.io_file.endswith('.csv')
+        if not (binary or self._disk()):
+            return
+        path = self.io_file
+        if not binary:
+            folder = self.settings.storage['path'] or self.settings.log['log_path']
+            path = os.path.join(folder, f'{self.settings.name}_pll_{self.id}_traces.json')
+        nodes = TRACE_HEADERS if monitor else ('time', 'lf', 'vco')
+        dtypes = {key: np.uint8 if key in ('lpd_a', 'lpd_b') else np.float64
+                  for key in nodes}
+        pyramid = [key for key in nodes if key != 'time'] \
+            if self.settings.storage['pyramid'] else ()
+        self.writer = TraceWriter(path, nodes=dtypes, headers=TRACE_HEADERS,
+                                  metadata={'name': self.settings.name,
+                                            'time_step': self.settings.time_step,
+                                            'start_sample': self.samples},
+                                  pyramid=pyramid)
+
+    def _close_writer(self):
+        """Streams the samples left in the buffers and closes the writer.
+
+        In disk mode the traces of the run are then mapped back from the
+        written files.
+        """
+        if self.writer is None:
+            return
+        self._stream_buffers(self.samples - self.start_sample)
+        path = self.writer.close()
+        self.writer = None
+        self.traces_path = path
+        if self._disk():
+            traces = load_traces(path)
+            self._assign_traces(traces, monitor='clk' in traces)
+            self._time_array = traces['time']
+
+    def _io_buffers(self) -> dict:
+        """Returns the buffers of the monitored traces."""
+        clk, lpd, lf, div = (self.components['clk'], self.components['lpd'],
+                             self.components['lf'], self.components['div'])
+        return {'clk': clk.io['output'], 'div': div.io['output'],
+                'lpd_a': lpd.io['output_a'], 'lpd_b': lpd.io['output_b'],
+                'lf': lf.io['output'], 'vco': self.output}
+
+    def _io_traces(self, start: int, stop: int) -> dict:
+        """Returns views of the monitored traces between `start` and `stop`,
+        decoded copies for compact digital traces."""
+        return {key: buffer[start:stop] for key, buffer in self._io_buffers().items()}
+
+    def _stream(self, traces: dict):
+        """Queues the next chunk of traces on the trace writer."""
+        start = self.start_sample + self.writer.samples
+        chunk = {'time': (start + np.arange(len(traces['vco']))) *
+                 self.settings.time_step}
+        chunk.update((key, traces[key]) for key in self.writer.nodes if key != 'time')
+        self.writer.write(chunk)
+
+    def _stream_buffers(self, stop: int):
+        """Streams the buffered samples of the run up to sample `stop`.
+
+        Outside memory mode the samples are copied and the buffers are
+        cleared, so they never hold more than one chunk.
+        """
+        start = self.writer.samples
+        if start >= stop:
+            return
+        traces = self._io_traces(start - self._buffer_start,
+                                 stop - self._buffer_start)
+        if not self._memory():
+            traces = {key: np.array(values) for key, values in traces.items()}
+            for component in self.components.values():
+                for buffer in component.io.values():
+                    buffer.clear()
+            self.output.clear()
+            self._buffer_start = stop
+        self._stream(traces)
+
+    def _save_io(self):
+        """Writes the monitored traces of the last run to a CSV `io_file`.
+
+        Traces saved in the binary format are streamed during the run, so
+        nothing is left to do for them. The CSV file is written chunk by
+        chunk, so compact digital traces are only decoded one chunk at a time.
+        """
+        if not self.io_file.endswith('.csv'):
+            return
+        traces = self._io_buffers()
+        save_io(io_arrays=[self.time_array] + [traces[key] for key in TRACE_HEADERS
+                                               if key != 'time'],
+                headers=list(TRACE_HEADERS.values()),
+                io_file=self.io_file,
+                names=list(TRACE_HEADERS))
+
+    def rebuild_io(self):
+        """Rebuilds the dense io traces of the last event-driven run.
+
+        The event engine only records the samples around phase detector edges.
+        This method expands them to one value per `time_step` and stores them
+        in the components' io and in `output`, so `show` and
+        `Calculator.calculate_jitter` can be used as after any other run.
+        It does nothing if there is no pending event run.
+        """
+        if self.events is None:
+            return
+        events, self.events = self.events, None
+        self._assign_traces(events.rebuild(), monitor=True)
+        self._update_time_array()
+
+    def start_and_monitor(self, engine: str = 'python', save: bool = True,
+                          progress: bool = True, detect_lock: bool = False,
+                          stop_on_lock: bool = False, bypass_cache: bool = False,
+                          probe_jitter: bool = False):
         """Starts the PLL simulation and monitors the progress.
 
         This method runs the PLL simulation while tracking the progress using 
@@ -133,94 +726,309 @@ class Pll:
 
             pll = Pll(settings)
             pll.start_and_monitor()
-
-        :raises ValueError: If the simulation does not complete successfully.
+            pll.start_and_monitor(engine='fused')
+            pll.start_and_monitor(stop_on_lock=True)
+
+        :param engine: 'python' steps every component object per sample,
+            'fused' runs the loop in the compiled kernel from
+            `pllpython.components.engine` and 'event' jumps from edge to edge
+            with `pllpython.components.event`.
+        :param save: If `True` the monitored traces are written to `io_file`.
+        :param progress: If `True` a progress bar is displayed.
+        :param detect_lock: If `True` a `LockDetector` configured by
+            `settings.lock` watches the loop and `lock_time` is set.
+        :param stop_on_lock: If `True` the lock detector is enabled and the run
+            stops once lock is declared and `settings.lock['hold_off']` has
+            elapsed.
+        :param bypass_cache: If `True` the result cache configured by
+            `settings.cache` is neither read nor written.
+        :param probe_jitter: If `True` a `JitterProbe` configured by
+            `settings.probe` measures the jitter of the VCO output during the
+            run and is kept in `probe`. The cache is then skipped.
+
+        :raises ValueError: If an unknown engine is requested, or lock
+            detection, jitter probing or traces outside memory are requested
+            with the event engine.
         """
-        self.update_logger()
+        self._check_engine(engine)
+        self._setup_lock(engine, detect_lock, stop_on_lock)
+        self._setup_probe(engine, probe_jitter)
+        # pylint: disable=C0415
+        from tqdm import tqdm
+
+        self.update_logger(csv=save)
+        self._build_components()
+        self._open_writer(save)
+
         progress_bar = tqdm(total=self.settings.sample_count,
                             desc='LOCKING PLL',
-                            position=0)
-        clk = Vco(settings=self.settings, clk=True)
-        lpd = Lpd(settings=self.settings)
-        lf = LoopFilter(settings=self.settings)
-        vco = Vco(settings=self.settings)
-        div = Divider(settings=self.settings)
+                            position=0,
+                            disable=not progress)
+        self._start_cached(engine, True, stop_on_lock, bypass_cache, progress_bar)
+        self._close_writer()
+        if save:
+            self._save_io()
+
+    def start(self, engine: str = 'python', detect_lock: bool = False,
+              stop_on_lock: bool = False, bypass_cache: bool = False,
+              probe_jitter: bool = False):
+        """Starts the PLL simulation without progress monitoring.
 
-        self.components = {'clk': clk, 'lpd': lpd,
-                           'lf': lf, 'vco': vco, 'div': div}
+        This method runs the PLL simulation and stores the VCO output for
+        visualization, without displaying the progress bar.
 
-        lf_out = 0
-        div_out = 0
-        for _ in range(self.settings.sample_count):
-            clk_out = clk._process_and_monitor(1)
-            lpd_out_a, lpd_out_b = lpd._process_and_monitor(clk_out, div_out)
-            lf_out = lf._process(lpd_out_a, lpd_out_b)
-            vco_out = vco._process_and_monitor(lf_out)
-            div_out = div._process_and_monitor(vco_out)
+        **Example:**
 
-            self.output.append(vco_out)
-            progress_bar.update(1)
+        .. code-block:: python
 
-        save_io(io_arrays=[np.arange(0, self.settings.time_step*len(self.output),
-                                     self.settings.time_step),
-                           clk.io['output'],
-                           div.io['output'],
-                           lpd.io['output_a'],
-                           lpd.io['output_b'],
-                           lf.io['output'],
-                           vco.io['output']],
-                headers=['Time', 'CLK Output', 'Divider Output', 'LPD Output A',
-                         'LPD Output B', 'Loop Filter Output', 'VCO Output'],
-                io_file=self.io_file)
+            pll = Pll(settings)
+            pll.start()
+            pll.start(engine='fused')
+            pll.start(engine='event')
+            pll.start(engine='fused', stop_on_lock=True)
+            pll.start(engine='fused', probe_jitter=True)
+            print(pll.probe.summary())
+
+        :param engine: 'python' steps every component object per sample,
+            'fused' runs the loop in the compiled kernel from
+            `pllpython.components.engine` and 'event' jumps from edge to edge
+            with `pllpython.components.event`.
+        :param detect_lock: If `True` a `LockDetector` configured by
+            `settings.lock` watches the loop and `lock_time` is set.
+        :param stop_on_lock: If `True` the lock detector is enabled and the run
+            stops once lock is declared and `settings.lock['hold_off']` has
+            elapsed.
+        :param bypass_cache: If `True` the result cache configured by
+            `settings.cache` is neither read nor written.
+        :param probe_jitter: If `True` a `JitterProbe` configured by
+            `settings.probe` measures the jitter of the VCO output during the
+            run and is kept in `probe`. The cache is then skipped.
+
+        :raises ValueError: If an unknown engine is requested, or lock
+            detection, jitter probing or traces outside memory are requested
+            with the event engine.
+        """
+        self._check_engine(engine)
+        self._setup_lock(engine, detect_lock, stop_on_lock)
+        self._setup_probe(engine, probe_jitter)
+        self.update_logger()
+        self._build_components()
+        self._open_writer(save=False, monitor=False)
+        self._start_cached(engine, False, stop_on_lock, bypass_cache)
+        self._close_writer()
 
-    def start(self):
-        """Starts the PLL simulation without progress monitoring.
+        print('PLL Locked')
 
-        This method runs the PLL simulation and stores the VCO output for
-        visualization, without displaying the progress bar.
+    def extend(self, extra_samples: int, engine: str = 'python', save: bool = False,
+               probe_jitter: bool = False):
+        """Continues the last run for `extra_samples` more samples.
+
+        The components carry on from their current state, so the loop does
+        not go through the lock transient again. The io of the components and
+        `output` then hold the new samples only, and `time_array` continues
+        from the end of the previous run.
 
         **Example:**
 
         .. code-block:: python
 
             pll = Pll(settings)
-            pll.start()
+            pll.start_and_monitor(engine='fused')
+            pll.extend(extra_samples=5_000_000, engine='fused')
+
+        :param extra_samples: Number of samples to simulate.
+        :param engine: 'python', 'fused' or 'event', see `start_and_monitor`.
+        :param save: If `True` the new traces are written to a new `io_file`.
+        :param probe_jitter: If `True` the jitter probe of the previous run
+            carries on, or a new one is created, see `start`.
+
+        :raises ValueError: If an unknown engine is requested, the event engine
+            is requested outside memory mode or with a probe, or the PLL has not
+            been started yet.
+        """
+        self._check_engine(engine)
+        if self.components['vco'] is None:
+            raise ValueError('The PLL has not been started yet')
+        probe = self.probe if probe_jitter else None
+        self._setup_probe(engine, probe_jitter)
+        if probe is not None:
+            self.probe = probe
+        elif self.probe is not None:
+            self.probe.index = self.samples
+        self.rebuild_io()
+        self.lock = None
+        self.lock_time = None
+        self.update_logger(csv=save)
+        capacity = extra_samples if self._memory() else self._chunk_size()
+        for component in self.components.values():
+            component.io = {key: buffer.empty_like(capacity)
+                            for key, buffer in component.io.items()}
+        self._open_writer(save)
+        self._run(engine, True, extra_samples)
+        self._close_writer()
+        if save:
+            self._save_io()
+
+    def _segment(self) -> dict:
+        """Returns zero-copy views of the current traces."""
+        self.rebuild_io()
+        segment = {'output': np.asarray(self.output)}
+        for name, component in self.components.items():
+            for key, buffer in component.io.items():
+                segment[f'{name}.{key}'] = np.asarray(buffer)
+        return segment
+
+    def fork(self, overrides: dict = None) -> 'Pll':
+        """Creates a copy of the running PLL that continues with new parameters.
+
+        The fork gets its own copy of the settings, updated with `overrides`,
+        and fresh components holding the current internal state of this PLL's
+        components. Continue it with `extend`. The traces recorded so far are
+        not copied: the fork keeps views of them in `prefix`, and `history`
+        joins them with the fork's own traces on request. The branches of a
+        PLL continue the same phase noise streams, so they differ only by
+        their parameters; reseed them with `Vco.seed` for independent noise.
+
+        **Example:**
+
+        .. code-block:: python
+
+            pll = Pll(settings)
+            pll.start_and_monitor(engine='fused', stop_on_lock=True)
+            for density in [1e-10, 3e-10, 1e-9]:
+                branch = pll.fork({('vco', 'white_phase_noise_spectral_density'): density})
+                branch.extend(extra_samples=1_000_000, engine='fused')
+
+        :param overrides: Parameter values keyed by `(block, parameter)`, with
+            the block named as in `components`.
+
+        :raises ValueError: If the PLL has not been started yet.
 
-        :raises ValueError: If the simulation does not complete successfully.
+        **Returns**:
+            - Pll: The forked PLL.
         """
-        self.update_logger()
-        clk = Vco(settings=self.settings, clk=True)
-        lpd = Lpd(settings=self.settings)
-        lf = LoopFilter(settings=self.settings)
-        vco = Vco(settings=self.settings)
-        div = Divider(settings=self.settings)
+        if self.components['vco'] is None:
+            raise ValueError('The PLL has not been started yet')
+        settings = copy.deepcopy(self.settings)
+        for (block, parameter), value in (overrides or {}).items():
+            settings.set_block_parameter(block=block, parameter=parameter,
+                                         value=value)
+
+        branch = Pll(settings=settings, scope_fit=self.scope.sizing_mode)
+        branch._build_components()
+        for name, component in self.components.items():
+            branch.components[name].set_state(component.get_state())
+        branch.feedback = self.feedback
+        branch.samples = self.samples
+        branch.start_sample = self.samples
+        branch.prefix = self.prefix + [self._segment()]
+        return branch
+
+    def history(self, name: str = 'output') -> np.ndarray:
+        """Returns a trace from the start of the simulation.
+
+        The prefix inherited through `fork` is joined with the current traces,
+        which copies them.
+
+        :param name: 'output' for the PLL output, or `'<component>.<io key>'`,
+            e.g. 'lf.output' or 'lpd.output_a'.
+
+        **Returns**:
+            - np.ndarray: The full trace.
+        """
+        return np.concatenate([segment[name] for segment in self.prefix] +
+                              [self._segment()[name]])
 
-        self.components = {'clk': clk, 'lpd': lpd,
-                           'lf': lf, 'vco': vco, 'div': div}
+    def save_checkpoint(self, path: str):
+        """Saves the complete simulation state to a compressed `.npz` file.
 
-        lf_out = 0
-        div_out = 0
-        for _ in range(self.settings.sample_count):
-            clk_out = clk._process(1)
-            lpd_out_a, lpd_out_b = lpd._process(clk_out, div_out)
-            lf_out = lf._process(lpd_out_a, lpd_out_b)
-            vco_out = vco._process(lf_out)
-            div_out = div._process(vco_out)
+        The checkpoint holds the internal state of every component, the last
+        divider output and the number of simulated samples. The position of
+        the phase noise sources is part of the CLK and VCO state. Traces are
+        not included.
 
-            self.output.append(vco_out)
+        :param path: Path of the checkpoint file.
 
-        print('PLL Locked')
+        :raises ValueError: If the PLL has not been started yet.
+        """
+        if self.components['vco'] is None:
+            raise ValueError('The PLL has not been started yet')
+        arrays = self._state_arrays()
+        arrays['pll.time_step'] = self.settings.time_step
+        np.savez_compressed(path, **arrays)
+
+    def resume(self, path: str, extra_samples: int, engine: str = 'python',
+               save: bool = False):
+        """Restores a checkpoint and continues the run from it.
+
+        The components are rebuilt from the current settings, then their state,
+        including the position of the phase noise sources, is restored from
+        the checkpoint before `extend` simulates `extra_samples` samples.
+
+        **Example:**
+
+        .. code-block:: python
+
+            pll.save_checkpoint('locked.npz')
+            ...
+            pll = Pll(settings)
+            pll.resume('locked.npz', extra_samples=5_000_000, engine='fused')
+
+        :param path: Path of a file written by `save_checkpoint`.
+        :param extra_samples: Number of samples to simulate.
+        :param engine: 'python', 'fused' or 'event', see `start_and_monitor`.
+        :param save: If `True` the new traces are written to a new `io_file`.
 
-    def show(self, plot_type=None, sim_type='PLL', input=None):
+        :raises ValueError: If the checkpoint was saved with another time step.
+        """
+        with np.load(path) as checkpoint:
+            arrays = {key: checkpoint[key] for key in checkpoint.files}
+        if float(arrays['pll.time_step']) != self.settings.time_step:
+            raise ValueError(
+                f'Checkpoint time step {float(arrays["pll.time_step"])} does not '
+                f'match the settings time step {self.settings.time_step}')
+
+        self._build_components()
+        self._set_state_arrays(arrays)
+        self.extend(extra_samples, engine=engine, save=save)
+
+    def _pyramids(self, sim_type: str = 'PLL', input=None) -> dict:
+        """Returns the min/max pyramids of the plotted traces, keyed by node.
+
+        In disk mode they are mapped from the files written next to the
+        traces, otherwise they are built from the buffers.
+        """
+        pyramids = {}
+        if self._disk() and self.traces_path is not None:
+            pyramids = load_pyramids(self.traces_path)
+        if not pyramids:
+            pyramids = {key: TracePyramid.from_array(buffer)
+                        for key, buffer in self._io_buffers().items()}
+        if sim_type != 'PLL':
+            pyramids.pop('clk', None)
+            pyramids = {'input': TracePyramid.from_array(np.asarray(input)), **pyramids}
+        return pyramids
+
+    def show(self, plot_type=None, sim_type='PLL', input=None, max_points=None):
         """Generates and displays plots of the simulation outputs.
 
         This method generates plots for the various components of the PLL system
         (CLK, Divider, LPD outputs, Loop Filter, and VCO). The plots can be generated
         either locally using `matplotlib` or via a web-based interface using `Bokeh`.
 
+        Traces longer than `max_points` are decimated first (see
+        `pllpython.utils.decimate`): the two-level nodes keep every edge when
+        the budget allows it, the loop filter output uses LTTB and the other
+        traces keep the extremes of every bucket.
+
         :param plot_type: The type of plot to generate. Options are:
             - 'local': Uses matplotlib for local plotting.
             - 'web': Uses Bokeh for web-based visualization.
+            - 'server': Starts a local Bokeh server redrawing the visible
+              time range while zooming, see `PyramidView`. It blocks until
+              the server is stopped.
+        :param max_points: Largest number of points drawn per trace,
+            `Scope.max_points` if `None`.
 
         **Example:**
 
@@ -229,126 +1037,79 @@ class Pll:
             pll = Pll(settings)
             pll.show(plot_type='local')  # For local plotting.
             pll.show(plot_type='web')  # For web-based plotting.
+            pll.show(plot_type='server')  # For zooming into long runs.
 
         :raises ValueError: If an invalid plot_type is provided.
         """
-        self.time_array = self.settings.time_array
+        # pylint: disable=C0415
+        self.rebuild_io()
         if input is None:
             input = []
+        if max_points is None:
+            max_points = self.scope.max_points
 
         if plot_type is None:
             plot_type = self.settings.global_plot_mode
 
+        if plot_type == 'server':
+            start_time = self.time_array[0] if len(self.output) else 0.0
+            PyramidView(self._pyramids(sim_type, input),
+                        titles=dict(TRACE_HEADERS, input='Data Input'),
+                        time_step=self.settings.time_step, start_time=float(start_time),
+                        points=max_points).serve()
+            return
+
+        # Title, trace, decimation mode and color of every plot.
+        if sim_type == 'PLL':
+            first = ('CLK Output', self.components['clk'].io['output'], 'digital')
+        else:
+            first = ('Data Input', input, 'minmax')
+        plots = [first + ('b',),
+                 (f'Divider Output- {self.settings.divider}',
+                  self.components['div'].io['output'], 'digital', 'r'),
+                 ('LPD Output A', self.components['lpd'].io['output_a'], 'digital', 'g'),
+                 ('LPD Output B', self.components['lpd'].io['output_b'], 'digital', 'm'),
+                 (f'Loop Filter Output - {self.settings.lf}',
+                  self.components['lf'].io['output'], 'lttb', 'c'),
+                 (f'VCO Output - {self.settings.vco}',
+                  self.components['vco'].io['output'], 'digital', 'c')]
+        time_array = self.time_array
+        series = []
+        for title, trace, mode, color in plots:
+            indices, values = decimate(trace, max_points, mode)
+            series.append((title, time_array[indices], values, mode, color))
+
         if plot_type == 'local':
+            from matplotlib import pyplot as plt
+
             fig, axes = plt.subplots(6, 1, figsize=(6, 10))
-            if (sim_type == 'PLL'):
-                axes[0].plot(self.time_array,
-                             self.components['clk'].io['output'], color='b')
-                axes[0].set_title('CLK Output', loc='left')
-            else:
-                axes[0].plot(self.time_array,
-                             input, color='b')
-                axes[0].set_title('Data Input', loc='left')
-            axes[0].grid(True)
-            axes[1].plot(self.time_array, self.components['div'].io['output'],
-                         color='r')
-            axes[1].set_title(
-                f'Divider Output- {self.settings.divider}', loc='left')
-            axes[1].grid(True)
-            axes[2].plot(self.time_array,
-                         self.components['lpd'].io['output_a'], color='g')
-            axes[2].set_title('LPD Output A', loc='left')
-            axes[2].grid(True)
-
-            axes[3].plot(self.time_array,
-                         self.components['lpd'].io['output_b'], color='m')
-            axes[3].set_title('LPD Output B', loc='left')
-            axes[3].grid(True)
-
-            axes[4].plot(self.time_array,
-                         self.components['lf'].io['output'], color='c')
-            axes[4].set_title(
-                f'Loop Filter Output - {self.settings.lf}', loc='left')
-            axes[4].grid(True)
-
-            axes[5].plot(self.time_array,
-                         self.components['vco'].io['output'], color='c')
-            axes[5].set_title(f'VCO Output - {self.settings.vco}', loc='left')
-            axes[5].grid(True)
+            for axis, (title, x_arr, y_arr, mode, color) in zip(axes, series):
+                axis.plot(x_arr, y_arr, color=color,
+                          drawstyle='steps-post' if mode == 'digital' else 'default')
+                axis.set_title(title, loc='left')
+                axis.grid(True)
             plt.tight_layout()
-            plt.savefig(self.io_file[:-3]+"png", dpi=300, bbox_inches='tight')
+            plt.savefig(os.path.splitext(self.io_file)[0] + '.png', dpi=300, bbox_inches='tight')
             plt.show()
 
         elif plot_type == 'web':
-            if (sim_type == 'PLL'):
-                input_f = figure(title='CLK Output', x_axis_label='Seconds', y_axis_label='Volts',
-                                 width=800, height=200, sizing_mode='scale_both')
-
-                input_f.step(self.time_array, [*self.components['clk'].io['output']],
-                             line_width=2,
-                             mode='center')
-
-                input_f.xaxis.formatter = get_time_format()
-                input_f.yaxis.formatter = get_volts_format()
-            else:
-                input_f = figure(title='Data Input', x_axis_label='Seconds', y_axis_label='Volts',
-                                 width=800, height=200, sizing_mode='scale_both')
-
-                input_f.step(self.time_array, input,
-                             line_width=2,
-                             mode='center')
-
-            div_f = figure(title='Divider Output', x_axis_label='Seconds', y_axis_label='Volts',
-                           width=800, height=200, sizing_mode='scale_both')
-
-            div_f.step(self.time_array, [*self.components['div'].io['output']],
-                       line_width=2,
-                       mode='center')
-
-            div_f.xaxis.formatter = get_time_format()
-            div_f.yaxis.formatter = get_volts_format()
-
-            lpd_a_f = figure(title='LPD Output A', x_axis_label='Seconds', y_axis_label='Volts',
-                             width=800, height=200, sizing_mode='scale_both')
-
-            lpd_a_f.step(self.time_array, [*self.components['lpd'].io['output_a']],
-                         line_width=2,
-                         mode='center')
-            lpd_a_f.xaxis.formatter = get_time_format()
-            lpd_a_f.yaxis.formatter = get_volts_format()
-
-            lpd_b_f = figure(title='LPD Output B', x_axis_label='Seconds', y_axis_label='Volts',
-                             width=800, height=200, sizing_mode='scale_both')
-
-            lpd_b_f.step(self.time_array, [*self.components['lpd'].io['output_b']],
-                         line_width=2,
-                         mode='center')
-            lpd_b_f.xaxis.formatter = get_time_format()
-            lpd_b_f.yaxis.formatter = get_volts_format()
-
-            lf_f = figure(title='Loop Filter Output', x_axis_label='Seconds', y_axis_label='Volts',
-                          width=800, height=200, sizing_mode='scale_both')
-
-            lf_f.line(self.time_array, [*self.components['lf'].io['output']],
-                      line_width=2)
-            lf_f.xaxis.formatter = get_time_format()
-            lf_f.yaxis.formatter = get_volts_format()
-
-            vco_f = figure(title='VCO Output', x_axis_label='Seconds', y_axis_label='Volts',
-                           width=800, height=200, sizing_mode='scale_both')
-
-            vco_f.step(self.time_array, [*self.components['vco'].io['output']],
-                       line_width=2,
-                       mode='center')
-            vco_f.xaxis.formatter = get_time_format()
-            vco_f.yaxis.formatter = get_volts_format()
-            layout = gridplot([[input_f],
-                               [div_f],
-                               [lpd_a_f],
-                               [lpd_b_f],
-                               [lf_f],
-                               [vco_f]], sizing_mode='scale_both')
-
-            output_file(filename=self.io_file[:-3]+"html")
+            from bokeh.plotting import figure, show, output_file, save
+            from bokeh.layouts import gridplot
+            from ..utils.formatter import get_time_format, get_volts_format
+
+            figures = []
+            for title, x_arr, y_arr, mode, _ in series:
+                plot = figure(title=title, x_axis_label='Seconds', y_axis_label='Volts',
+                              width=800, height=200, sizing_mode='scale_both')
+                if mode == 'digital':
+                    plot.step(x_arr, y_arr, line_width=2, mode='after')
+                else:
+                    plot.line(x_arr, y_arr, line_width=2)
+                plot.xaxis.formatter = get_time_format()
+                plot.yaxis.formatter = get_volts_format()
+                figures.append([plot])
+            layout = gridplot(figures, sizing_mode='scale_both')
+
+            output_file(filename=os.path.splitext(self.io_file)[0] + '.html')
             save(layout)
             show(layout)
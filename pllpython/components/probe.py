@@ -0,0 +1,203 @@
+"""Jitter Probe Class.
+
+This class models a jitter probe attached to the output of the VCO of a
+phase-locked loop (PLL) while it is simulated.
+
+The probe only keeps the edges of the output. Every edge updates running
+statistics of its time interval error (TIE), the deviation from an ideal clock
+with the nominal period, and of the period, with Welford's algorithm, and is fed
+to a streaming `PhaseNoiseAnalyzer`. The memory used does not depend on the
+length of the run, so the jitter of a long run can be measured without keeping
+its traces (see `settings.storage['mode'] = 'none'`).
+"""
+import numpy as np
+from ..utils.phase_noise import PhaseNoiseAnalyzer
+
+# pylint: disable=R0902
+
+
+class JitterProbe:
+    """
+    Jitter Probe Class.
+
+    The edges are placed on the sample grid, at the first sample past the
+    middle of the supply. The nominal period is `settings.probe['period']`,
+    e.g. the reference period divided by the division ratio for a locked loop.
+    When it is `None` it is estimated from the first `segment` edges, which
+    are held back until then.
+
+    :param settings: Configuration object containing the `probe` settings.
+
+    **Attributes**:
+        - `edges` (str): 'rising' or 'both', the edges that are probed.
+        - `analyzer` (PhaseNoiseAnalyzer): The streaming phase noise spectrum.
+        - `count` (int): Number of edges processed so far.
+        - `index` (int): Number of samples processed so far.
+        - `edge_times` (list): Edge times in seconds, only kept when
+          `settings.probe['keep_edges']` is `True`.
+    """
+
+    def __init__(self, settings):
+        """
+        Initialize the Jitter Probe with the given settings.
+
+        :param settings: Configuration object containing `probe` settings like
+            `edges`, `period`, `segment`, `overlap`, `window` and `keep_edges`,
+            and the simulation `time_step`, `vss` and `vdd`.
+
+        :raises ValueError: If `edges` is neither 'rising' nor 'both'.
+        """
+        probe = settings.probe
+        if probe['edges'] not in ('rising', 'both'):
+            raise ValueError(f"Unknown edges {probe['edges']}, use rising or both")
+        self.time_step: float = settings.time_step
+        self.threshold: float = (settings.vss + settings.vdd) / 2
+        self.edges: str = probe['edges']
+        self.analyzer = PhaseNoiseAnalyzer(period=probe['period'],
+                                           edges_per_cycle=1 if self.edges == 'rising' else 2,
+                                           segment=probe['segment'],
+                                           overlap=probe['overlap'],
+                                           window=probe['window'])
+        self.edge_times = [] if probe['keep_edges'] else None
+
+        self.index: int = 0
+        self.last = None
+        self.count: int = 0
+        self.origin: float = None
+        self.previous: float = None
+        self._held = []
+        self._tie = np.zeros(3)
+        self._tie_min = np.inf
+        self._tie_max = -np.inf
+        self._period = np.zeros(3)
+
+    @property
+    def period(self) -> float:
+        """Nominal period between two probed edges, `None` until known."""
+        return self.analyzer.period
+
+    @property
+    def tie_mean(self) -> float:
+        """Mean TIE in seconds."""
+        return float(self._tie[1])
+
+    @property
+    def tie_std(self) -> float:
+        """Standard deviation of the TIE in seconds."""
+        return float(np.sqrt(self._tie[2] / self._tie[0])) if self._tie[0] else np.nan
+
+    @property
+    def tie_rms(self) -> float:
+        """RMS TIE in seconds."""
+        return float(np.sqrt(self.tie_mean ** 2 + self.tie_std ** 2))
+
+    @property
+    def tie_peak_to_peak(self) -> float:
+        """Peak-to-peak TIE in seconds."""
+        return float(self._tie_max - self._tie_min)
+
+    @property
+    def period_mean(self) -> float:
+        """Mean time between two probed edges in seconds."""
+        return float(self._period[1])
+
+    @property
+    def period_std(self) -> float:
+        """Standard deviation of the time between two probed edges in seconds."""
+        return float(np.sqrt(self._period[2] / self._period[0])) if self._period[0] else np.nan
+
+    @staticmethod
+    def _welford(moments: np.ndarray, values: np.ndarray):
+        """Merges `values` into the count, mean and M2 held by `moments`."""
+        count = len(values)
+        if count == 0:
+            return
+        mean = np.mean(values)
+        total = moments[0] + count
+        delta = mean - moments[1]
+        moments[2] += np.sum((values - mean) ** 2) + delta ** 2 * moments[0] * count / total
+        moments[1] += delta * count / total
+        moments[0] = total
+
+    def _add_edges(self, times: np.ndarray):
+        """Updates the statistics and the spectrum with new edge times."""
+        if self.edge_times is not None:
+            self.edge_times.append(times)
+        if self.previous is not None:
+            self._welford(self._period, np.diff(times, prepend=self.previous))
+        elif len(times) > 1:
+            self._welford(self._period, np.diff(times))
+        self.previous = times[-1]
+
+        if self.period is None:
+            self._held.append(times)
+            held = np.concatenate(self._held)
+            if len(held) < self.analyzer.segment:
+                return
+            self._held = []
+            times = held
+            first = held[:self.analyzer.segment]
+            self.analyzer.period = (first[-1] - first[0]) / (len(first) - 1)
+        if self.origin is None:
+            self.origin = times[0]
+        tie = (times - self.origin) - \
+            np.arange(self.count, self.count + len(times)) * self.period
+        self.count += len(times)
+        self._welford(self._tie, tie)
+        self._tie_min = min(self._tie_min, float(np.min(tie)))
+        self._tie_max = max(self._tie_max, float(np.max(tie)))
+        self.analyzer.add_tie(tie)
+
+    def _process(self, input_a: float):
+        """
+        Process one sample of the VCO output.
+
+        :param input_a: VCO output sample.
+        """
+        high = input_a > self.threshold
+        last, self.last = self.last, high
+        if last is not None and high != last and (self.edges == 'both' or high):
+            self._add_edges(np.array([self.index * self.time_step]))
+        self.index += 1
+
+    def process_block(self, input_a: np.ndarray):
+        """
+        Process a block of samples, with the same result as `_process`.
+
+        :param input_a: VCO output samples.
+        """
+        high = np.asarray(input_a) > self.threshold
+        if len(high) == 0:
+            return
+        previous = np.concatenate(([high[0] if self.last is None else self.last],
+                                   high[:-1]))
+        changed = high != previous
+        if self.edges == 'rising':
+            changed &= high
+        positions = np.flatnonzero(changed)
+        if len(positions):
+            self._add_edges((self.index + positions) * self.time_step)
+        self.last = bool(high[-1])
+        self.index += len(high)
+
+    def spectrum(self) -> tuple:
+        """
+        Returns the phase noise of the probed edges, see `PhaseNoiseAnalyzer`.
+
+        **Returns**:
+            - tuple: The offset frequencies in Hz and `L(f)` in dBc/Hz.
+        """
+        return self.analyzer.spectrum()
+
+    def summary(self) -> dict:
+        """
+        Returns the jitter statistics of the probed edges.
+
+        **Returns**:
+            - dict: The number of `edges`, `tie_mean`, `tie_std`, `tie_rms`,
+              `tie_peak_to_peak`, `period_mean` and `period_std`, in seconds.
+        """
+        return {'edges': self.count, 'tie_mean': self.tie_mean,
+                'tie_std': self.tie_std, 'tie_rms': self.tie_rms,
+                'tie_peak_to_peak': self.tie_peak_to_peak,
+                'period_mean': self.period_mean, 'period_std': self.period_std}
@@ -7,14 +7,16 @@ oscillator's internal mechanism that processes the input over time, with
 additional monitoring capabilities for inputs and outputs.
 """
 import os
-from collections import deque
-from math import pi, cos, sqrt
-import pytest
+from bisect import bisect_left
+from math import pi, cos, sqrt, floor
 import numpy as np
-from random import gauss
-from scipy import signal
+from ..utils.noise import NoiseSource, FlickerNoise
+from ..utils.trace import TraceBuffer
 # pylint: disable=W1203
 
+# Number of samples whose phase is accumulated at once by `Vco.start`.
+START_BLOCK = 1 << 16
+
 
 class Vco:
     """
@@ -39,8 +41,11 @@ class Vco:
         - `vdd` (float): The upper bound of the VCO output.
         - `last` (float): The last computed value used for calculating the next 
           output.
-        - `io` (dict): A dictionary containing deques for storing input and 
-          output samples, used for monitoring the system.
+        - `io` (dict): A dictionary containing trace buffers for storing input
+          and output samples, used for monitoring the system.
+        - `noise` (NoiseSource): The source of the phase noise draws.
+        - `flicker` (FlickerNoise): The flicker noise added to the white phase
+          noise draws, or `None` when `flicker_corner` is 0.
     """
 
     def __init__(self, settings: object, clk: bool = False):
@@ -59,14 +64,16 @@ class Vco:
             `False`.
 
         **Attributes**:
+            - `is_clk` (bool): Whether the clock settings are used.
             - `k_vco_time` (float): The time scaling factor for the VCO.
             - `angular_time` (float): The angular frequency of the VCO.
             - `vss` (float): The lower voltage bound of the output.
             - `vdd` (float): The upper voltage bound of the output.
             - `last` (float): The last accumulated value used for output generation.
-            - `io` (dict): A dictionary containing deques for storing input and 
-              output samples during simulation.
+            - `io` (dict): A dictionary containing trace buffers for storing
+              input and output samples during simulation.
         """
+        self.is_clk: bool = clk
         self.sample_count: int = settings.sample_count
         self.k_vco_time: float = float(settings.clk['k_vco'] * 2 * pi *
                                        settings.time_step if clk else settings.vco['k_vco'] *
@@ -78,8 +85,9 @@ class Vco:
         self.vdd: float = float(settings.vdd)
         self.last: float = 0
         self.last_output: int = 0
-        self.io = {'input': deque([], maxlen=settings.sample_count),
-                   'output': deque([], maxlen=settings.sample_count)}
+        self.io = {'input': TraceBuffer.for_settings(settings),
+                   'output': TraceBuffer.for_settings(
+                       settings, levels=(self.vss, self.vdd))}
  
 
         #input and output needed for noise
@@ -92,17 +100,16 @@ class Vco:
                         if clk else settings.vco['white_phase_noise_spectral_density'])
         self.n1: float = float(settings.clk['low_frequency_phase_noise'] 
                         if clk else settings.vco['low_frequency_phase_noise'])
+        block = settings.clk if clk else settings.vco
+        self.flicker_corner: float = float(block.get('flicker_corner', 0))
+        self.flicker_slope: float = float(block.get('flicker_slope', 1))
         self.white_noise: float = float(0)
         self.add_noise_flag: int = 0
 
         self.low_freq_noise: float = 0
-        self.filter_numerator: float = [1]
-        self.filter_denominator: float = [1, 1]
-        self.filter_conditions: float = [0] #signal.lfilter_zi(self.filter_numerator, 
-                                            #self.filter_denominator)
-
-
-        
+        # State of the first-order low-frequency noise filter 1 / (1 + z^-1).
+        self.filter_conditions: float = 0.0
+        self.seed()
 
 
     def _process_and_monitor(self, input_a: float) -> float:
@@ -162,33 +169,208 @@ class Vco:
 
         return out
 
+    def update_settings(self, settings):
+        """
+        Re-derives the oscillator parameters from `settings`.
+
+        The internal state returned by `get_state` and the io buffers are
+        kept, so a running simulation continues with the new parameters.
+
+        :param settings: The new configuration object.
+        """
+        state = self.get_state()
+        io, noise = self.io, self.noise
+        self.__init__(settings, clk=self.is_clk)
+        self.seed(noise)
+        self.set_state(state)
+        self.io = io
+
+    def get_state(self) -> dict:
+        """
+        Returns the internal state of the oscillator.
+
+        **Returns**:
+            - dict: The accumulated phase, last output and noise state.
+        """
+        return {'last': self.last,
+                'last_output': self.last_output,
+                'white_noise': self.white_noise,
+                'low_freq_noise': self.low_freq_noise,
+                'filter_conditions': np.ravel(self.filter_conditions).astype(float),
+                'noise': self.noise.get_state(),
+                'flicker': '' if self.flicker is None else self.flicker.get_state()}
+
+    def set_state(self, state: dict):
+        """
+        Restores an internal state returned by `get_state`.
+
+        :param state: The state to restore.
+        """
+        self.last = float(state['last'])
+        self.last_output = float(state['last_output'])
+        self.white_noise = float(state['white_noise'])
+        self.low_freq_noise = float(state['low_freq_noise'])
+        self.filter_conditions = float(np.ravel(state['filter_conditions'])[0])
+        if 'noise' in state:
+            self.noise.set_state(state['noise'])
+        if self.flicker is not None and str(state.get('flicker', '')):
+            self.flicker.set_state(state['flicker'])
+
+    def seed(self, seed=None):
+        """
+        Restarts the phase noise of the oscillator from a new stream.
+
+        With a `flicker_corner` and white phase noise, the flicker noise is
+        drawn from a child stream of the new one, at the nominal edge rate of
+        the oscillator (mid-supply control voltage, or 1 for the CLK).
+
+        :param seed: A `NoiseSource` to draw from, or the seed of a new one
+            (an int, a sequence of ints, a `numpy.random.SeedSequence`, or
+            `None` for fresh entropy).
+        """
+        self.noise = seed if isinstance(seed, NoiseSource) else NoiseSource(seed)
+        self.flicker = None
+        if self.flicker_corner > 0 and self.h0 != 0:
+            control = 1 if self.is_clk else (self.vss + self.vdd) / 2
+            self.flicker = FlickerNoise(corner=self.flicker_corner,
+                                        slope=self.flicker_slope,
+                                        sample_rate=(self.k_vco * control + self.fo) / pi,
+                                        seed=self.noise.seed_sequence.spawn(1)[0],
+                                        block_size=self.noise.block_size)
+
     def start(self, input_array: np.ndarray):
         """
         Process an array of input samples with maximum vectorization.
 
-        This implementation is fully vectorized but changes the behavior
-        of the oscillator compared to the original sequential algorithm, as it
-        calculates all phase accumulations at once rather than sequentially.
+        The output is identical to calling `_process` on every sample,
+        including the phase noise drawn at every output toggle, and the
+        noise source is left at the same position. The phase is accumulated
+        with `np.cumsum` block by block. Without phase noise the output follows
+        from the phase in closed form; with phase noise the toggles are found
+        one after the other, by bisecting the monotonic phase for the next
+        zero crossing of the noisy cosine, so the Python work is proportional
+        to the number of toggles rather than to the number of samples.
 
         It saves the output directly into io.['output]
         :param input_array: Array of input control voltages to the VCO.
 
-        :return: Array of output values of the VCO after processing the inputs.
+        **Returns**:
+            - None
+        """
+        self.io['input'] = TraceBuffer.from_array(input_array)
+        inputs = np.asarray(input_array, dtype=float)
+        output = np.empty(len(inputs))
+        for begin in range(0, len(inputs), START_BLOCK):
+            block = inputs[begin:begin + START_BLOCK]
+            output[begin:begin + len(block)] = self._start_block(block)
+        self.io['output'] = TraceBuffer.from_array(output)
+
+    def _output_values(self, phase: np.ndarray) -> np.ndarray:
+        """Output of every phase sample with the current noise, as `_process`."""
+        cosine = np.cos((phase + self.white_noise) + self.low_freq_noise)
+        # np.cos may round differently from math.cos, which only matters for
+        # the sign of values next to zero.
+        for index in np.flatnonzero(np.abs(cosine) < 1e-12):
+            cosine[index] = cos((phase[index] + self.white_noise) + self.low_freq_noise)
+        return self.vss + (self.vdd - self.vss) * (cosine < 0)
+
+    def _start_block(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Processes one block of `start`, see there.
+
+        :param inputs: The input control voltages of the block.
+
+        **Returns**:
+            - np.ndarray: The output of the block.
+        """
+        if not len(inputs):
+            return np.empty(0)
+        increments = inputs * self.k_vco_time + self.angular_time
+        if self.h0 == 0 and self.n1 == 0:
+            phase = np.cumsum(np.concatenate(([self.last], increments)))[1:]
+            output = self._output_values(phase)
+            self.last = float(phase[-1])
+            self.last_output = float(output[-1])
+            return output
+        if np.any(increments < 0):
+            # The phase goes backwards, so it cannot be bisected.
+            return np.array([self._process(input_a=value) for value in inputs.tolist()])
+
+        phase = np.cumsum(np.concatenate(([self.last], increments)))[1:].tolist()
+        control = inputs.tolist()
+        vss, swing = self.vss, self.vdd - self.vss
+        sigma_w, sigma_n = sqrt(self.h0 / 2), sqrt(self.n1 / 2)
+        white, low = self.white_noise, self.low_freq_noise
+        zi = self.filter_conditions
+        normal = self.noise.normal
+        flicker = None if self.flicker is None else self.flicker.normal
+        last_output = self.last_output
+        starts, values = [0], [last_output]
+
+        index = 0
+        count = len(phase)
+        while index < count:
+            out = vss + swing * (cos(phase[index] + white + low) < 0)
+            if out == last_output:
+                # The output holds until the next zero crossing of the cosine.
+                offset = white + low
+                crossing = (floor((phase[index] + offset - pi / 2) / pi) + 1.5) * pi
+                candidate = max(bisect_left(phase, crossing - offset, index + 1), index + 1)
+                while candidate > index + 1 and \
+                        vss + swing * (cos(phase[candidate - 1] + white + low) < 0) != last_output:
+                    candidate -= 1
+                while candidate < count and \
+                        vss + swing * (cos(phase[candidate] + white + low) < 0) == last_output:
+                    candidate += 1
+                index = candidate
+                continue
+
+            # Same draws and arithmetic as `add_white_noise` and
+            # `add_low_freq_noise`.
+            target_frequency = (self.k_vco * control[index]) + self.fo
+            if self.h0 != 0:
+                draw = normal()
+                if flicker is not None:
+                    draw += flicker()
+                white = (draw * sigma_w) * sqrt(target_frequency)
+            if self.n1 != 0:
+                low = (normal() * sigma_n) * sqrt(target_frequency) - (low + zi)
+                zi = -low
+            last_output = out
+            starts.append(index)
+            values.append(out)
+            index += 1
+
+        self.last = phase[-1]
+        self.last_output = last_output
+        self.white_noise, self.low_freq_noise = white, low
+        self.filter_conditions = zi
+        lengths = np.diff(np.append(starts, count))
+        return np.repeat(np.array(values, dtype=float), lengths)
+
+    def phase_trace(self) -> np.ndarray:
+        """
+        Returns the accumulated phase of the oscillator at every recorded sample.
+
+        The phase is rebuilt from the recorded input and anchored on the current
+        phase, so the recorded input must end at the last simulated sample. The
+        phase noise offsets are not included, so it is exact for noise-free
+        oscillators. Pass it to `Calculator.calculate_jitter` to place the
+        output transitions between samples.
 
         **Returns**:
-            - np.ndarray: Array of output values of the VCO after processing 
-              the inputs.
+            - np.ndarray: The phase in radians, aligned with `io['output']`.
         """
-        self.io['input'] = input_array
-        increments = input_array * self.k_vco_time + self.angular_time
-        phase_values = np.cumsum(increments) + self.last
-        self.last = phase_values[-1]
-        cos_values = np.cos(phase_values)
-        self.io['output'] = self.vss + (self.vdd - self.vss) * (cos_values < 0)
+        phase = np.cumsum(np.asarray(self.io['input'], dtype=float) * self.k_vco_time +
+                          self.angular_time)
+        if len(phase):
+            phase += self.last - phase[-1]
+        return phase
 
     def add_white_noise(self, input_a):
         """
         This function adds white noise to the output. Inputs are setup in the settings.py file.
+        The flicker noise, when enabled, is added to the white draw.
 
         :return: a value to be added to the integral in the VCO
 
@@ -197,8 +379,10 @@ class Vco:
         """
         if self.h0 != 0:
             target_frequency = (self.k_vco*input_a) + self.fo
-            random_number = gauss(0, sqrt(self.h0/2))
-            self.white_noise = random_number * sqrt(target_frequency)
+            random_number = self.noise.normal()
+            if self.flicker is not None:
+                random_number += self.flicker.normal()
+            self.white_noise = (random_number * sqrt(self.h0/2)) * sqrt(target_frequency)
 
 
     def add_low_freq_noise(self, input_a):
@@ -212,11 +396,12 @@ class Vco:
         """
         if self.n1 != 0:
             target_frequency = (self.k_vco*input_a) + self.fo
-            random_number = gauss(0, sqrt(self.n1/2))
-            pre_filter_noise = [self.low_freq_noise, random_number * sqrt(target_frequency)]
-            result, self.filter_conditions = signal.lfilter(self.filter_numerator, 
-                        self.filter_denominator, pre_filter_noise, zi = self.filter_conditions)
-            self.low_freq_noise = result[1]
+            random_number = self.noise.normal() * sqrt(self.n1/2)
+            pre_filter_noise = random_number * sqrt(target_frequency)
+            # Closed form of lfilter([1], [1, 1]) over [low_freq_noise, pre_filter_noise]
+            # from the filter state: only the second output is kept.
+            self.low_freq_noise = pre_filter_noise - (self.low_freq_noise + self.filter_conditions)
+            self.filter_conditions = -self.low_freq_noise
 
 
     def unit_test(self, test_path):
@@ -233,5 +418,7 @@ class Vco:
         """
         print("Testing VCO")
         if os.path.isfile(path=test_path):
+            # pylint: disable=C0415
+            import pytest
             return pytest.main(["-s", "--durations=0", test_path])
         return f'File {test_path} does not exist'
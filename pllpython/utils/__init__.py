@@ -1,8 +1,17 @@
+from .cache import ResultCache
 from .calculator import Calculator
 from .comparators import cross_correlation, mse
+from .digital import DigitalBuffer
+from .edges import EdgeTrace
 from .formatter import get_freq_format, get_time_format, get_volts_format
 from .logger import setup_log, save_io
+from .noise import NoiseSource, FlickerNoise
+from .phase_noise import PhaseNoiseAnalyzer
+from .pyramid import TracePyramid, load_pyramids
 from .scope import Scope
 from .settings import Settings
+from .trace import TraceBuffer
+from .viewer import PyramidView
+from .writer import TraceWriter, export_csv, load_traces
 from .sweeper import Sweeper
 from .tutorial import install_tutorial
@@ -0,0 +1,178 @@
+"""Result Cache
+
+This module provides `ResultCache`, a content-addressed on-disk cache for the
+results of `Pll.start` and `Pll.start_and_monitor`.
+
+A result is stored under the SHA-256 of a canonical form of the simulation
+settings (`Settings.get_settings`), the library version, the RNG seed and the
+run options. Entries are compressed `.npz` files holding the traces, the final
+state of the components and the run metrics. The total size of the cache is
+bounded, and the least recently used entries are evicted first.
+"""
+import os
+import json
+import time
+import hashlib
+import numpy as np
+from .. import __version__
+
+# Settings that do not change the simulated signals.
+IGNORED_SETTINGS = ('name', 'log', 'global_plot_mode', 'cache', 'storage',
+                    'probe')
+IGNORED_KEYS = ('plot_mode', 'id')
+
+
+def canonical_settings(settings) -> str:
+    """
+    Returns a canonical JSON form of the settings that affect a simulation.
+
+    Logging, plotting and identification entries are left out, and dictionary
+    keys are sorted so equal settings always give the same string.
+
+    :param settings: Simulation settings.
+
+    **Returns**:
+        - str: The canonical JSON string.
+    """
+    values = {}
+    for key, value in settings.get_settings().items():
+        if key in IGNORED_SETTINGS:
+            continue
+        if isinstance(value, dict):
+            value = {name: item for name, item in value.items()
+                     if name not in IGNORED_KEYS}
+        values[key] = value
+    return json.dumps(values, sort_keys=True, default=repr)
+
+
+class ResultCache:
+    """
+    Content-addressed, size-bounded cache of simulation results.
+
+    :param path: Directory holding the cache entries, created if needed.
+    :param max_bytes: Largest total size of the entries. The least recently
+        used entries are removed when a new entry makes the cache larger.
+
+    **Attributes**:
+        - `path` (str): Directory holding the cache entries.
+        - `max_bytes` (int): Largest total size of the entries.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1_000_000_000):
+        """
+        Initialize the cache in the directory `path`.
+
+        :param path: Directory holding the cache entries.
+        :param max_bytes: Largest total size of the entries.
+        """
+        self.path = os.path.expanduser(path)
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.path, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings) -> 'ResultCache':
+        """
+        Creates the cache configured by `settings.cache`.
+
+        :param settings: Simulation settings.
+
+        **Returns**:
+            - ResultCache: The cache, or `None` if `settings.cache['path']` is
+              `None`.
+        """
+        config = getattr(settings, 'cache', None) or {}
+        if config.get('path') is None:
+            return None
+        return cls(path=config['path'],
+                   max_bytes=config.get('max_bytes', 1_000_000_000))
+
+    @staticmethod
+    def key(settings, **options) -> str:
+        """
+        Hashes the settings, library version, seed and run options.
+
+        :param settings: Simulation settings.
+        :param options: Run options that change the result, e.g. the engine.
+
+        **Returns**:
+            - str: The hexadecimal SHA-256 key.
+        """
+        content = json.dumps({'settings': canonical_settings(settings),
+                              'version': __version__,
+                              'options': options},
+                             sort_keys=True, default=repr)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f'{key}.npz')
+
+    def load(self, key: str) -> dict:
+        """
+        Returns the arrays stored under `key` and marks the entry as used.
+
+        :param key: Key returned by `ResultCache.key`.
+
+        **Returns**:
+            - dict: The stored arrays, or `None` on a miss.
+        """
+        file = self._file(key)
+        try:
+            with np.load(file) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        _touch(file)
+        return arrays
+
+    def store(self, key: str, arrays: dict):
+        """
+        Stores `arrays` under `key`, then evicts entries over the size bound.
+
+        :param key: Key returned by `ResultCache.key`.
+        :param arrays: Arrays to store, keyed by name.
+        """
+        file = self._file(key)
+        temporary = f'{file[:-4]}.{os.getpid()}.tmp.npz'
+        np.savez_compressed(temporary, **arrays)
+        os.replace(temporary, file)
+        _touch(file)
+        self.evict()
+
+    def entries(self) -> list:
+        """
+        Lists the cache entries, least recently used first.
+
+        **Returns**:
+            - list: Tuples of last use time, size in bytes and file path.
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith('.npz') or '.tmp.' in name:
+                continue
+            file = os.path.join(self.path, name)
+            stat = os.stat(file)
+            entries.append((stat.st_mtime_ns, stat.st_size, file))
+        return sorted(entries)
+
+    def evict(self):
+        """Removes the least recently used entries over `max_bytes`."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, file in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(file)
+            total -= size
+
+    def clear(self):
+        """Removes every entry."""
+        for _, _, file in self.entries():
+            os.remove(file)
+
+
+def _touch(file: str):
+    """Marks `file` as used now, with the full resolution of the clock."""
+    # The kernel stamps writes with a coarse clock, so entries used in
+    # quick succession could otherwise share the same time.
+    now = time.time_ns()
+    os.utime(file, ns=(now, now))
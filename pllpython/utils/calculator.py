@@ -1,14 +1,24 @@
 """Calculator Module
 
-This module defines the Calculator class for computing jitter metrics
-based on input signals.
+This module defines the Calculator class for computing jitter and phase noise
+metrics based on input signals.
 """
 
 import numpy as np
+from .edges import EdgeTrace
+from .phase_noise import PhaseNoiseAnalyzer
+from .decimate import decimate
 from .scope import Scope
 
 scope = Scope()
 
+# Samples scanned at once for transitions, so memory-mapped traces are never
+# loaded whole.
+CHUNK_SIZE = 1 << 20
+
+# Default number of edges per Welch segment of `Calculator.phase_noise`.
+PHASE_NOISE_SEGMENT = 1024
+
 
 class Calculator:
     """A calculator class for computing jitter and phase noise metrics."""
@@ -21,54 +31,149 @@ class Calculator:
         """
         self.settings = settings
 
-    def calculate_jitter(self, input_array, start_time: int = None, stop_time: int = None, plot: bool = True):
+    def _crossings(self, input_array, start_time: int = None, stop_time: int = None,
+                   phase=None) -> tuple:
+        """
+        Finds the transitions of a signal, see `calculate_jitter`. The edges
+        of an `EdgeTrace` are used as they are.
+
+        **Returns**:
+            - tuple: The transition times in samples and the sliced input array.
+        """
+        if start_time is not None and stop_time is not None:
+            start_sample = round(start_time / self.settings.time_step)
+            stop_sample = round(stop_time / self.settings.time_step)
+            input_array = input_array[start_sample:stop_sample]
+            if phase is not None:
+                phase = phase[start_sample:stop_sample]
+        if isinstance(input_array, EdgeTrace):
+            transitions = input_array.edges
+        else:
+            transitions = []
+            for start in range(0, len(input_array), CHUNK_SIZE):
+                chunk = np.asarray(input_array[max(start - 1, 0):start + CHUNK_SIZE])
+                transitions.append(np.flatnonzero(chunk[1:] != chunk[:-1]) +
+                                   max(start, 1))
+            transitions = np.concatenate(transitions) if transitions else np.array([])
+        if phase is not None and len(transitions):
+            before = np.asarray(phase[transitions - 1], dtype=float)
+            after = np.asarray(phase[transitions], dtype=float)
+            # Last pi / 2 + k * pi boundary passed by the phase.
+            boundary = (np.floor((after - np.pi / 2) / np.pi) + 0.5) * np.pi
+            fraction = np.clip((boundary - before) / (after - before), 0, 1)
+            transitions = transitions - 1 + fraction
+        return transitions, input_array
+
+    def calculate_jitter(self, input_array, start_time: int = None, stop_time: int = None, plot: bool = True,
+                         phase=None):
         """
         Compute jitter and phase noise from an input signal.
 
-        :param input_array: Input signal array.
+        :param input_array: Input signal array, or an `EdgeTrace`.
         :param start_time: Optional; Start index for slicing the input array.
         :param stop_time: Optional; Stop index for slicing the input array.
         :param plot: Optional; If True, plots the signals and phase noise spectrum.
+        :param phase: Optional; Phase of the oscillator driving `input_array` at
+            every sample, e.g. `Vco.phase_trace()`. The transitions are then
+            placed where the phase crosses pi / 2 modulo pi, by linear
+            interpolation between samples, instead of on the sample grid.
         :return: Tuple containing jitter and standard deviation of jitter.
+
+        The input is scanned in chunks of `CHUNK_SIZE` samples, so it can be a
+        memory-mapped trace larger than the memory. Only the samples of `phase`
+        around the transitions are read. The plotted spectrum is the one
+        returned by `phase_noise`.
         """
-        if start_time is not None and stop_time is not None:
-            start_sample = round(start_time / self.settings.time_step)
-            stop_sample = round(stop_time / self.settings.time_step)
-            input_array = input_array[start_sample:stop_sample]
-        total_time = 0
-        cross_zero = []
-        last_cross = 0
-
-        for index, sample in enumerate(input_array[1:], 1):
-            total_time += self.settings.time_step
-            if sample != input_array[index-1]:
-                cross_zero.append(total_time - last_cross)
-                last_cross = total_time
+        transitions, input_array = self._crossings(input_array, start_time, stop_time, phase)
+        # Intervals between transitions; the start of the trace is not one.
+        cross_zero = np.diff(transitions * self.settings.time_step)
         mean_cross = np.mean(cross_zero)
         jitter_sequence = np.divide(np.subtract(
             cross_zero, mean_cross), mean_cross)
 
-        phase_noise = np.fft.fft(jitter_sequence)
-        cross_period = (self.settings.time_step *
-                        len(input_array)) / len(cross_zero)
-        phase_noise_freq = np.fft.fftfreq(len(phase_noise), cross_period)
-
         jitter = np.sqrt(np.mean(np.square(jitter_sequence)))
         std_dev = np.mean(np.absolute(jitter_sequence))
 
-        bin_size = phase_noise_freq[1] - phase_noise_freq[0]
-        phase_noise = np.divide(phase_noise, bin_size)
-
-        index_min = np.argmin(abs(phase_noise))
-        phase_noise[index_min] = phase_noise[index_min+1]
-
         if plot:
-            scope.add_signal(np.arange(0, len(input_array)*self.settings.time_step, self.settings.time_step), input_array,
+            indices, values = decimate(input_array, scope.max_points, 'digital')
+            scope.add_signal(indices * self.settings.time_step, values,
                              name='Input', x_label='Time', y_label='Voltage', plot_type=self.settings.global_plot_mode)
 
-            scope.add_signal(phase_noise_freq, 10*np.log(abs(phase_noise), out=abs(phase_noise), where=abs(phase_noise) > 0),
-                             'Phase Noise', 'Frequency Offset (Hz)', 'Phase Noise (dB/Hz)', self.settings.global_plot_mode)
+            frequencies, phase_noise, _ = self._phase_noise(
+                transitions, segment=min(PHASE_NOISE_SEGMENT, len(transitions)))
+            scope.add_signal(frequencies, phase_noise, 'Phase Noise', 'Frequency Offset (Hz)',
+                             'Phase Noise (dBc/Hz)', self.settings.global_plot_mode)
 
             scope.show(plot_type=self.settings.global_plot_mode)
 
         return jitter, std_dev
+
+    def phase_noise(self, input_array, start_time: int = None, stop_time: int = None, phase=None,
+                    segment: int = PHASE_NOISE_SEGMENT, overlap: float = 0.5, window='hann',
+                    bands=()) -> tuple:
+        """
+        Compute the phase noise spectrum of a clock signal with Welch's method.
+
+        Both edges of the signal are used, with the transitions found as in
+        `calculate_jitter`, and fed to a `PhaseNoiseAnalyzer` in chunks of
+        `CHUNK_SIZE` edges. The nominal period is the mean half period.
+
+        :param input_array: Input signal array, or an `EdgeTrace`.
+        :param start_time: Optional; Start index for slicing the input array.
+        :param stop_time: Optional; Stop index for slicing the input array.
+        :param phase: Optional; Phase of the oscillator, see `calculate_jitter`.
+        :param segment: Optional; Edges per Welch segment.
+        :param overlap: Optional; Fraction of a segment shared with the next one.
+        :param window: Optional; Window name or values.
+        :param bands: Optional; `(low, high)` offset frequency pairs in Hz over
+            which the RMS jitter is integrated.
+        :return: Tuple containing the offset frequencies in Hz, the phase noise
+            `L(f)` in dBc/Hz and the RMS jitter in seconds of every band.
+
+        :raises ValueError: If the signal has fewer transitions than `segment`.
+        """
+        transitions, _ = self._crossings(input_array, start_time, stop_time, phase)
+        return self._phase_noise(transitions, segment=segment, overlap=overlap,
+                                 window=window, bands=bands)
+
+    def _phase_noise(self, transitions: np.ndarray, bands=(), **options) -> tuple:
+        """Runs a `PhaseNoiseAnalyzer` over transition times in samples."""
+        edges = transitions * self.settings.time_step
+        period = (edges[-1] - edges[0]) / (len(edges) - 1) if len(edges) > 1 else None
+        analyzer = PhaseNoiseAnalyzer(period=period, edges_per_cycle=2, **options)
+        for start in range(0, len(edges), CHUNK_SIZE):
+            analyzer.add_edges(edges[start:start + CHUNK_SIZE])
+        frequencies, phase_noise = analyzer.spectrum()
+        return frequencies, phase_noise, analyzer.rms_jitter(bands)
+
+    def calculate_lock_time(self, reference, feedback, tolerance: float = 0.01):
+        """
+        Compute the time at which the feedback locks onto the reference.
+
+        The phase error is the delay between every rising edge of `feedback`
+        and the closest rising edge of `reference`. The loop is considered
+        locked from the first edge after which this error stays below
+        `tolerance` reference periods until the end of the signals.
+
+        :param reference: Reference signal array (e.g. the CLK output).
+        :param feedback: Feedback signal array (e.g. the Divider output).
+        :param tolerance: Optional; Allowed phase error, as a fraction of the
+            mean reference period.
+        :return: The lock time in seconds, or `None` if the loop never locks.
+        """
+        reference_edges = np.flatnonzero(np.diff(np.asarray(reference)) > 0)
+        feedback_edges = np.flatnonzero(np.diff(np.asarray(feedback)) > 0)
+        if len(reference_edges) < 2 or len(feedback_edges) == 0:
+            return None
+
+        period = np.mean(np.diff(reference_edges))
+        closest = np.clip(np.searchsorted(reference_edges, feedback_edges),
+                          1, len(reference_edges) - 1)
+        error = np.minimum(np.abs(feedback_edges - reference_edges[closest - 1]),
+                           np.abs(feedback_edges - reference_edges[closest]))
+        unlocked = np.flatnonzero(error > tolerance * period)
+        if len(unlocked) == 0:
+            return float((feedback_edges[0] + 1) * self.settings.time_step)
+        if unlocked[-1] == len(feedback_edges) - 1:
+            return None
+        return float((feedback_edges[unlocked[-1] + 1] + 1) * self.settings.time_step)
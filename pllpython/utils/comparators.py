@@ -5,6 +5,11 @@ This module provides functions for calculating the normalized mean square error
 """
 
 import numpy as np
+from .edges import EdgeTrace
+
+# Samples processed at once by `mse`, so memory-mapped traces are never
+# loaded whole.
+CHUNK_SIZE = 1 << 20
 
 
 def mse(data_1: np.ndarray, data_2: np.ndarray) -> float:
@@ -12,7 +17,9 @@ def mse(data_1: np.ndarray, data_2: np.ndarray) -> float:
 
     This function computes the Mean Square Error (MSE) between two input datasets,
     normalizes the MSE by the maximum possible error, and returns the normalized 
-    MSE as a percentage.
+    MSE as a percentage. The datasets are processed in chunks of `CHUNK_SIZE`
+    samples, so they can be memory-mapped traces larger than the memory. Two
+    `EdgeTrace` datasets are compared run by run, without expanding them.
 
     :param data_1: First dataset (list or array).
     :param data_2: Second dataset (list or array).
@@ -32,13 +39,32 @@ def mse(data_1: np.ndarray, data_2: np.ndarray) -> float:
     if len(data_1) != len(data_2):
         raise ValueError("Input data arrays must have the same length.")
 
-    mse_out = np.mean((np.array(data_1) - np.array(data_2)) ** 2)
-    max_possible_error = np.max(
-        np.abs(np.array(data_1) - np.array(data_2)))
+    if isinstance(data_1, EdgeTrace) and isinstance(data_2, EdgeTrace):
+        squared_error, max_possible_error = _edge_errors(data_1, data_2)
+        mse_out = squared_error / len(data_1)
+        return 100 * (1 - mse_out / (max_possible_error ** 2))
+
+    squared_error = np.float64(0)
+    max_possible_error = np.float64(0)
+    for start in range(0, len(data_1), CHUNK_SIZE):
+        error = np.asarray(data_1[start:start + CHUNK_SIZE], dtype=float) - \
+            np.asarray(data_2[start:start + CHUNK_SIZE], dtype=float)
+        squared_error += np.dot(error, error)
+        max_possible_error = max(max_possible_error, np.max(np.abs(error)))
+    mse_out = squared_error / len(data_1)
     normalized_mse = 100 * (1 - mse_out / (max_possible_error ** 2))
     return normalized_mse
 
 
+def _edge_errors(data_1: EdgeTrace, data_2: EdgeTrace) -> tuple:
+    """Sum of the squared errors and largest error between two edge traces."""
+    starts = np.union1d(np.union1d(data_1.edges, data_2.edges), [0])
+    lengths = np.diff(np.append(starts, len(data_1)))
+    error = np.subtract(*(np.where(data.levels_at(starts), data.high, data.low)
+                          for data in (data_1, data_2)))
+    return np.dot(lengths, error ** 2), np.max(np.abs(error[lengths > 0]), initial=0)
+
+
 def cross_correlation(data_1: np.ndarray, data_2: np.ndarray, mode: str = 'valid') -> float:
     """Calculate the cross-correlation between two datasets.
 
@@ -0,0 +1,151 @@
+"""Plot Decimation
+
+This module reduces long traces to a few thousand points before they are
+plotted, so `Pll.show` and `Scope` stay fast and the Bokeh HTML files small.
+
+- `minmax` keeps the smallest and the largest sample of every bucket of
+  consecutive samples, so no spike or edge disappears.
+- `lttb` keeps one sample per bucket with the Largest-Triangle-Three-Buckets
+  algorithm, which follows the shape of smooth analog signals such as the loop
+  filter output.
+- `digital` keeps the two samples around every edge of a two-level signal when
+  they fit in the budget, which draws it exactly, and falls back to `minmax`
+  otherwise.
+
+Every function returns the indices of the kept samples and their values, so
+the caller picks the matching times. The traces are read in chunks of
+`CHUNK_SIZE` samples, so memory-mapped traces and `DigitalBuffer` objects are
+never loaded whole, except by `lttb`.
+"""
+import numpy as np
+from .edges import EdgeTrace
+
+# Samples read at once.
+CHUNK_SIZE = 1 << 20
+
+
+def _gather(trace, indices: np.ndarray) -> np.ndarray:
+    """Reads the samples at sorted `indices`, one chunk at a time."""
+    values = []
+    for start in range(0, len(trace), CHUNK_SIZE):
+        first, last = np.searchsorted(indices, [start, start + CHUNK_SIZE])
+        if first < last:
+            chunk = np.asarray(trace[start:min(start + CHUNK_SIZE, int(indices[last - 1]) + 1)])
+            values.append(chunk[indices[first:last] - start])
+    return np.concatenate(values) if values else np.empty(0)
+
+
+def minmax(trace, points: int) -> tuple:
+    """
+    Keeps the extremes of every bucket of consecutive samples.
+
+    :param trace: The samples, any sliceable trace.
+    :param points: Largest number of points returned, at least 2.
+
+    **Returns**:
+        - tuple: The sorted indices of the kept samples and their values.
+    """
+    count = len(trace)
+    if count <= points:
+        return np.arange(count), np.asarray(trace[0:count])
+    size = -(-count // max(points // 2, 1))
+    step = max(CHUNK_SIZE // size, 1) * size
+    indices, values = [], []
+    for start in range(0, count, step):
+        chunk = np.asarray(trace[start:start + step])
+        padded = -(-len(chunk) // size) * size
+        buckets = np.concatenate((chunk, np.repeat(chunk[-1:], padded - len(chunk))))
+        buckets = buckets.reshape(-1, size)
+        low, high = buckets.argmin(axis=1), buckets.argmax(axis=1)
+        pairs = np.sort(np.stack((low, high), axis=1), axis=1)
+        pairs = np.minimum(pairs + np.arange(0, padded, size)[:, None], len(chunk) - 1)
+        kept = np.unique(pairs)
+        indices.append(kept + start)
+        values.append(chunk[kept])
+    return np.concatenate(indices), np.concatenate(values)
+
+
+def lttb(trace, points: int) -> tuple:
+    """
+    Keeps one sample per bucket with the Largest-Triangle-Three-Buckets
+    algorithm.
+
+    The first and the last samples are kept. Every bucket then keeps the sample
+    forming the largest triangle with the sample kept in the previous bucket
+    and the mean of the next bucket. The samples are equally spaced in time.
+
+    :param trace: The samples, any sliceable trace.
+    :param points: Number of points returned, at least 3.
+
+    **Returns**:
+        - tuple: The sorted indices of the kept samples and their values.
+    """
+    count = len(trace)
+    if count <= points or points < 3:
+        return minmax(trace, max(points, 2))
+    values = np.asarray(trace[0:count], dtype=float)
+    bounds = np.linspace(1, count - 1, points - 1).astype(np.int64)
+    means = np.add.reduceat(values[1:count - 1], bounds[:-1] - 1) / np.diff(bounds)
+    means = np.append(means, values[-1])
+    kept = np.empty(points, dtype=np.int64)
+    kept[0], kept[-1] = 0, count - 1
+    for bucket in range(points - 2):
+        start, stop = bounds[bucket], bounds[bucket + 1]
+        previous = kept[bucket]
+        target = (bounds[bucket + 1] + bounds[bucket + 2]) / 2 if bucket + 2 < len(bounds) \
+            else count - 1
+        # Twice the area of the triangles, up to the sign.
+        area = np.abs((previous - target) * (values[start:stop] - values[previous]) -
+                      (previous - np.arange(start, stop)) * (means[bucket + 1] - values[previous]))
+        kept[bucket + 1] = start + int(np.argmax(area))
+    return kept, values[kept]
+
+
+def digital(trace, points: int) -> tuple:
+    """
+    Keeps the samples around every edge of a two-level signal.
+
+    :param trace: The samples, any sliceable trace or an `EdgeTrace`.
+    :param points: Largest number of points returned, at least 2.
+
+    **Returns**:
+        - tuple: The sorted indices of the kept samples and their values,
+          `minmax` ones if there are too many edges.
+    """
+    count = len(trace)
+    if count <= points:
+        return np.arange(count), np.asarray(trace[0:count])
+    if isinstance(trace, EdgeTrace):
+        edges = trace.edges
+    else:
+        edges, budget = [], points // 2
+        for start in range(0, count, CHUNK_SIZE):
+            chunk = np.asarray(trace[max(start - 1, 0):start + CHUNK_SIZE])
+            edges.append(np.flatnonzero(chunk[1:] != chunk[:-1]) + max(start, 1))
+            budget -= len(edges[-1])
+            if budget < 0:
+                break
+        edges = np.concatenate(edges)
+    if 2 * len(edges) + 2 > points:
+        return minmax(trace, points)
+    indices = np.unique(np.concatenate(([0, count - 1], edges - 1, edges)))
+    return indices, _gather(trace, indices)
+
+
+def decimate(trace, points: int, mode: str = 'minmax') -> tuple:
+    """
+    Reduces a trace to at most `points` samples.
+
+    :param trace: The samples, any sliceable trace.
+    :param points: Largest number of points returned.
+    :param mode: 'minmax', 'lttb' or 'digital', see the module documentation.
+
+    :raises ValueError: If the mode is unknown.
+
+    **Returns**:
+        - tuple: The sorted indices of the kept samples and their values.
+    """
+    modes = {'minmax': minmax, 'lttb': lttb, 'digital': digital}
+    if mode not in modes:
+        raise ValueError(f'Unknown mode {mode}, use minmax, lttb or digital')
+    return modes[mode](trace, points)
@@ -0,0 +1,266 @@
+"""Digital Trace Buffers
+
+This module provides `DigitalBuffer`, a compact trace buffer for the nodes of
+the loop that only take two levels: the CLK, VCO and divider outputs (`vss` or
+`vdd`) and the phase detector outputs (0 or 1).
+
+A sample costs one bit in the 'packed' encoding, 64 times less than a float64,
+and the 'rle' encoding only keeps the index of every level change, which is
+far smaller again for slow square waves. Appended samples are first staged in
+a small boolean array, and every full stage is encoded at once with
+`np.packbits` or `np.flatnonzero`. Slices are decoded on their own, so a
+window of a long trace can be plotted or written without decoding the rest.
+
+The buffers are used for the io of the digital nodes with
+`settings.storage['digital'] = 'packed'` or `'rle'` in memory mode.
+"""
+import numpy as np
+from .edges import EdgeTrace, expand_edges
+
+# Samples staged before they are encoded, a multiple of 8.
+STAGE_SIZE = 65536
+ENCODINGS = ('packed', 'rle')
+
+
+class DigitalBuffer:
+    """
+    Compact trace buffer for a two-level signal.
+
+    A sample is stored as high if it is above the middle of the two levels,
+    and read back as exactly `low` or `high`. The buffer has the read and
+    append interface of `TraceBuffer`, without ring mode.
+
+    **Example:**
+
+    .. code-block:: python
+
+        buffer = DigitalBuffer(levels=(settings.vss, settings.vdd), encoding='rle')
+        buffer.extend(vco_output)
+        window = buffer[1000:2000]
+
+    :param levels: The `(low, high)` values of the signal.
+    :param encoding: 'packed' for one bit per sample, 'rle' for the level
+        changes only.
+    :param dtype: NumPy dtype of the decoded samples.
+    :param capacity: Number of samples to preallocate for in the 'packed'
+        encoding.
+
+    :raises ValueError: If the encoding is unknown.
+
+    **Attributes**:
+        - `low` (float), `high` (float): Values of the two levels.
+        - `encoding` (str): 'packed' or 'rle'.
+        - `dtype` (np.dtype): Type of the decoded samples.
+    """
+
+    ring = False
+
+    def __init__(self, levels=(0.0, 1.0), encoding: str = 'packed',
+                 dtype=np.float64, capacity: int = 0):
+        """
+        Initialize an empty digital buffer.
+
+        :param levels: The `(low, high)` values of the signal.
+        :param encoding: 'packed' or 'rle'.
+        :param dtype: NumPy dtype of the decoded samples.
+        :param capacity: Number of samples to preallocate for.
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f'Unknown encoding {encoding}, use packed or rle')
+        self.low, self.high = levels
+        self.threshold = (self.low + self.high) / 2
+        self.encoding = encoding
+        self.dtype = np.dtype(dtype)
+        self._values = np.array([self.low, self.high], dtype=self.dtype)
+        self._stage = np.zeros(STAGE_SIZE, dtype=bool)
+        self._data = np.empty(max(int(capacity), STAGE_SIZE) // 8 if encoding == 'packed'
+                              else 1024, dtype=np.uint8 if encoding == 'packed' else np.int64)
+        self.clear()
+
+    @classmethod
+    def from_array(cls, array, levels=(0.0, 1.0), encoding: str = 'packed',
+                   dtype=None) -> 'DigitalBuffer':
+        """
+        Encodes an existing trace.
+
+        :param array: The samples, already in chronological order.
+        :param levels: The `(low, high)` values of the signal.
+        :param encoding: 'packed' or 'rle'.
+        :param dtype: NumPy dtype of the decoded samples, the one of `array`
+            if `None`.
+
+        **Returns**:
+            - DigitalBuffer: A buffer holding the samples of `array`.
+        """
+        array = np.asarray(array)
+        buffer = cls(levels, encoding, array.dtype if dtype is None else dtype,
+                     capacity=len(array))
+        buffer.extend(array)
+        return buffer
+
+    def empty_like(self, capacity: int) -> 'DigitalBuffer':
+        """
+        Creates an empty buffer with the same levels and encoding.
+
+        :param capacity: Number of samples to preallocate for.
+
+        **Returns**:
+            - DigitalBuffer: The new buffer.
+        """
+        return DigitalBuffer((self.low, self.high), self.encoding, self.dtype, capacity)
+
+    def append(self, value):
+        """
+        Appends one sample.
+
+        :param value: The sample to append.
+        """
+        index = self._staged
+        if index == STAGE_SIZE:
+            self._flush()
+            index = 0
+        self._stage[index] = value > self.threshold
+        self._staged = index + 1
+
+    def extend(self, values):
+        """
+        Appends an array of samples.
+
+        :param values: The samples to append, in chronological order.
+        """
+        bits = np.asarray(values) > self.threshold
+        if self._staged:
+            count = min(len(bits), STAGE_SIZE - self._staged)
+            self._stage[self._staged:self._staged + count] = bits[:count]
+            self._staged += count
+            bits = bits[count:]
+            if self._staged < STAGE_SIZE:
+                return
+            self._flush()
+        whole = len(bits) // 8 * 8
+        if whole:
+            self._encode(bits[:whole])
+        self._stage[:len(bits) - whole] = bits[whole:]
+        self._staged = len(bits) - whole
+
+    def _flush(self):
+        """Encodes the staged samples."""
+        self._encode(self._stage[:self._staged])
+        self._staged = 0
+
+    def _encode(self, bits: np.ndarray):
+        """Appends samples to the encoded storage, a multiple of 8 when packed."""
+        if self.encoding == 'packed':
+            self._store(np.packbits(bits))
+        else:
+            if self._count == 0:
+                self._initial = bool(bits[0])
+                self._last = self._initial
+            changes = np.flatnonzero(bits != np.concatenate(([self._last], bits[:-1])))
+            self._store(changes + self._count)
+            self._last = bool(bits[-1])
+        self._count += len(bits)
+
+    def _store(self, items: np.ndarray):
+        """Appends bytes or edges, growing the storage when full."""
+        stop = self._used + len(items)
+        if stop > len(self._data):
+            data = np.empty(max(2 * len(self._data), stop), dtype=self._data.dtype)
+            data[:self._used] = self._data[:self._used]
+            self._data = data
+        self._data[self._used:stop] = items
+        self._used = stop
+
+    def _bits(self, start: int, stop: int) -> np.ndarray:
+        """Decodes the levels, 1 for high, of the samples from `start` to `stop`."""
+        parts = []
+        encoded = min(stop, self._count)
+        if start < encoded:
+            if self.encoding == 'packed':
+                packed = self._data[start // 8:(encoded + 7) // 8]
+                offset = start % 8
+                parts.append(np.unpackbits(packed)[offset:offset + encoded - start])
+            else:
+                parts.append(expand_edges(self._data[:self._used], self._initial,
+                                          start, encoded))
+        if stop > self._count:
+            first = max(start - self._count, 0)
+            parts.append(self._stage[first:stop - self._count].view(np.uint8))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8)
+
+    def view(self) -> np.ndarray:
+        """
+        Returns the recorded samples in chronological order.
+
+        Unlike `TraceBuffer.view` this decodes a new array.
+
+        **Returns**:
+            - np.ndarray: The recorded samples.
+        """
+        return self._values[self._bits(0, len(self))]
+
+    def to_edges(self, time_step: float = 1.0) -> EdgeTrace:
+        """
+        Returns the recorded samples as an `EdgeTrace`.
+
+        :param time_step: Time between two samples, in seconds.
+
+        **Returns**:
+            - EdgeTrace: The signal, decoded one stage at a time when packed.
+        """
+        if self.encoding == 'packed' or self._count == 0:
+            traces = [EdgeTrace.from_dense(self._bits(start, min(start + STAGE_SIZE, len(self))),
+                                           time_step=time_step)
+                      for start in range(0, len(self), STAGE_SIZE)]
+            trace = EdgeTrace.concatenate(traces) if traces else EdgeTrace([], 0)
+        else:
+            trace = EdgeTrace.concatenate([
+                EdgeTrace(self._data[:self._used], self._count, self._initial),
+                EdgeTrace.from_dense(self._stage[:self._staged])])
+        return EdgeTrace(trace.edges, trace.length, trace.initial, time_step,
+                         self.low, self.high, self.dtype)
+
+    def clear(self):
+        """Removes every sample, keeping the preallocated storage."""
+        self._used = 0
+        self._count = 0
+        self._staged = 0
+        self._initial = False
+        self._last = False
+
+    @property
+    def capacity(self) -> int:
+        """Number of samples held, the buffer grows as needed."""
+        return len(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the encoded samples and the stage, in bytes."""
+        return self._data.nbytes + self._stage.nbytes
+
+    def __len__(self) -> int:
+        return self._count + self._staged
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step > 0:
+                return self._values[self._bits(start, max(stop, start))][::step]
+            return self.view()[key]
+        if isinstance(key, (int, np.integer)):
+            index = int(key) + len(self) if key < 0 else int(key)
+            if not 0 <= index < len(self):
+                raise IndexError('DigitalBuffer index out of range')
+            return self._values[self._bits(index, index + 1)[0]]
+        return self.view()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.view()
+        return array if dtype is None else array.astype(dtype)
+
+    def __repr__(self) -> str:
+        return (f'DigitalBuffer(len={len(self)}, encoding={self.encoding}, '
+                f'nbytes={self.nbytes}, dtype={self.dtype})')
@@ -0,0 +1,349 @@
+"""Edge Traces
+
+This module provides `EdgeTrace`, a digital signal stored as the sample indices
+of its transitions instead of one value per sample.
+
+The digital nodes of the loop (the CLK, the VCO and divider outputs and the
+phase detector outputs) only take two levels and change a few times per
+period, so their edges hold all their information: a 2.4M-sample VCO trace
+with a period of 60 samples is 80K edges. An edge trace converts to and from
+the dense arrays used elsewhere, and the read side of its interface (`len`,
+slicing, `np.asarray`) matches `TraceBuffer`, so it can be passed wherever a
+trace is read. `Lpd.start`, `Divider.start`, `Calculator` and `mse` work on the
+edges directly without expanding them.
+"""
+import numpy as np
+
+# Samples converted at once by `from_dense`, so memory-mapped traces are never
+# loaded whole.
+CHUNK_SIZE = 1 << 20
+
+
+def expand_edges(edges: np.ndarray, initial: bool, start: int, stop: int) -> np.ndarray:
+    """
+    Expands a window of a signal stored as its edges, see `EdgeTrace`.
+
+    :param edges: Sorted sample indices of the transitions.
+    :param initial: Level of the first sample.
+    :param start: First sample of the window.
+    :param stop: End of the window.
+
+    **Returns**:
+        - np.ndarray: The `uint8` level, 1 for high, of the samples from
+          `start` to `stop`.
+    """
+    first = np.searchsorted(edges, start, side='right')
+    last = np.searchsorted(edges, stop, side='left')
+    bounds = np.concatenate(([start], edges[first:last], [stop]))
+    levels = ((np.arange(len(bounds) - 1) + first + int(initial)) & 1).astype(np.uint8)
+    return np.repeat(levels, np.diff(bounds))
+
+
+class EdgeTrace:
+    """
+    Two-level signal stored as its transitions.
+
+    Sample `k` of the signal is `high` if `initial` is `True` and an even
+    number of edges are at or before `k`, or `initial` is `False` and that
+    number is odd, and `low` otherwise. An edge is the index of the first
+    sample holding the new level, so it is never 0.
+
+    **Example:**
+
+    .. code-block:: python
+
+        vco = EdgeTrace.from_dense(pll.output, time_step=settings.time_step,
+                                   low=settings.vss, high=settings.vdd)
+        periods = vco.periods()
+        dense = vco[1000:2000].to_dense()
+
+    :param edges: Sorted sample indices of the transitions, in (0, `length`).
+    :param length: Number of samples of the signal.
+    :param initial: Level of the first sample, `True` for `high`.
+    :param time_step: Time between two samples, in seconds.
+    :param low: Value of the low level.
+    :param high: Value of the high level.
+    :param dtype: NumPy dtype of the dense samples.
+
+    :raises ValueError: If the edges are not sorted and unique, or are
+        outside (0, `length`).
+
+    **Attributes**:
+        - `edges` (np.ndarray): The `int64` sample indices of the transitions.
+        - `initial` (bool): Level of the first sample.
+        - `time_step` (float): Time between two samples.
+        - `low` (float), `high` (float): Values of the two levels.
+        - `dtype` (np.dtype): Type of the dense samples.
+    """
+
+    def __init__(self, edges, length: int, initial: bool = False,
+                 time_step: float = 1.0, low: float = 0.0, high: float = 1.0,
+                 dtype=np.float64):
+        """
+        Wraps sorted edge indices.
+
+        :param edges: Sorted sample indices of the transitions.
+        :param length: Number of samples of the signal.
+        :param initial: Level of the first sample.
+        :param time_step: Time between two samples, in seconds.
+        :param low: Value of the low level.
+        :param high: Value of the high level.
+        :param dtype: NumPy dtype of the dense samples.
+        """
+        self.edges = np.asarray(edges, dtype=np.int64)
+        self.length = int(length)
+        if len(self.edges) and (self.edges[0] <= 0 or self.edges[-1] >= self.length or
+                                np.any(np.diff(self.edges) <= 0)):
+            raise ValueError('The edges must be sorted, unique and in (0, length)')
+        self.initial = bool(initial)
+        self.time_step = float(time_step)
+        self.low, self.high = low, high
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_dense(cls, array, time_step: float = 1.0, low: float = 0.0,
+                   high: float = 1.0) -> 'EdgeTrace':
+        """
+        Finds the transitions of a dense trace.
+
+        The trace is read in chunks of `CHUNK_SIZE` samples, so it can be a
+        memory-mapped trace larger than the memory. A sample is high above the
+        middle of `low` and `high`.
+
+        :param array: The dense samples, e.g. a `TraceBuffer` or `np.memmap`.
+        :param time_step: Time between two samples, in seconds.
+        :param low: Value of the low level.
+        :param high: Value of the high level.
+
+        **Returns**:
+            - EdgeTrace: The transitions of `array`.
+        """
+        threshold = (low + high) / 2
+        dtype = np.asarray(array[:1]).dtype if len(array) else np.float64
+        edges = []
+        for start in range(0, len(array), CHUNK_SIZE):
+            chunk = np.asarray(array[max(start - 1, 0):start + CHUNK_SIZE]) > threshold
+            edges.append(np.flatnonzero(chunk[1:] != chunk[:-1]) + max(start, 1))
+        initial = bool(np.asarray(array[:1])[0] > threshold) if len(array) else False
+        return cls(np.concatenate(edges) if edges else [], len(array), initial,
+                   time_step, low, high, dtype)
+
+    @classmethod
+    def from_times(cls, times, duration: float, initial: bool = False,
+                   time_step: float = 1.0, low: float = 0.0,
+                   high: float = 1.0) -> 'EdgeTrace':
+        """
+        Places transition times on the sample grid.
+
+        An edge goes to the first sample at or after its time, and edges
+        falling on the same sample cancel out in pairs.
+
+        :param times: Sorted transition times, in seconds.
+        :param duration: Length of the signal, in seconds.
+        :param initial: Level of the first sample.
+        :param time_step: Time between two samples, in seconds.
+        :param low: Value of the low level.
+        :param high: Value of the high level.
+
+        **Returns**:
+            - EdgeTrace: The transitions on the sample grid.
+        """
+        length = int(round(duration / time_step))
+        indices = np.ceil(np.asarray(times, dtype=float) / time_step - 1e-9).astype(np.int64)
+        indices = indices[(indices > 0) & (indices < length)]
+        unique, counts = np.unique(indices, return_counts=True)
+        return cls(unique[counts % 2 == 1], length, initial, time_step, low, high)
+
+    @classmethod
+    def concatenate(cls, traces) -> 'EdgeTrace':
+        """
+        Joins consecutive traces, e.g. the chunks of an extended run.
+
+        :param traces: Edge traces in chronological order, with the settings of
+            the first one.
+
+        **Returns**:
+            - EdgeTrace: The joined trace, with an edge wherever a trace starts
+              on another level than the previous one ended on.
+        """
+        traces = [trace for trace in traces if trace.length] or traces[:1]
+        first = traces[0]
+        edges, offset = [first.edges], first.length
+        level = first.level(-1) if first.length else first.initial
+        for trace in traces[1:]:
+            if trace.initial != level:
+                edges.append(np.array([offset]))
+            edges.append(trace.edges + offset)
+            offset += trace.length
+            level = trace.level(-1)
+        return first._like(np.concatenate(edges), offset, first.initial)
+
+    def _like(self, edges, length: int, initial: bool) -> 'EdgeTrace':
+        """Returns a trace with the levels and time step of this one."""
+        return EdgeTrace(edges, length, initial, self.time_step, self.low,
+                         self.high, self.dtype)
+
+    def level(self, index: int) -> bool:
+        """
+        Returns the level of a sample.
+
+        :param index: Sample index, negative from the end.
+
+        **Returns**:
+            - bool: `True` if the sample is high.
+        """
+        if index < 0:
+            index += self.length
+        return self.initial ^ bool(np.searchsorted(self.edges, index, side='right') & 1)
+
+    @property
+    def times(self) -> np.ndarray:
+        """Times of the transitions, in seconds."""
+        return self.edges * self.time_step
+
+    @property
+    def rising(self) -> np.ndarray:
+        """Sample indices of the low to high transitions."""
+        return self.edges[int(self.initial)::2]
+
+    @property
+    def falling(self) -> np.ndarray:
+        """Sample indices of the high to low transitions."""
+        return self.edges[int(not self.initial)::2]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the edges, in bytes."""
+        return self.edges.nbytes
+
+    def to_dense(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Expands a window of the signal into one value per sample.
+
+        :param start: First sample of the window.
+        :param stop: End of the window, the end of the signal if `None`.
+
+        **Returns**:
+            - np.ndarray: The samples from `start` to `stop`.
+        """
+        start, stop, _ = slice(start, stop).indices(self.length)
+        values = np.array([self.low, self.high], dtype=self.dtype)
+        return values[expand_edges(self.edges, self.initial, start, max(stop, start))]
+
+    def slice_time(self, start_time: float = None, stop_time: float = None) -> 'EdgeTrace':
+        """
+        Returns the part of the signal between two times.
+
+        :param start_time: Start of the window, in seconds.
+        :param stop_time: End of the window, in seconds.
+
+        **Returns**:
+            - EdgeTrace: The samples from `start_time` to `stop_time`.
+        """
+        start = None if start_time is None else round(start_time / self.time_step)
+        stop = None if stop_time is None else round(stop_time / self.time_step)
+        return self[start:stop]
+
+    def merge(self, other: 'EdgeTrace', operation: str = 'xor') -> 'EdgeTrace':
+        """
+        Combines two signals of the same length sample by sample.
+
+        :param other: The other signal.
+        :param operation: 'and', 'or' or 'xor' of the levels.
+
+        :raises ValueError: If the lengths differ or the operation is unknown.
+
+        **Returns**:
+            - EdgeTrace: The combined signal, with the levels of this one.
+        """
+        operations = {'and': np.logical_and, 'or': np.logical_or,
+                      'xor': np.logical_xor}
+        if operation not in operations:
+            raise ValueError(f'Unknown operation {operation}, use and, or or xor')
+        if self.length != other.length:
+            raise ValueError('The signals must have the same length')
+        bounds = np.union1d(self.edges, other.edges)
+        levels = operations[operation](self.levels_at(bounds), other.levels_at(bounds))
+        initial = operations[operation](self.initial, other.initial)
+        changed = levels != np.concatenate(([initial], levels[:-1]))
+        return self._like(bounds[changed], self.length, initial)
+
+    def levels_at(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Returns the levels of several samples, see `level`.
+
+        :param indices: Sample indices.
+
+        **Returns**:
+            - np.ndarray: `True` where the sample is high.
+        """
+        return ((np.searchsorted(self.edges, indices, side='right') & 1) ^
+                self.initial).astype(bool)
+
+    def periods(self, edge: str = 'rising') -> np.ndarray:
+        """
+        Returns the time between consecutive edges of one kind.
+
+        :param edge: 'rising', 'falling' or 'both'.
+
+        **Returns**:
+            - np.ndarray: The periods, in seconds.
+        """
+        return np.diff(self._select(edge)) * self.time_step
+
+    def tie(self, period: float = None, edge: str = 'rising') -> np.ndarray:
+        """
+        Returns the time interval error of the edges of one kind.
+
+        :param period: Nominal time between two edges, in seconds. Fitted
+            between the first and the last edge when `None`.
+        :param edge: 'rising', 'falling' or 'both'.
+
+        **Returns**:
+            - np.ndarray: The deviation of every edge from an ideal clock
+              starting on the first edge, in seconds.
+        """
+        times = self._select(edge) * self.time_step
+        if not len(times):
+            return times
+        if period is None:
+            period = (times[-1] - times[0]) / max(len(times) - 1, 1)
+        return times - times[0] - np.arange(len(times)) * period
+
+    def _select(self, edge: str) -> np.ndarray:
+        """Edge indices of one kind."""
+        if edge not in ('rising', 'falling', 'both'):
+            raise ValueError(f'Unknown edge {edge}, use rising, falling or both')
+        return self.edges if edge == 'both' else getattr(self, edge)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(self.length)
+            stop = max(stop, start)
+            first = np.searchsorted(self.edges, start, side='right')
+            last = np.searchsorted(self.edges, stop, side='left')
+            return self._like(self.edges[first:last] - start, stop - start,
+                              self.level(start) if start < self.length else self.initial)
+        if isinstance(key, (int, np.integer)):
+            return self.high if self.level(int(key)) else self.low
+        return self.to_dense()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_dense()
+        return array if dtype is None else array.astype(dtype)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EdgeTrace):
+            return NotImplemented
+        return (self.length == other.length and self.initial == other.initial and
+                self.low == other.low and self.high == other.high and
+                np.array_equal(self.edges, other.edges))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f'EdgeTrace(len={self.length}, edges={len(self.edges)}, '
+                f'initial={self.initial}, time_step={self.time_step})')
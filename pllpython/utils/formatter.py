@@ -1,9 +1,13 @@
-"""Format Helper Functions"""
-from bokeh.models import CustomJSTickFormatter
+"""Format Helper Functions
+
+Bokeh is imported on first use, so importing this module stays cheap.
+"""
 
 
 def get_time_format():
     """Creates custom scale for web axis"""
+    # pylint: disable=C0415
+    from bokeh.models import CustomJSTickFormatter
     return CustomJSTickFormatter(code="""
         const thresholds = [1e-15, 1e-12, 1e-9, 1e-6, 1e-3, 1, 60];
         const units = ["fs", "ps", "ns", "µs", "ms", "s", "min"];
@@ -27,6 +31,8 @@ def get_time_format():
 
 def get_freq_format():
     """Creates custom scale for web axis"""
+    # pylint: disable=C0415
+    from bokeh.models import CustomJSTickFormatter
     return CustomJSTickFormatter(code="""
         const thresholds = [1e9, 1e6, 1e3, 1];  // GHz, MHz, KHz, Hz
         const units = ["GHz", "MHz", "KHz", "Hz"];
@@ -49,6 +55,8 @@ def get_freq_format():
 
 def get_volts_format():
     """Creates custom scale for web axis"""
+    # pylint: disable=C0415
+    from bokeh.models import CustomJSTickFormatter
     return CustomJSTickFormatter(code="""
         const thresholds = [1e6, 1e3, 1, 1e-3, 1e-6];  // MV, kV, V, mV, µV
         const units = ["MV", "kV", "V", "mV", "µV"];
@@ -6,6 +6,7 @@ import os
 import logging
 from time import gmtime, strftime
 import numpy as np
+from .writer import TraceWriter, write_csv, TRACE_HEADERS
 # pylint: disable=W1203 disable=W0622
 
 
@@ -16,6 +17,9 @@ def setup_log(name: str, id: int, settings, csv: bool = True) -> logging:
     :param name: Name of the logger.
     :param id: Unique identifier for the log instance.
     :param settings: Configuration object containing logging settings.
+    :param csv: If `True` the path of the io file is returned instead of the
+        log path. Its extension follows `settings.log['format']`: `.json` for
+        the sidecar of the binary traces, or `.csv`.
     :return: Tuple containing the logger instance and the log file path.
     """
     log = logging.getLogger(f'{name}_{id}')
@@ -33,25 +37,47 @@ def setup_log(name: str, id: int, settings, csv: bool = True) -> logging:
         f'Settings VCO: {settings.vco}\nLoopFitler: {settings.lf}\nCLK: {settings.clk}\nDivider: {settings.divider}\nLPD: {settings.lpd}')
 
     if csv:
-        file_full = file_full[:-3] + "csv"
-        if not os.path.isfile(file_full):
-            open(file_full, 'w', encoding='utf-8')
+        if settings.log.get('format', 'npy') == 'csv':
+            file_full = file_full[:-3] + "csv"
+        else:
+            file_full = file_full[:-3] + "json"
 
     return log, file_full
 
 
-def save_io(io_arrays: list[list], headers: list[str], io_file: str):
+def save_io(io_arrays: list[list], headers: list[str], io_file: str,
+            chunk_size: int = 65536, names: list[str] = None):
     """
-    Saves I/O data to a CSV file.
+    Saves I/O data to the binary trace files or to a CSV file.
+
+    The format follows the extension of `io_file`: `.csv` writes a CSV file
+    with the headers on the first line, anything else is the sidecar of a
+    `TraceWriter`. Both are written chunk by chunk.
+
+    The binary nodes are named like the traces streamed by `Pll`, see
+    `TRACE_HEADERS`, so `load_traces` finds the same keys for both paths.
 
     :param io_arrays: List of lists containing data to be saved.
-    :param headers: List of column headers for the CSV file.
-    :param io_file: Path to the CSV file.
+    :param headers: List of column headers.
+    :param io_file: Path to the CSV file or to the JSON sidecar.
+    :param chunk_size: Number of samples written at once.
+    :param names: Node names of the binary traces. By default a header of
+        `TRACE_HEADERS` gives its key, any other one is lower-cased with `_`
+        for spaces.
     """
-    results = np.asarray(io_arrays)
-
-    np.savetxt(io_file, results.transpose(), delimiter=',', header='')
-    with open(io_file, 'r+', encoding='utf-8') as f:
-        f.read()
-        f.seek(0, 0)
-        f.write(f'{" ,".join(headers)}\n')
+    if io_file.endswith('.csv'):
+        write_csv(io_arrays, headers, io_file, chunk_size)
+        return
+    # Buffers are sliced chunk by chunk, compact ones are never decoded whole.
+    arrays = [values if hasattr(values, 'dtype') else np.asarray(values)
+              for values in io_arrays]
+    samples = min((len(values) for values in arrays), default=0)
+    if names is None:
+        nodes = {header: name for name, header in TRACE_HEADERS.items()}
+        names = [nodes.get(header, header.lower().replace(' ', '_'))
+                 for header in headers]
+    with TraceWriter(io_file, nodes={name: values.dtype for name, values in zip(names, arrays)},
+                     headers=dict(zip(names, headers))) as writer:
+        for start in range(0, samples, chunk_size):
+            writer.write({name: values[start:start + chunk_size]
+                          for name, values in zip(names, arrays)})
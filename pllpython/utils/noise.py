@@ -0,0 +1,289 @@
+"""Noise Sources
+
+This module provides `NoiseSource`, the stream of standard normal draws used
+for the phase noise of the oscillators.
+
+The draws are generated in blocks of `NOISE_BLOCK` by a `numpy.random.Generator`,
+so a draw costs an array lookup instead of a `random.gauss` call. Every
+oscillator owns its own source: its noise does not depend on how the other
+components or the engines consume draws, and a seeded run is reproducible.
+`spawn` derives independent child streams, e.g. one per oscillator or per sweep
+point, from a single seed through `numpy.random.SeedSequence`.
+
+`FlickerNoise` is a stream of the same kind holding 1/f^alpha noise instead of
+white noise. It is synthesized in blocks by filtering white draws with a
+cascade of pole-zero pairs with log-spaced corners, whose state carries over
+from one block to the next, so long runs stay continuous and a value costs the
+same array lookup as a white draw.
+"""
+import json
+import numpy as np
+
+NOISE_BLOCK = 65536
+
+# Span, below half the sample rate, and density of the pole-zero pairs shaping
+# `FlickerNoise`.
+FLICKER_DECADES = 6
+FLICKER_PAIRS_PER_DECADE = 2
+
+
+class NoiseSource:
+    """
+    Seeded stream of standard normal draws.
+
+    **Example:**
+
+    .. code-block:: python
+
+        clk_noise, vco_noise = NoiseSource(seed=1234).spawn(2)
+        z = vco_noise.normal()
+
+    :param seed: An int, a sequence of ints, a `numpy.random.SeedSequence`,
+        or `None` for fresh entropy from the operating system.
+    :param block_size: Number of draws generated at once.
+
+    **Attributes**:
+        - `seed_sequence` (np.random.SeedSequence): The seed of the stream,
+          used by `spawn`.
+        - `generator` (np.random.Generator): The PCG64 generator of the stream.
+    """
+
+    def __init__(self, seed=None, block_size: int = NOISE_BLOCK):
+        """
+        Creates the generator of the stream.
+
+        :param seed: Seed of the stream, see the class documentation.
+        :param block_size: Number of draws generated at once.
+        """
+        self.block_size = int(block_size)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """
+        Restarts the stream from `seed`.
+
+        :param seed: Seed of the stream, see the class documentation.
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self._restart()
+
+    def _restart(self):
+        """Empties the buffer, which then starts at the generator state."""
+        self._base = self._capture()
+        self._offset = 0
+        self._buffer = np.empty(0)
+        self._index = 0
+
+    def spawn(self, count: int) -> list['NoiseSource']:
+        """
+        Derives independent child streams.
+
+        Each call returns new children, so successive calls never repeat a
+        stream, and the children of a seeded source are reproducible.
+
+        :param count: Number of child streams.
+
+        **Returns**:
+            - list: `count` new `NoiseSource` objects.
+        """
+        return [NoiseSource(child, self.block_size)
+                for child in self.seed_sequence.spawn(count)]
+
+    def _capture(self):
+        """Returns the state from which the next values are generated."""
+        return self.generator.bit_generator.state
+
+    def _restore(self, base):
+        """Restores a state returned by `_capture`."""
+        self.generator.bit_generator.state = base
+
+    def _generate(self, count: int) -> np.ndarray:
+        """Generates the next `count` values of the stream."""
+        return self.generator.standard_normal(count)
+
+    def _refill(self, minimum: int):
+        """Appends a new block to the unread draws."""
+        if self._index < len(self._buffer):
+            self._offset += self._index
+        else:
+            self._restart()
+        self._buffer = np.concatenate(
+            (self._buffer[self._index:],
+             self._generate(max(self.block_size, minimum))))
+        self._index = 0
+
+    def normal(self) -> float:
+        """
+        Returns the next draw.
+
+        **Returns**:
+            - float: A standard normal sample.
+        """
+        if self._index == len(self._buffer):
+            self._refill(1)
+        value = self._buffer[self._index]
+        self._index += 1
+        return float(value)
+
+    def block(self, minimum: int = 1) -> np.ndarray:
+        """
+        Returns the unread draws without consuming them, see `consume`.
+
+        :param minimum: Minimum number of draws returned.
+
+        **Returns**:
+            - np.ndarray: At least `minimum` standard normal samples.
+        """
+        if len(self._buffer) - self._index < minimum:
+            self._refill(minimum)
+        return self._buffer[self._index:]
+
+    def consume(self, count: int):
+        """
+        Marks the first `count` draws returned by `block` as used.
+
+        :param count: Number of draws used.
+        """
+        self._index += int(count)
+
+    def normals(self, count: int) -> np.ndarray:
+        """
+        Returns the next `count` draws.
+
+        :param count: Number of draws.
+
+        **Returns**:
+            - np.ndarray: `count` standard normal samples.
+        """
+        draws = self.block(count)[:count]
+        self.consume(count)
+        return draws
+
+    def get_state(self) -> str:
+        """
+        Returns the position of the stream.
+
+        **Returns**:
+            - str: A JSON string holding the generator state and the number of
+              draws used since then.
+        """
+        return json.dumps({'base': self._base,
+                           'consumed': self._offset + self._index})
+
+    def set_state(self, state: str):
+        """
+        Moves the stream to a position returned by `get_state`.
+
+        :param state: The position to restore.
+        """
+        state = json.loads(str(state))
+        self._restore(state['base'])
+        for skipped in range(0, state['consumed'], self.block_size):
+            self._generate(min(self.block_size, state['consumed'] - skipped))
+        self._restart()
+
+
+class FlickerNoise(NoiseSource):
+    """
+    Seeded stream of 1/f^alpha noise, one value per oscillator edge.
+
+    The one-sided spectrum of the stream is `(2 / sample_rate) *
+    (corner / f) ** slope`, so it crosses the spectrum of a unit white draw
+    per value at `corner`. A slope of 2 is a random walk. White draws are
+    shaped by `FLICKER_PAIRS_PER_DECADE` pole-zero pairs per decade between
+    `FLICKER_DECADES` decades under half the sample rate and half the sample
+    rate; the spectrum flattens below that band. The filter starts at rest,
+    like the other noise filters of the oscillators.
+
+    **Example:**
+
+    .. code-block:: python
+
+        flicker = FlickerNoise(corner=1e6, slope=1, sample_rate=2e9, seed=1234)
+        values = flicker.normals(1000)
+
+    :param corner: Frequency, in Hz, where the spectrum equals the white one.
+    :param slope: Exponent alpha of the spectrum, in (0, 2].
+    :param sample_rate: Rate of the values, in Hz.
+    :param seed: Seed of the stream, see `NoiseSource`.
+    :param block_size: Number of values generated at once.
+
+    :raises ValueError: If `corner` or `sample_rate` is not positive, or if
+        `slope` is outside (0, 2].
+
+    **Attributes**:
+        - `sos` (np.ndarray): Second-order sections of the shaping filter.
+        - `conditions` (np.ndarray): State of the sections at the end of the
+          generated values.
+    """
+
+    def __init__(self, corner: float, slope: float = 1.0, sample_rate: float = 1.0,
+                 seed=None, block_size: int = NOISE_BLOCK):
+        """
+        Designs the shaping filter and creates the generator of the stream.
+
+        :param corner: Frequency, in Hz, where the spectrum equals the white one.
+        :param slope: Exponent alpha of the spectrum, in (0, 2].
+        :param sample_rate: Rate of the values, in Hz.
+        :param seed: Seed of the stream, see `NoiseSource`.
+        :param block_size: Number of values generated at once.
+        """
+        if corner <= 0 or sample_rate <= 0:
+            raise ValueError('The corner and the sample rate must be positive')
+        if not 0 < slope <= 2:
+            raise ValueError(f'The slope must be in (0, 2], not {slope}')
+        self.corner, self.slope = float(corner), float(slope)
+        self.sample_rate = float(sample_rate)
+
+        # |H|^2 falls by ratio**slope between a pole and the zero above it,
+        # then stays flat up to the next pole: on average it follows f**-slope.
+        count = FLICKER_DECADES * FLICKER_PAIRS_PER_DECADE
+        ratio = 10 ** (1 / FLICKER_PAIRS_PER_DECADE)
+        lowest = sample_rate / 2 * 10.0 ** -FLICKER_DECADES
+        poles = np.exp(-2 * np.pi * lowest * ratio ** np.arange(count) / sample_rate)
+        zeros = poles ** (ratio ** (slope / 2))
+        self.sos = np.zeros((count // 2, 6))
+        for row, (zero, pole) in enumerate(zip(zeros.reshape(-1, 2), poles.reshape(-1, 2))):
+            self.sos[row] = [1, -zero.sum(), zero.prod(), 1, -pole.sum(), pole.prod()]
+
+        # The gain fits the target spectrum over the band in the log domain.
+        band = lowest * np.logspace(1, FLICKER_DECADES - 1, 64)
+        z = np.exp(-2j * np.pi * band / sample_rate)
+        response = np.prod([(row[0] + row[1] * z + row[2] * z ** 2) /
+                            (row[3] + row[4] * z + row[5] * z ** 2)
+                            for row in self.sos], axis=0)
+        self.sos[0, :3] *= np.exp(np.mean(np.log((corner / band) ** slope /
+                                                 np.abs(response) ** 2)) / 2)
+        self.conditions = np.zeros((len(self.sos), 2))
+        super().__init__(seed=seed, block_size=block_size)
+
+    def seed(self, seed=None):
+        """
+        Restarts the stream from `seed`, with the filter at rest.
+
+        :param seed: Seed of the stream, see `NoiseSource`.
+        """
+        self.conditions = np.zeros((len(self.sos), 2))
+        super().seed(seed)
+
+    def _capture(self):
+        """Returns the generator state and the state of the filter."""
+        return {'bit_generator': self.generator.bit_generator.state,
+                'conditions': self.conditions.tolist()}
+
+    def _restore(self, base):
+        """Restores a state returned by `_capture`."""
+        self.generator.bit_generator.state = base['bit_generator']
+        self.conditions = np.array(base['conditions'], dtype=float)
+
+    def _generate(self, count: int) -> np.ndarray:
+        """Filters `count` new white draws."""
+        # pylint: disable=C0415
+        from scipy.signal import sosfilt
+
+        values, self.conditions = sosfilt(self.sos, self.generator.standard_normal(count),
+                                          zi=self.conditions)
+        return values
@@ -0,0 +1,181 @@
+"""Phase Noise Analyzer
+
+This module provides `PhaseNoiseAnalyzer`, a Welch estimator of the phase
+noise of a clock from its edges.
+
+The edges are turned into a time interval error (TIE) sequence, the deviation
+of every edge from an ideal clock with the nominal period. The sequence is cut
+into overlapping segments which are detrended, windowed and transformed with
+`np.fft.rfft`, and the periodograms are averaged. The segments are processed
+as the edges arrive, so only the unfinished segment is kept in memory and edge
+sequences of any length can be analyzed.
+"""
+
+import numpy as np
+
+
+class PhaseNoiseAnalyzer:
+    """
+    Streaming Welch estimator of the phase noise of a clock.
+
+    The single-sideband phase noise is `L(f) = S_phi(f) / 2`, with `S_phi`
+    the one-sided spectral density of the carrier phase, `2 pi f0 TIE`.
+
+    **Example:**
+
+    .. code-block:: python
+
+        analyzer = PhaseNoiseAnalyzer(segment=1024)
+        for chunk in edge_chunks:
+            analyzer.add_edges(chunk)
+        frequencies, phase_noise = analyzer.spectrum()
+        jitter = analyzer.rms_jitter([(1e4, 1e7)])
+
+    :param period: Nominal time between two edges, in seconds. Estimated from
+        the first edges passed to `add_edges` when `None`.
+    :param edges_per_cycle: Edges per carrier period, 1 for rising edges only
+        and 2 for both edges.
+    :param segment: Edges per Welch segment, which sets the resolution
+        `1 / (segment * period)`.
+    :param overlap: Fraction of a segment shared with the next one, in [0, 1).
+    :param window: Window name understood by `scipy.signal.get_window`, or
+        the window values.
+    :param detrend: `'linear'` or `'constant'`, removed from every segment
+        before the window. A linear trend is a frequency offset from the
+        nominal period.
+
+    :raises ValueError: If `segment` is smaller than 2, `overlap` is outside
+        [0, 1) or the window does not have `segment` values.
+
+    **Attributes**:
+        - `period` (float): Nominal time between two edges.
+        - `segments` (int): Number of segments averaged so far.
+    """
+
+    def __init__(self, period: float = None, edges_per_cycle: int = 1,
+                 segment: int = 1024, overlap: float = 0.5, window='hann',
+                 detrend: str = 'linear'):
+        """
+        Prepares the window and an empty average.
+
+        :param period: Nominal time between two edges, in seconds.
+        :param edges_per_cycle: Edges per carrier period.
+        :param segment: Edges per Welch segment.
+        :param overlap: Fraction of a segment shared with the next one.
+        :param window: Window name or values.
+        :param detrend: `'linear'` or `'constant'`.
+        """
+        if segment < 2:
+            raise ValueError('A segment needs at least 2 edges')
+        if not 0 <= overlap < 1:
+            raise ValueError(f'The overlap must be in [0, 1), not {overlap}')
+        if detrend not in ('linear', 'constant'):
+            raise ValueError(f'Unknown detrend {detrend}')
+        if isinstance(window, str) or isinstance(window, tuple):
+            # pylint: disable=C0415
+            from scipy.signal import get_window
+            window = get_window(window, segment)
+        self.window = np.asarray(window, dtype=float)
+        if len(self.window) != segment:
+            raise ValueError(f'The window must have {segment} values')
+        self.period = period
+        self.edges_per_cycle = edges_per_cycle
+        self.segment = segment
+        self.hop = max(int(round(segment * (1 - overlap))), 1)
+        self.detrend = detrend
+        self.segments = 0
+        self._power = np.zeros(segment // 2 + 1)
+        self._pending = np.empty(0)
+        self._origin = None
+        self._edge_count = 0
+
+    def add_edges(self, edges):
+        """
+        Adds the next edge times of the clock.
+
+        :param edges: Edge times in seconds, following the previous ones.
+
+        :raises ValueError: If the period is unknown and fewer than 2 edges
+            are given.
+        """
+        edges = np.asarray(edges, dtype=float)
+        if not len(edges):
+            return
+        if self.period is None:
+            if len(edges) < 2:
+                raise ValueError('At least 2 edges are needed to estimate the period')
+            self.period = (edges[-1] - edges[0]) / (len(edges) - 1)
+        if self._origin is None:
+            self._origin = edges[0]
+        indices = np.arange(self._edge_count, self._edge_count + len(edges))
+        self._edge_count += len(edges)
+        self.add_tie((edges - self._origin) - indices * self.period)
+
+    def add_tie(self, tie):
+        """
+        Adds the next values of the TIE sequence, one per edge.
+
+        :param tie: Time interval errors in seconds.
+
+        :raises ValueError: If the period is unknown.
+        """
+        if self.period is None:
+            raise ValueError('The period must be known to add a TIE sequence')
+        pending = np.concatenate((self._pending, np.asarray(tie, dtype=float)))
+        count = (len(pending) - self.segment) // self.hop + 1
+        if count > 0:
+            segments = np.lib.stride_tricks.sliding_window_view(
+                pending, self.segment)[:count * self.hop:self.hop]
+            segments = segments - segments.mean(axis=1, keepdims=True)
+            if self.detrend == 'linear':
+                ramp = np.arange(self.segment) - (self.segment - 1) / 2
+                segments = segments - np.outer(segments @ ramp / (ramp @ ramp), ramp)
+            spectra = np.fft.rfft(segments * self.window, axis=1)
+            self._power += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=0)
+            self.segments += count
+            pending = pending[count * self.hop:]
+        self._pending = pending
+
+    def _density(self) -> tuple:
+        """Returns the frequencies and the one-sided TIE density in s^2/Hz."""
+        if self.segments == 0:
+            raise ValueError(f'At least {self.segment} edges are needed')
+        rate = 1 / self.period
+        density = self._power / (self.segments * rate * np.sum(self.window ** 2))
+        density[1:] *= 2
+        if self.segment % 2 == 0:
+            density[-1] /= 2
+        return np.fft.rfftfreq(self.segment, self.period), density
+
+    def spectrum(self) -> tuple:
+        """
+        Returns the averaged single-sideband phase noise.
+
+        :raises ValueError: If no segment is complete yet.
+
+        **Returns**:
+            - tuple: The offset frequencies in Hz and `L(f)` in dBc/Hz, without
+              the DC bin.
+        """
+        frequencies, density = self._density()
+        carrier = 1 / (self.period * self.edges_per_cycle)
+        phase = (2 * np.pi * carrier) ** 2 * density[1:]
+        with np.errstate(divide='ignore'):
+            return frequencies[1:], 10 * np.log10(phase / 2)
+
+    def rms_jitter(self, bands) -> np.ndarray:
+        """
+        Integrates the TIE density over frequency bands.
+
+        :param bands: `(low, high)` offset frequency pairs in Hz.
+
+        :raises ValueError: If no segment is complete yet.
+
+        **Returns**:
+            - np.ndarray: The RMS jitter, in seconds, of every band.
+        """
+        frequencies, density = self._density()
+        resolution = frequencies[1]
+        return np.array([np.sqrt(np.sum(density[(frequencies >= low) & (frequencies <= high)])
+                                 * resolution)
+                         for low, high in bands])
@@ -0,0 +1,259 @@
+"""Trace Pyramids
+
+This module provides a multi-resolution min/max index of long traces, so any
+time window of a run of 10^8 samples can be drawn with a few thousand points.
+
+Level `k` of the pyramid of a trace holds the smallest and the largest sample
+of every bucket of `2 ** (base + k)` consecutive samples, each level halving
+the previous one down to a single bucket. The levels take about
+`2 / 2 ** base` of the trace size together.
+
+- `PyramidWriter` builds the pyramid of one trace chunk by chunk, next to its
+  `.npy` file. `TraceWriter` uses it for the nodes listed in its `pyramid`
+  argument, and stores the level table in the JSON sidecar.
+- `TracePyramid` reads a window at a point budget, from the coarsest level
+  that still shows every bucket of the budget. The raw samples are only read,
+  from the memory-mapped trace, when the window spans fewer than
+  `2 ** base * points / 2` samples.
+- `load_pyramids` maps the pyramids described by a sidecar.
+"""
+import os
+import json
+import numpy as np
+from .decimate import minmax, CHUNK_SIZE
+from .writer import _npy_header, HEADER_BYTES
+
+# Samples per bucket of the finest level, as a power of two.
+BASE_LEVEL = 6
+
+
+def _buckets(values: np.ndarray, size: int) -> np.ndarray:
+    """Returns the `(min, max)` pairs of buckets of `size` samples, the last
+    one possibly shorter."""
+    whole = len(values) // size * size
+    pairs = np.empty((-(-len(values) // size), 2), dtype=values.dtype)
+    if whole:
+        blocks = values[:whole].reshape(-1, size)
+        pairs[:whole // size, 0] = blocks.min(axis=1)
+        pairs[:whole // size, 1] = blocks.max(axis=1)
+    if whole < len(values):
+        pairs[-1] = values[whole:].min(), values[whole:].max()
+    return pairs
+
+
+def _reduce(pairs: np.ndarray) -> np.ndarray:
+    """Merges every two consecutive `(min, max)` pairs."""
+    if len(pairs) % 2:
+        pairs = np.concatenate((pairs, pairs[-1:]))
+    pairs = pairs.reshape(-1, 2, 2)
+    return np.stack((pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)), axis=1)
+
+
+class PyramidWriter:
+    """
+    Streaming writer of the pyramid of one trace.
+
+    The finest level is written as the samples arrive, and the coarser ones
+    are appended by `close`, from the finest one. The file is a `.npy` file of
+    `(min, max)` rows, every level following the previous one.
+
+    :param path: Path of the pyramid `.npy` file.
+    :param dtype: NumPy dtype of the trace.
+    :param base: Samples per bucket of the finest level, as a power of two.
+
+    **Attributes**:
+        - `levels` (list): `(offset, count)` rows of every level, known once
+          closed.
+        - `samples` (int): Number of samples written.
+    """
+
+    def __init__(self, path: str, dtype, base: int = BASE_LEVEL):
+        """
+        Creates the pyramid file.
+
+        :param path: Path of the pyramid `.npy` file.
+        :param dtype: NumPy dtype of the trace.
+        :param base: Samples per bucket of the finest level, as a power of two.
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.base = base
+        self.levels = []
+        self.samples = 0
+        self._size = 1 << base
+        self._rows = 0
+        self._pending = np.empty(0, dtype=self.dtype)
+        self._handle = open(path, 'wb')  # pylint: disable=R1732
+        self._handle.write(_npy_header(self.dtype, 0, columns=2))
+
+    def write(self, values: np.ndarray):
+        """
+        Adds the next samples of the trace.
+
+        :param values: The samples, following the previous ones.
+        """
+        values = np.asarray(values, dtype=self.dtype)
+        self.samples += len(values)
+        if len(self._pending):
+            values = np.concatenate((self._pending, values))
+        whole = len(values) // self._size * self._size
+        if whole:
+            self._append(_buckets(values[:whole], self._size))
+        self._pending = values[whole:].copy()
+
+    def _append(self, pairs: np.ndarray):
+        """Writes rows at the end of the file."""
+        self._handle.write(np.ascontiguousarray(pairs).tobytes())
+        self._rows += len(pairs)
+
+    def close(self) -> list:
+        """
+        Writes the last bucket and the coarser levels, then finalizes the file.
+
+        **Returns**:
+            - list: The `(offset, count)` rows of every level.
+        """
+        if self._handle is None:
+            return self.levels
+        if len(self._pending):
+            self._append(_buckets(self._pending, self._size))
+        self._handle.flush()
+        offset, count = 0, self._rows
+        self.levels = [(0, count)] if count else []
+        while count > 1:
+            # Levels are reduced in chunks of an even number of rows.
+            for start in range(0, count, CHUNK_SIZE):
+                rows = min(CHUNK_SIZE, count - start)
+                pairs = np.fromfile(self.path, dtype=self.dtype, count=2 * rows,
+                                    offset=HEADER_BYTES + (offset + start) * 2 * self.dtype.itemsize)
+                self._append(_reduce(pairs.reshape(-1, 2)))
+            self._handle.flush()
+            offset, count = offset + count, -(-count // 2)
+            self.levels.append((offset, count))
+        self._handle.seek(0)
+        self._handle.write(_npy_header(self.dtype, self._rows, columns=2))
+        self._handle.close()
+        self._handle = None
+        return self.levels
+
+
+class TracePyramid:
+    """
+    Multi-resolution view of a trace.
+
+    **Example:**
+
+    .. code-block:: python
+
+        pyramid = TracePyramid.from_array(pll.output)
+        indices, values = pyramid.window(start, stop, points=2000)
+
+    :param trace: The samples, any sliceable trace, e.g. a memory-mapped one.
+    :param rows: The `(min, max)` rows of every level, one after the other.
+    :param levels: The `(offset, count)` rows of every level.
+    :param base: Samples per bucket of the finest level, as a power of two.
+
+    **Attributes**:
+        - `trace`: The samples.
+        - `levels` (list): The `(min, max)` rows of every level.
+    """
+
+    def __init__(self, trace, rows: np.ndarray, levels: list, base: int = BASE_LEVEL):
+        """
+        Splits the rows into levels.
+
+        :param trace: The samples.
+        :param rows: The `(min, max)` rows of every level.
+        :param levels: The `(offset, count)` rows of every level.
+        :param base: Samples per bucket of the finest level.
+        """
+        self.trace = trace
+        self.base = base
+        self.levels = [rows[offset:offset + count] for offset, count in levels]
+
+    @classmethod
+    def from_array(cls, trace, base: int = BASE_LEVEL) -> 'TracePyramid':
+        """
+        Builds the pyramid of a trace in memory, one chunk at a time.
+
+        :param trace: The samples, any sliceable trace.
+        :param base: Samples per bucket of the finest level.
+
+        **Returns**:
+            - TracePyramid: The pyramid of `trace`.
+        """
+        size = 1 << base
+        step = max(CHUNK_SIZE // size, 1) * size
+        count = len(trace)
+        finest = [_buckets(np.asarray(trace[start:min(start + step, count)]), size)
+                  for start in range(0, count, step)]
+        rows = [np.concatenate(finest)] if finest else []
+        while rows and len(rows[-1]) > 1:
+            rows.append(_reduce(rows[-1]))
+        levels, offset = [], 0
+        for level in rows:
+            levels.append((offset, len(level)))
+            offset += len(level)
+        return cls(trace, np.concatenate(rows) if rows else np.empty((0, 2)), levels, base)
+
+    def __len__(self) -> int:
+        return len(self.trace)
+
+    def window(self, start: int, stop: int, points: int) -> tuple:
+        """
+        Returns about `points` points showing the samples from `start` to `stop`.
+
+        The minimum of a bucket is placed at its first sample and the maximum
+        at its middle one.
+
+        :param start: First sample of the window.
+        :param stop: Sample following the window.
+        :param points: Largest number of points returned.
+
+        **Returns**:
+            - tuple: The sorted sample indices of the points and their values.
+        """
+        start, stop = max(int(start), 0), min(int(stop), len(self))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        buckets = max(points // 2, 1)
+        # Finest level showing the window with at most `buckets` buckets.
+        level = int(np.ceil(np.log2(max((stop - start) / buckets, 1)))) - self.base
+        if level < 0 or not self.levels:
+            indices, values = minmax(self.trace[start:stop], points)
+            return indices + start, values
+        level = min(level, len(self.levels) - 1)
+        shift = self.base + level
+        first, last = start >> shift, -(-stop >> shift)
+        pairs = self.levels[level][first:last]
+        bucket = np.arange(first, first + len(pairs), dtype=np.int64) << shift
+        indices = np.stack((bucket, bucket + (1 << shift) // 2), axis=1).ravel()
+        return np.minimum(indices, len(self) - 1), np.asarray(pairs).ravel()
+
+
+def load_pyramids(path: str) -> dict:
+    """
+    Maps the traces and the pyramids described by a sidecar written by
+    `TraceWriter`.
+
+    :param path: Path of the JSON sidecar.
+
+    **Returns**:
+        - dict: A `TracePyramid` of memory-mapped arrays for every node with a
+          pyramid, keyed by node name.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        sidecar = json.load(file)
+    folder = os.path.dirname(path)
+    pyramids = {}
+    for name, node in sidecar['nodes'].items():
+        if 'pyramid' not in node:
+            continue
+        pyramid = node['pyramid']
+        # Empty files can not be mapped.
+        mode = 'r' if pyramid['levels'] else None
+        pyramids[name] = TracePyramid(
+            np.load(os.path.join(folder, node['file']), mmap_mode=mode),
+            np.load(os.path.join(folder, pyramid['file']), mmap_mode=mode),
+            pyramid['levels'], pyramid['base'])
+    return pyramids
@@ -12,12 +12,14 @@ Attributes:
     sizing_mode (str): The sizing mode for Bokeh plots (e.g., 'scale_both').
 """
 
-from bokeh.plotting import figure, show, output_file, save
-from bokeh.layouts import gridplot
-import matplotlib.pyplot as plt
+import numpy as np
+from .decimate import decimate
 
 # pylint: disable=C0301
 
+# Default number of points drawn per signal, longer signals are decimated.
+PLOT_POINTS = 4000
+
 
 class Scope:
     """
@@ -29,22 +31,26 @@ class Scope:
 
     :param grid_columns: The number of columns for arranging web-based plots in a grid. Default is 1.
     :param fit: Determines the sizing mode for Bokeh plots (e.g., 'scale_both'). Default is 'scale_both'.
+    :param max_points: The number of points drawn per signal, see `pllpython.utils.decimate`.
     """
 
-    def __init__(self, grid_columns: int = 1, fit: str = 'scale_both'):
+    def __init__(self, grid_columns: int = 1, fit: str = 'scale_both', max_points: int = PLOT_POINTS):
         """
         Initialize the Scope object.
 
         :param grid_columns: The number of columns for organizing web-based plots in a grid.
                               Default is 1 column.
         :param fit: The sizing mode for web-based Bokeh plots (e.g., 'scale_both'). Default is 'scale_both'.
+        :param max_points: The number of points drawn per signal. Default is `PLOT_POINTS`.
         """
         self.web_figures = []
         self.local_figures = []
         self.grid_columns = grid_columns
         self.sizing_mode = fit
+        self.max_points = max_points
 
-    def add_signal(self, x_arr: list[float], y_arr: list[float], name: str, x_label: str = "X", y_label: str = "Y", plot_type: str = 'local'):
+    def add_signal(self, x_arr: list[float], y_arr: list[float], name: str, x_label: str = "X", y_label: str = "Y",
+                   plot_type: str = 'local', decimation: str = 'minmax'):
         """
         Adds a new signal to the scope for plotting.
 
@@ -58,7 +64,15 @@ class Scope:
         :param x_label: The label for the x-axis. Default is "X".
         :param y_label: The label for the y-axis. Default is "Y".
         :param plot_type: The type of plot ('local' for matplotlib, 'web' for Bokeh). Default is 'local'.
+        :param decimation: 'minmax', 'lttb' or 'digital', how signals longer than `max_points`
+            are reduced, see `pllpython.utils.decimate`. Default is 'minmax'.
+
+        Long signals, e.g. memory-mapped traces, are read in chunks and only the drawn
+        points are kept.
         """
+        if len(y_arr) > self.max_points:
+            indices, y_arr = decimate(y_arr, self.max_points, decimation)
+            x_arr = np.asarray(x_arr)[indices]
         if plot_type == 'local':
             self.local_figures.append({
                 'x': x_arr,
@@ -68,6 +82,8 @@ class Scope:
                 'y_label': y_label
             })
         elif plot_type == 'web':
+            # pylint: disable=C0415
+            from bokeh.plotting import figure
             p = figure(title=name, x_axis_label=x_label, y_axis_label=y_label,
                        width=800, height=200, sizing_mode=self.sizing_mode, output_backend="webgl")
             p.step(x_arr, y_arr,
@@ -87,7 +103,10 @@ class Scope:
         :param plot_type: The type of plot to display. 'local' for matplotlib or 'web' for Bokeh. Default is 'local'.
         :param save_path: The path where the plot should be saved. If None, the plot is not saved. Default is None.
         """
+        # pylint: disable=C0415
         if plot_type == 'local':
+            import matplotlib.pyplot as plt
+
             fig = plt.figure(figsize=(10, 2 * len(self.local_figures)))
 
             for i, signal in enumerate(self.local_figures):
@@ -105,6 +124,9 @@ class Scope:
             fig = None
 
         elif plot_type == 'web':
+            from bokeh.plotting import show, output_file, save
+            from bokeh.layouts import gridplot
+
             layout = gridplot([self.web_figures[i:i + self.grid_columns]
                                for i in range(0, len(self.web_figures), self.grid_columns)],
                               sizing_mode=self.sizing_mode)
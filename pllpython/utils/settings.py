@@ -24,18 +24,23 @@ class Settings:
         self.vss = vss
         self.time_step = time_step
         self.sim_time = sim_time
-        self.time_array = np.arange(0, self.sim_time, self.time_step)
-        self.log = {'log_path': log_path}
+        self._time_array = None
+        self.log = {'log_path': log_path,
+                    'format': 'npy'}
         self.clk = {'k_vco': 20e6,
                     'fo': 0,
                     'white_phase_noise_spectral_density': 3E-10,
                     'low_frequency_phase_noise': 0,
+                    'flicker_corner': 0,
+                    'flicker_slope': 1,
                     'plot_mode': self.global_plot_mode
                     }
         self.vco = {'k_vco': 1e9,
                     'fo': 1000e6,
                     'white_phase_noise_spectral_density': 0,
                     'low_frequency_phase_noise': 0,
+                    'flicker_corner': 0,
+                    'flicker_slope': 1,
                     'plot_mode': self.global_plot_mode,
                     'id': 0
                     }
@@ -56,6 +61,28 @@ class Settings:
         self.pll = {
             'id': 0,
             'plot_mode': self.global_plot_mode}
+        self.seed = None
+        self.cache = {'path': None,
+                      'max_bytes': 1_000_000_000
+                      }
+        self.storage = {'mode': 'memory',
+                        'path': None,
+                        'chunk': 65536,
+                        'digital': None,
+                        'pyramid': True
+                        }
+        self.lock = {'cycles': 16,
+                     'max_pulse_width': 5e-11,
+                     'max_ripple': 1e-3,
+                     'hold_off': 0
+                     }
+        self.probe = {'edges': 'rising',
+                      'period': None,
+                      'segment': 1024,
+                      'overlap': 0.5,
+                      'window': 'hann',
+                      'keep_edges': False
+                      }
 
     def update_from_file(self, setting_file_path: str):
         """
@@ -104,8 +131,6 @@ class Settings:
                     if hasattr(self, 'time_step') and hasattr(self, 'sim_time'):
                         self.sample_count = int(
                             floor(self.sim_time / self.time_step))
-                        self.time_array = np.arange(
-                            0, self.sim_time, self.time_step)
                 else:
                     current_value = getattr(self, key, {})
                     updated_value = deep_update(current_value, value)
@@ -127,15 +152,26 @@ class Settings:
         Returns:
             dict: Current settings of the instance
         """
-        # Get all attributes except built-in and private ones
+        # Get all attributes except built-in and private ones. Properties
+        # built on demand, like `time_array`, are left out.
         settings = {
             key: getattr(self, key)
             for key in dir(self)
-            if not key.startswith('__') and
+            if not key.startswith('_') and
+            not isinstance(getattr(type(self), key, None), property) and
             not callable(getattr(self, key))
         }
         return settings
 
+    @property
+    def time_array(self) -> np.ndarray:
+        """Time of every sample, built on first use for the current time settings."""
+        if self._time_array is None or \
+                self._time_array[0] != (self.sim_time, self.time_step):
+            self._time_array = ((self.sim_time, self.time_step),
+                                np.arange(0, self.sim_time, self.time_step))
+        return self._time_array[1]
+
     def set_global_plot_mode(self, mode: str):
         """Sets plot mode"""
         self.global_plot_mode = mode
@@ -213,8 +249,23 @@ class Settings:
         """
         if parameter == 'all':
             self.divider = value
-            return f'Updated Divider settings to {self.lf}'
-        if parameter in self.lf.keys():
+            return f'Updated Divider settings to {self.divider}'
+        if parameter in self.divider.keys():
             self.divider[f'{parameter}'] = value
             return f'Updated Divider {parameter} to {value}'
         return f'Parameter does not exist in LF settings\nAvailable settings are {self.divider.keys()}'
+
+    def set_block_parameter(self, block: str, parameter: str, value):
+        """Updates a parameter of the block named as in `Pll.components`
+
+        Dispatches to `set_vco_parameter`, `set_lf_parameter`,
+        `set_clk_parameter` or `set_divider_parameter` for the blocks 'vco',
+        'lf', 'clk' and 'div'.
+        """
+        setters = {'vco': self.set_vco_parameter,
+                   'lf': self.set_lf_parameter,
+                   'clk': self.set_clk_parameter,
+                   'div': self.set_divider_parameter}
+        if block not in setters:
+            return f'Block does not exist\nAvailable blocks are {setters.keys()}'
+        return setters[block](parameter=parameter, value=value)
@@ -1,5 +1,10 @@
 """Parameter Sweeper Class"""
 
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .calculator import Calculator
 from .logger import setup_log
 # pylint: disable=W1203 disable=W0622
 
@@ -14,6 +19,7 @@ class Sweeper():
         log: Logger instance for recording events.
         io_file: Log file name for storing results.
         results: A list to store the sweep results.
+        traces: The traces recorded by the last batched sweep.
     """
 
     def __init__(self, pll, id: int):
@@ -28,58 +34,207 @@ class Sweeper():
         self.log, self.io_file = setup_log(name=str(__name__).replace(
             '.', '_'), id=id, settings=self.pll.settings, csv=False)
         self.results = []
+        self.traces = {}
 
-    def start(self, block: str, parameter: str, values: list):
+    def _settings_for(self, block: str, parameter: str, value):
+        """Returns a copy of the PLL settings with one parameter updated."""
+        settings = copy.deepcopy(self.pll.settings)
+        self.log.info(settings.set_block_parameter(block=block, parameter=parameter,
+                                                   value=value))
+        return settings
+
+    def start_batch(self, block: str, parameter: str, values: list,
+                    record: tuple = ('lf', 'vco')):
         """
-        Starts sweeping a given parameter over a range of values for a specified PLL block.
+        Sweeps a parameter by simulating every value in one batched run.
+
+        All the PLL configurations advance together in a single vectorized
+        time-step loop (see `pllpython.components.batch`), so the Python
+        overhead of the whole sweep is about the one of a single run.
 
         Args:
             block (str): The PLL block to modify ('vco', 'lf', 'clk', or 'div').
             parameter (str): The name of the parameter to sweep.
             values (list): A list of values to set for the parameter.
+            record (tuple): Nodes recorded for every configuration, any of
+                'clk', 'div', 'lpd_a', 'lpd_b', 'lf' and 'vco'.
 
         Returns:
-            None
+            dict: The recorded (B, N) arrays keyed by node name, also stored
+            in `self.traces`. Per value metrics (final LF output and, if the
+            VCO is recorded, the VCO frequency over the second half of the
+            run) are appended to `self.results`.
         """
+        # pylint: disable=C0415
+        from ..components.batch import build_components, run_batch
+
         if block not in self.pll.components.keys():
             self.log.info(
                 'Block not found in PLL components. Check block name.')
-            self.log.info(
-                f'Available components are {self.pll.components.keys()}')
             print('Block not found in PLL components. Check block name.')
             print(f'Available components are {self.pll.components.keys()}')
             return None
 
-        match block:
-            case 'vco':
-                self.log.info('Starting Sweeper for VCO')
-                for value in values:
-                    self.log.info(self.pll.settings.set_vco_parameter(
-                        parameter=parameter, value=value))
-                    self.pll.start_and_monitor()
-                    self.pll.show(plot_type=self.pll.settings.global_plot_mode)
-                    self.log.info(f'Results at {self.pll.io_file[:-4]}')
-            case 'lf':
-                self.log.info('Starting Sweeper for Loop Filter')
-                for value in values:
-                    self.log.info(self.pll.settings.set_lf_parameter(
-                        parameter=parameter, value=value))
-                    self.pll.start_and_monitor()
-                    self.pll.show(plot_type=self.pll.settings.global_plot_mode)
-                    self.log.info(f'Results at {self.pll.io_file[:-4]}')
-            case 'clk':
-                self.log.info('Starting Sweeper for Clock')
-                for value in values:
-                    self.log.info(self.pll.settings.set_clk_parameter(
-                        parameter=parameter, value=value))
-                    self.pll.start_and_monitor()
-                    self.pll.show(plot_type=self.pll.settings.global_plot_mode)
-                    self.log.info(f'Results at {self.pll.io_file[:-4]}')
-            case 'div':
-                self.log.info('Starting Sweeper for Divider')
-                for value in values:
-                    self.log.info(self.pll.settings.set_divider_parameter(
-                        parameter=parameter, value=value))
-                    self.pll.start_and_monitor()
-                    self.pll.show(plot_type=self.pll.settings.global_plot_mode)
-                    self.log.info(f'Results at {self.pll.io_file[:-4]}')
+        self.log.info(f'Starting batched Sweeper for {block} {parameter}')
+        settings_list = [self._settings_for(block, parameter, value)
+                         for value in values]
+        components_list = [build_components(settings)
+                           for settings in settings_list]
+        self.traces, _ = run_batch(components_list,
+                                   self.pll.settings.sample_count,
+                                   record=record)
+
+        time_step = self.pll.settings.time_step
+        for index, value in enumerate(values):
+            result = {'block': block, 'parameter': parameter, 'value': value,
+                      'lf_final': components_list[index]['lf'].output_value}
+            if 'vco' in self.traces:
+                vco = self.traces['vco'][index]
+                rising = np.flatnonzero(
+                    np.diff(vco[len(vco) // 2:]) > 0)
+                result['vco_frequency'] = float((len(rising) - 1) /
+                                                ((rising[-1] - rising[0]) * time_step)
+                                                if len(rising) > 1 else 0.0)
+            self.log.info(f'Sweep result {result}')
+            self.results.append(result)
+        return self.traces
+
+    def start(self, block: str, parameter: str, values: list, workers: int = 1,
+              headless: bool = False, save: bool = False, engine: str = 'python',
+              detect_lock: bool = False, stop_on_lock: bool = False):
+        """
+        Starts sweeping a given parameter over a range of values for a specified PLL block.
+
+        Args:
+            block (str): The PLL block to modify ('vco', 'lf', 'clk', or 'div').
+            parameter (str): The name of the parameter to sweep.
+            values (list): A list of values to set for the parameter.
+            workers (int): Number of worker processes simulating points in parallel.
+            headless (bool): If True the results are not plotted. Required when
+                `workers` is greater than 1.
+            save (bool): If True the traces of every point are written to disk.
+            engine (str): Simulation engine passed to `Pll.start_and_monitor`.
+            detect_lock (bool): If True the lock time of every point is
+                measured by the PLL lock detector, see `Pll.start_and_monitor`.
+            stop_on_lock (bool): If True every point stops once locked, see
+                `Pll.start_and_monitor`.
+
+        Returns:
+            list: One dictionary of metrics per value, see `start_grid`.
+        """
+        return self.start_grid(grid={(block, parameter): values}, workers=workers,
+                               headless=headless, save=save, engine=engine,
+                               detect_lock=detect_lock, stop_on_lock=stop_on_lock)
+
+    def start_grid(self, grid: dict, workers: int = 1, headless: bool = False,
+                   save: bool = False, engine: str = 'python',
+                   detect_lock: bool = False, stop_on_lock: bool = False):
+        """
+        Sweeps the cartesian product of several parameters.
+
+        Every point of the grid is simulated with its own copy of the PLL
+        settings. With `workers` greater than 1 the points are fanned out over
+        a process pool, which requires `headless=True` since the workers cannot
+        open plot windows.
+
+        Args:
+            grid (dict): Values to sweep keyed by `(block, parameter)`, e.g.
+                `{('lf', 'R'): [6400, 8400], ('vco', 'k_vco'): [1e9, 2e9]}`.
+            workers (int): Number of worker processes simulating points in parallel.
+            headless (bool): If True the results are not plotted.
+            save (bool): If True the traces of every point are written to disk.
+            engine (str): Simulation engine passed to `Pll.start_and_monitor`.
+            detect_lock (bool): If True the lock time of every point is
+                measured by the PLL lock detector, see `Pll.start_and_monitor`.
+            stop_on_lock (bool): If True every point stops once locked, see
+                `Pll.start_and_monitor`.
+
+        Raises:
+            ValueError: If `workers` is greater than 1 and `headless` is False.
+
+        Returns:
+            list: One dictionary per point holding the swept values keyed by
+            `block.parameter`, the `jitter` and `jitter_std` returned by
+            `Calculator.calculate_jitter` (after lock when the loop locks),
+            the `lock_time` (None if the loop never locks) reported by the
+            PLL lock detector with `detect_lock` or `stop_on_lock`, otherwise
+            by `Calculator.calculate_lock_time`, the final LF
+            output `lf_final` and the `io_file` of the saved traces (None if
+            not saved). The rows are also appended to `self.results`.
+        """
+        if workers > 1 and not headless:
+            raise ValueError('Parallel sweeps must be headless')
+        for block, _ in grid:
+            if block not in self.pll.components.keys():
+                self.log.info(
+                    'Block not found in PLL components. Check block name.')
+                self.log.info(
+                    f'Available components are {self.pll.components.keys()}')
+                print('Block not found in PLL components. Check block name.')
+                print(f'Available components are {self.pll.components.keys()}')
+                return None
+
+        keys = list(grid.keys())
+        points = list(itertools.product(*(grid[key] for key in keys)))
+        first_id = self.pll.settings.pll['id']
+        settings_list = []
+        for index, point in enumerate(points):
+            settings = copy.deepcopy(self.pll.settings)
+            settings.pll['id'] = first_id + index
+            for (block, parameter), value in zip(keys, point):
+                self.log.info(settings.set_block_parameter(
+                    block=block, parameter=parameter, value=value))
+            settings_list.append(settings)
+        self.pll.settings.pll['id'] = first_id + len(points)
+
+        self.log.info(f'Starting Sweeper over {len(points)} points '
+                      f'with {workers} worker(s)')
+        arguments = (settings_list, itertools.repeat(engine),
+                     itertools.repeat(save), itertools.repeat(headless),
+                     itertools.repeat(detect_lock), itertools.repeat(stop_on_lock))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                metrics = list(executor.map(_run_point, *arguments))
+        else:
+            metrics = list(map(_run_point, *arguments))
+
+        rows = []
+        for point, result in zip(points, metrics):
+            row = {f'{block}.{parameter}': value
+                   for (block, parameter), value in zip(keys, point)}
+            row.update(result)
+            self.log.info(f'Sweep result {row}')
+            rows.append(row)
+        self.results.extend(rows)
+        return rows
+
+
+def _run_point(settings, engine: str, save: bool, headless: bool,
+               detect_lock: bool, stop_on_lock: bool) -> dict:
+    """Simulates one sweep point and returns its metrics."""
+    # pylint: disable=C0415
+    from ..components.pll import Pll
+
+    pll = Pll(settings=settings)
+    pll.start_and_monitor(engine=engine, save=save, progress=not headless,
+                          detect_lock=detect_lock, stop_on_lock=stop_on_lock)
+    if not headless:
+        pll.show(plot_type=settings.global_plot_mode)
+
+    calculator = Calculator(settings=settings)
+    output = np.asarray(pll.output)
+    if pll.lock is not None:
+        lock_time = pll.lock_time
+    else:
+        lock_time = calculator.calculate_lock_time(
+            pll.components['clk'].io['output'], pll.components['div'].io['output'])
+    if lock_time is not None:
+        output = output[round(lock_time / settings.time_step):]
+    jitter, jitter_std = np.nan, np.nan
+    if np.count_nonzero(np.diff(output)) > 2:
+        jitter, jitter_std = calculator.calculate_jitter(output, plot=False)
+    return {'jitter': float(jitter),
+            'jitter_std': float(jitter_std),
+            'lock_time': lock_time,
+            'lf_final': float(pll.components['lf'].output_value),
+            'io_file': pll.io_file if save else None}
@@ -0,0 +1,247 @@
+"""Trace Buffers
+
+This module provides `TraceBuffer`, the container used by every component (and
+by `Pll.output`) to record its io traces.
+
+A trace buffer is a preallocated, typed NumPy array with a write cursor. It
+appends one sample at a time like a `collections.deque`, optionally rolls over
+like a deque with a `maxlen` (ring mode), and hands out the recorded samples as
+a NumPy view without copying them.
+
+With `settings.storage['mode'] = 'disk'` the component buffers only hold one
+chunk of `settings.storage['chunk']` samples. `Pll` streams every chunk to a
+`.npy` file and maps the files back as `np.memmap` arrays once the run is over,
+so the memory used by a run does not grow with `sim_time`. With
+`settings.storage['mode'] = 'none'` the buffers are sized the same way but
+nothing is written, they keep the last chunk of the run, e.g. for runs only
+measured by a `JitterProbe`. In memory mode the two-level nodes can be kept
+in the compact `DigitalBuffer` instead, see `settings.storage['digital']`.
+"""
+import numpy as np
+from .digital import DigitalBuffer
+
+# Largest number of samples moved at once when a ring buffer is rotated.
+MOVE_BLOCK = 65536
+
+
+class TraceBuffer:
+    """
+    Preallocated typed buffer for a simulated signal.
+
+    :param capacity: Number of samples to preallocate.
+    :param dtype: NumPy dtype of the samples. Defaults to `float64`, use
+        `uint8` for digital nodes holding 0/1 values.
+    :param ring: If `True` the buffer keeps only the last `capacity` samples,
+        like a deque with `maxlen=capacity`. Otherwise it grows when full.
+
+    **Attributes**:
+        - `capacity` (int): Number of samples the buffer can hold.
+        - `dtype` (np.dtype): Type of the stored samples.
+        - `ring` (bool): Whether the buffer rolls over when full.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64, ring: bool = False):
+        """
+        Initialize an empty trace buffer.
+
+        :param capacity: Number of samples to preallocate.
+        :param dtype: NumPy dtype of the samples.
+        :param ring: If `True` the oldest samples are overwritten when full.
+        """
+        self.capacity: int = max(int(capacity), 1)
+        self.dtype = np.dtype(dtype)
+        self.ring: bool = ring
+        self._data = np.empty(self.capacity, dtype=self.dtype)
+        self._index: int = 0
+        self._wrapped: bool = False
+        # `True` while `_data` is an array wrapped by `from_array`.
+        self._shared: bool = False
+
+    @classmethod
+    def for_settings(cls, settings, dtype=np.float64, levels=None):
+        """
+        Creates the io buffer of a component for the given settings.
+
+        :param settings: Simulation settings.
+        :param dtype: NumPy dtype of the samples.
+        :param levels: The `(low, high)` values of a two-level node, stored in
+            a `DigitalBuffer` when `settings.storage['digital']` is set in
+            memory mode.
+
+        **Returns**:
+            - TraceBuffer: A ring buffer holding the whole run, or one chunk
+              of `settings.storage['chunk']` samples in disk and none modes.
+        """
+        storage = getattr(settings, 'storage', None) or {}
+        disk = storage.get('mode') in ('disk', 'none')
+        if levels is not None and storage.get('digital') and not disk:
+            return DigitalBuffer(levels, encoding=storage['digital'], dtype=dtype,
+                                 capacity=settings.sample_count)
+        capacity = storage['chunk'] if disk else settings.sample_count
+        return cls(capacity, dtype=dtype, ring=True)
+
+    @classmethod
+    def from_array(cls, array, ring: bool = False) -> 'TraceBuffer':
+        """
+        Wraps an existing array without copying it.
+
+        The array is never written: the first sample written past its end, or
+        after `clear`, moves the buffer to its own storage.
+
+        :param array: The samples, already in chronological order. NumPy
+            subclasses such as `np.memmap` are kept.
+        :param ring: Ring mode of the returned buffer.
+
+        **Returns**:
+            - TraceBuffer: A full buffer whose storage is `array`.
+        """
+        array = np.asanyarray(array)
+        buffer = cls(capacity=len(array), dtype=array.dtype, ring=ring)
+        if len(array):
+            buffer._data = array
+            buffer._index = len(array)
+            buffer._shared = True
+        return buffer
+
+    def empty_like(self, capacity: int) -> 'TraceBuffer':
+        """
+        Creates an empty buffer with the same dtype and ring mode.
+
+        :param capacity: Number of samples to preallocate.
+
+        **Returns**:
+            - TraceBuffer: The new buffer.
+        """
+        return TraceBuffer(capacity, dtype=self.dtype, ring=self.ring)
+
+    def append(self, value):
+        """
+        Appends one sample.
+
+        :param value: The sample to append.
+        """
+        index = self._index
+        if index == self.capacity:
+            index = self._overflow(1)
+        self._data[index] = value
+        self._index = index + 1
+
+    def extend(self, values):
+        """
+        Appends an array of samples.
+
+        :param values: The samples to append, in chronological order.
+        """
+        values = np.asarray(values, dtype=self.dtype)
+        count = len(values)
+        if self.ring and count >= self.capacity:
+            self._own(0)
+            self._data[:] = values[count - self.capacity:]
+            self._index = self.capacity
+            self._wrapped = True
+            return
+        written = 0
+        while written < count:
+            index = self._index
+            if index == self.capacity:
+                index = self._overflow(count - written)
+            chunk = min(count - written, self.capacity - index)
+            self._data[index:index + chunk] = values[written:written + chunk]
+            self._index = index + chunk
+            written += chunk
+
+    def _overflow(self, needed: int) -> int:
+        """Makes room once the cursor reaches the end of the storage."""
+        if self.ring:
+            self._own(self._index)
+            self._wrapped = True
+            return 0
+        self.capacity = max(self.capacity * 2, self.capacity + needed)
+        data = np.empty(self.capacity, dtype=self.dtype)
+        data[:self._index] = self._data[:self._index]
+        self._data = data
+        self._shared = False
+        return self._index
+
+    def _own(self, keep: int):
+        """Copies the first `keep` samples of a wrapped array to storage of
+        the buffer's own, before it is written."""
+        if self._shared:
+            data = np.empty(self.capacity, dtype=self.dtype)
+            data[:keep] = self._data[:keep]
+            self._data = data
+            self._shared = False
+
+    def view(self) -> np.ndarray:
+        """
+        Returns the recorded samples in chronological order.
+
+        The returned array shares memory with the buffer. If a ring buffer has
+        rolled over since the last call, its storage is first rotated in place
+        once, with a temporary copy of the smaller of its two parts.
+
+        **Returns**:
+            - np.ndarray: The recorded samples.
+        """
+        if not self._wrapped:
+            return self._data[:self._index]
+        if self._index != self.capacity:
+            self._rotate()
+            self._index = self.capacity
+        return self._data
+
+    def _rotate(self):
+        """Moves the oldest sample, at the cursor, to the start of the storage."""
+        data, shift = self._data, self._index
+        rest = self.capacity - shift
+        if shift <= rest:
+            saved = data[:shift].copy()
+            self._move(shift, 0, rest)
+            data[rest:] = saved
+        else:
+            saved = data[shift:].copy()
+            self._move(0, rest, shift)
+            data[:rest] = saved
+
+    def _move(self, source: int, target: int, count: int):
+        """Moves `count` samples within the storage, one block at a time so
+        overlapping blocks never need a temporary copy larger than `MOVE_BLOCK`."""
+        block = max(abs(source - target), MOVE_BLOCK)
+        starts = range(0, count, block)
+        if target > source:
+            starts = reversed(starts)
+        for start in starts:
+            stop = min(start + block, count)
+            self._data[target + start:target + stop] = self._data[source + start:source + stop]
+
+    def clear(self):
+        """Removes every sample, keeping the preallocated storage."""
+        self._own(0)
+        self._index = 0
+        self._wrapped = False
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the preallocated storage, in bytes."""
+        return self._data.nbytes
+
+    def __len__(self) -> int:
+        return self.capacity if self._wrapped else self._index
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.view()
+        if dtype is not None and np.dtype(dtype) != array.dtype:
+            return array.astype(dtype)
+        if copy:
+            return array.copy()
+        return array
+
+    def __repr__(self) -> str:
+        return (f'TraceBuffer(len={len(self)}, capacity={self.capacity}, '
+                f'dtype={self.dtype}, ring={self.ring})')
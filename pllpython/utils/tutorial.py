@@ -1,5 +1,4 @@
 import os
-import requests
 import zipfile
 import platform
 import tempfile
@@ -17,6 +16,9 @@ else:
 
 def install_tutorial():
     """Download tutorial ZIP from GitHub, extract it, and clean up the ZIP file."""
+    # pylint: disable=C0415
+    import requests
+
     print("Downloading tutorial ZIP from GitHub...")
 
     try:
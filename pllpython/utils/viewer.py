@@ -0,0 +1,132 @@
+"""Pyramid Viewer
+
+This module provides `PyramidView`, a Bokeh server application that draws the
+traces of a run at the resolution of the visible time range.
+
+Every trace is drawn from its `TracePyramid` with at most `points` points.
+Whenever the plots are panned or zoomed, the browser sends the new range and
+the server answers with the points of that window, read from the matching
+pyramid level, or from the raw samples once zoomed in far enough. Runs of
+10^8 samples stored in disk mode can be explored this way without loading
+them.
+"""
+import numpy as np
+from .scope import PLOT_POINTS
+
+# pylint: disable=C0415
+
+
+class PyramidView:
+    """
+    Bokeh server application showing traces from their pyramids.
+
+    **Example:**
+
+    .. code-block:: python
+
+        pyramids = load_pyramids('run_traces.json')
+        PyramidView(pyramids, time_step=settings.time_step).serve()
+
+    :param pyramids: `TracePyramid` of every trace, keyed by name, all with
+        the same number of samples.
+    :param titles: Optional plot titles keyed by name.
+    :param time_step: Time between two samples, in seconds.
+    :param start_time: Time of the first sample, in seconds.
+    :param points: Largest number of points drawn per trace.
+    :param fit: Sizing mode of the Bokeh plots.
+    """
+
+    def __init__(self, pyramids: dict, titles: dict = None, time_step: float = 1.0,
+                 start_time: float = 0.0, points: int = PLOT_POINTS, fit: str = 'scale_both'):
+        """
+        Initialize the view.
+
+        :param pyramids: `TracePyramid` of every trace, keyed by name.
+        :param titles: Optional plot titles keyed by name.
+        :param time_step: Time between two samples, in seconds.
+        :param start_time: Time of the first sample, in seconds.
+        :param points: Largest number of points drawn per trace.
+        :param fit: Sizing mode of the Bokeh plots.
+        """
+        self.pyramids = pyramids
+        self.titles = {name: (titles or {}).get(name, name) for name in pyramids}
+        self.time_step = time_step
+        self.start_time = start_time
+        self.points = points
+        self.sizing_mode = fit
+        self.samples = max((len(pyramid) for pyramid in pyramids.values()), default=0)
+
+    @property
+    def end_time(self) -> float:
+        """Time following the last sample, in seconds."""
+        return self.start_time + self.samples * self.time_step
+
+    def data(self, name: str, start_time: float = None, end_time: float = None) -> dict:
+        """
+        Returns the points of a trace between two times.
+
+        :param name: Name of the trace.
+        :param start_time: Start of the window in seconds, the first sample if
+            `None`.
+        :param end_time: End of the window in seconds, the last sample if
+            `None`.
+
+        **Returns**:
+            - dict: The times `x` and the values `y` of the points.
+        """
+        start, stop = 0, self.samples
+        if start_time is not None:
+            start = int(np.floor((start_time - self.start_time) / self.time_step))
+        if end_time is not None:
+            stop = int(np.ceil((end_time - self.start_time) / self.time_step)) + 1
+        indices, values = self.pyramids[name].window(start, stop, self.points)
+        return {'x': self.start_time + indices * self.time_step,
+                'y': np.asarray(values, dtype=float)}
+
+    def make_document(self, doc):
+        """
+        Builds the plots of one browser session.
+
+        :param doc: The Bokeh document of the session.
+        """
+        from bokeh.plotting import figure
+        from bokeh.models import ColumnDataSource, Range1d
+        from bokeh.events import RangesUpdate
+        from bokeh.layouts import gridplot
+        from .formatter import get_time_format, get_volts_format
+
+        x_range = Range1d(self.start_time, self.end_time,
+                          bounds=(self.start_time, self.end_time))
+        sources, plots = {}, []
+        for name in self.pyramids:
+            sources[name] = ColumnDataSource(self.data(name))
+            plot = figure(title=self.titles[name], x_axis_label='Seconds', y_axis_label='Volts',
+                          width=800, height=200, sizing_mode=self.sizing_mode, x_range=x_range)
+            plot.line('x', 'y', source=sources[name], line_width=2)
+            plot.xaxis.formatter = get_time_format()
+            plot.yaxis.formatter = get_volts_format()
+            plots.append(plot)
+
+        def update(event):
+            for name, source in sources.items():
+                source.data = self.data(name, event.x0, event.x1)
+
+        for plot in plots:
+            plot.on_event(RangesUpdate, update)
+        doc.add_root(gridplot([[plot] for plot in plots], sizing_mode=self.sizing_mode))
+        doc.title = 'PLL Traces'
+
+    def serve(self, port: int = 5006, show: bool = True):
+        """
+        Starts a local Bokeh server and blocks until it is stopped.
+
+        :param port: Port of the server, 0 for any free port.
+        :param show: If `True` the application is opened in a browser.
+        """
+        from bokeh.server.server import Server
+
+        server = Server({'/': self.make_document}, port=port, num_procs=1)
+        server.start()
+        if show:
+            server.io_loop.add_callback(server.show, '/')
+        server.io_loop.start()
@@ -0,0 +1,242 @@
+"""Trace Writer
+
+This module provides `TraceWriter`, the streaming writer used to store the io
+traces of a simulation, and helpers to read them back.
+
+Each node (time, CLK, divider, LPD A/B, LF, VCO, ...) is appended chunk by
+chunk to its own `.npy` file while the simulation runs, and a JSON sidecar
+file describes the nodes. The files are written by a background thread fed by
+a bounded queue, so writing overlaps the simulation loop and at most
+`queue_size` chunks are held in memory. Once closed, every node file is a
+regular `.npy` file that `np.load(..., mmap_mode='r')` maps without reading
+it. The writer can also build the min/max pyramid of some nodes on the way,
+see `pllpython.utils.pyramid`. CSV is an optional export, see `export_csv`.
+"""
+import os
+import json
+import queue
+import threading
+import numpy as np
+
+SIDECAR_VERSION = 1
+# Column title of every node of the PLL traces, keyed by node name. Every
+# saved run uses these names, see `Pll` and `save_io`.
+TRACE_HEADERS = {'time': 'Time', 'clk': 'CLK Output', 'div': 'Divider Output',
+                 'lpd_a': 'LPD Output A', 'lpd_b': 'LPD Output B',
+                 'lf': 'Loop Filter Output', 'vco': 'VCO Output'}
+# Fixed size of the `.npy` header, so it can be rewritten once the final
+# number of samples is known.
+HEADER_BYTES = 128
+
+
+def _npy_header(dtype: np.dtype, samples: int, columns: int = None) -> bytes:
+    """Builds a version 1.0 `.npy` header of exactly `HEADER_BYTES` bytes,
+    for `samples` rows of `columns` values if given."""
+    header = repr({'descr': np.lib.format.dtype_to_descr(dtype),
+                   'fortran_order': False,
+                   'shape': (samples,) if columns is None else (samples, columns)})
+    length = HEADER_BYTES - 10
+    header = header.ljust(length - 1) + '\n'
+    return (b'\x93NUMPY\x01\x00' + length.to_bytes(2, 'little') +
+            header.encode('latin1'))
+
+
+class TraceWriter:
+    """
+    Streaming writer of simulation traces.
+
+    **Example:**
+
+    .. code-block:: python
+
+        with TraceWriter('run.json', {'time': float, 'vco': float}) as writer:
+            for chunk in chunks:
+                writer.write({'time': chunk.time, 'vco': chunk.vco})
+        traces = load_traces('run.json')
+
+    :param path: Path of the JSON sidecar. Node files are written next to it
+        as `<path without extension>_<node>.npy`.
+    :param nodes: Dtype of every node, keyed by node name. The order is kept
+        in the sidecar and in CSV exports.
+    :param headers: Optional column titles keyed by node name.
+    :param metadata: Optional JSON serializable values stored in the sidecar,
+        e.g. the time step.
+    :param queue_size: Number of chunks that can wait for the writing thread
+        before `write` blocks.
+    :param pyramid: Names of the nodes whose min/max pyramid is written to
+        `<path without extension>_<node>_pyramid.npy`, see `load_pyramids`.
+
+    **Attributes**:
+        - `path` (str): Path of the JSON sidecar.
+        - `files` (dict): Path of every node file, keyed by node name.
+        - `pyramids` (dict): `PyramidWriter` of the nodes with a pyramid.
+        - `samples` (int): Number of samples written per node.
+    """
+
+    def __init__(self, path: str, nodes: dict, headers: dict = None,
+                 metadata: dict = None, queue_size: int = 4, pyramid=()):
+        """
+        Creates the node files and starts the writing thread.
+
+        :param path: Path of the JSON sidecar.
+        :param nodes: Dtype of every node, keyed by node name.
+        :param headers: Optional column titles keyed by node name.
+        :param metadata: Optional values stored in the sidecar.
+        :param queue_size: Number of chunks that can wait for the thread.
+        :param pyramid: Names of the nodes with a min/max pyramid.
+        """
+        # pylint: disable=C0415
+        from .pyramid import PyramidWriter
+        self.path = path
+        self.nodes = {name: np.dtype(dtype) for name, dtype in nodes.items()}
+        self.headers = {name: (headers or {}).get(name, name)
+                        for name in self.nodes}
+        self.metadata = metadata or {}
+        base = os.path.splitext(path)[0]
+        self.files = {name: f'{base}_{name}.npy' for name in self.nodes}
+        self.samples = 0
+        self._handles = {}
+        for name, file in self.files.items():
+            handle = open(file, 'wb')  # pylint: disable=R1732
+            handle.write(_npy_header(self.nodes[name], 0))
+            self._handles[name] = handle
+        self.pyramids = {name: PyramidWriter(f'{base}_{name}_pyramid.npy', self.nodes[name])
+                         for name in pyramid}
+        self._queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._error = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        """Writes the queued chunks until `None` is received."""
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            try:
+                for name, values in chunk.items():
+                    self._handles[name].write(values.tobytes())
+                    if name in self.pyramids:
+                        self.pyramids[name].write(values)
+            except Exception as error:  # pylint: disable=W0718
+                self._error = error
+
+    def write(self, chunk: dict):
+        """
+        Queues one chunk of samples for every node.
+
+        The arrays must not be modified until the writer is closed, since they
+        are written by the background thread.
+
+        :param chunk: Arrays of equal length keyed by node name.
+
+        :raises ValueError: If a node is missing or the lengths differ.
+        """
+        if set(chunk) != set(self.nodes):
+            raise ValueError(
+                f'Expected the nodes {list(self.nodes)}, got {list(chunk)}')
+        lengths = {len(values) for values in chunk.values()}
+        if len(lengths) != 1:
+            raise ValueError('Every node of a chunk needs the same length')
+        if self._error is not None:
+            raise self._error
+        self._queue.put({name: np.ascontiguousarray(values, dtype=self.nodes[name])
+                         for name, values in chunk.items()})
+        self.samples += lengths.pop()
+
+    def close(self) -> str:
+        """
+        Waits for the queued chunks, finalizes the node files and the sidecar.
+
+        **Returns**:
+            - str: The path of the JSON sidecar.
+        """
+        if self._thread is None:
+            return self.path
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        for name, handle in self._handles.items():
+            handle.seek(0)
+            handle.write(_npy_header(self.nodes[name], self.samples))
+            handle.close()
+        if self._error is not None:
+            raise self._error
+        nodes = {name: {'file': os.path.basename(file),
+                        'dtype': self.nodes[name].str,
+                        'header': self.headers[name]}
+                 for name, file in self.files.items()}
+        for name, pyramid in self.pyramids.items():
+            nodes[name]['pyramid'] = {'file': os.path.basename(pyramid.path),
+                                      'base': pyramid.base,
+                                      'levels': pyramid.close()}
+        sidecar = {'version': SIDECAR_VERSION,
+                   'samples': self.samples,
+                   'nodes': nodes,
+                   'metadata': self.metadata}
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(sidecar, file, indent=2)
+        return self.path
+
+    def __enter__(self) -> 'TraceWriter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def load_traces(path: str) -> dict:
+    """
+    Maps the node files described by a sidecar written by `TraceWriter`.
+
+    :param path: Path of the JSON sidecar.
+
+    **Returns**:
+        - dict: Read-only memory-mapped arrays keyed by node name.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        sidecar = json.load(file)
+    folder = os.path.dirname(path)
+    return {name: np.load(os.path.join(folder, node['file']), mmap_mode='r')
+            for name, node in sidecar['nodes'].items()}
+
+
+def export_csv(path: str, csv_path: str = None, chunk_size: int = 65536) -> str:
+    """
+    Exports the traces of a sidecar to a CSV file, chunk by chunk.
+
+    :param path: Path of the JSON sidecar.
+    :param csv_path: Path of the CSV file, defaults to the sidecar path with a
+        `.csv` extension.
+    :param chunk_size: Number of rows formatted at once.
+
+    **Returns**:
+        - str: The path of the CSV file.
+    """
+    if csv_path is None:
+        csv_path = os.path.splitext(path)[0] + '.csv'
+    with open(path, 'r', encoding='utf-8') as file:
+        headers = [node['header'] for node in json.load(file)['nodes'].values()]
+    traces = list(load_traces(path).values())
+    write_csv(traces, headers, csv_path, chunk_size)
+    return csv_path
+
+
+def write_csv(io_arrays: list, headers: list[str], csv_path: str,
+              chunk_size: int = 65536):
+    """
+    Writes equal length arrays as the columns of a CSV file, chunk by chunk.
+
+    :param io_arrays: The columns.
+    :param headers: Title of every column, written on the first line.
+    :param csv_path: Path of the CSV file.
+    :param chunk_size: Number of rows formatted at once.
+    """
+    samples = min((len(values) for values in io_arrays), default=0)
+    with open(csv_path, 'w', encoding='utf-8') as file:
+        file.write(f'{",".join(headers)}\n')
+        for start in range(0, samples, chunk_size):
+            stop = min(start + chunk_size, samples)
+            np.savetxt(file, np.column_stack([np.asarray(values[start:stop], dtype=float)
+                                              for values in io_arrays]),
+                       delimiter=',')
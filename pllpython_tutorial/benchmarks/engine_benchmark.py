@@ -0,0 +1,65 @@
+"""Engine benchmark
+
+Compares the throughput, in simulated samples per second, of the per-object
+'python' engine, the 'fused' engine and the 'event' engine of `Pll.start`, and
+checks that the fused engine produces bit-identical traces for noise-free
+settings.
+
+Run from the repository root:
+
+    python pllpython_tutorial/benchmarks/engine_benchmark.py --sim-time 4e-6
+"""
+import argparse
+import tempfile
+from time import perf_counter
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.components.engine import BACKEND
+from pllpython.utils.settings import Settings
+
+
+def build_settings(sim_time: float) -> Settings:
+    """Default settings with every noise source disabled."""
+    settings = Settings(name='engine_benchmark',
+                        log_path=tempfile.gettempdir(), sim_time=sim_time)
+    settings.set_clk_parameter('white_phase_noise_spectral_density', 0)
+    settings.set_vco_parameter('white_phase_noise_spectral_density', 0)
+    return settings
+
+
+def run(engine: str, sim_time: float) -> tuple:
+    """Runs one simulation and returns the PLL and the samples per second."""
+    pll = Pll(settings=build_settings(sim_time))
+    start = perf_counter()
+    pll.start(engine=engine)
+    elapsed = perf_counter() - start
+    return pll, pll.settings.sample_count / elapsed
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sim-time', type=float, default=4e-6)
+    args = parser.parse_args()
+
+    # Warm up the JIT so compilation is not counted in the fused numbers.
+    run('fused', 1e-8)
+
+    reference, python_rate = run('python', args.sim_time)
+    fused, fused_rate = run('fused', args.sim_time)
+    event, event_rate = run('event', args.sim_time)
+    steps = event.events.steps
+    identical = np.array_equal(np.asarray(reference.output, dtype=float),
+                               np.asarray(fused.output, dtype=float))
+
+    print(f'Samples: {reference.settings.sample_count}')
+    print(f'python engine: {python_rate:,.0f} samples/s')
+    print(f'fused engine ({BACKEND}): {fused_rate:,.0f} samples/s')
+    print(f'Speed-up: {fused_rate / python_rate:.1f}x')
+    print(f'event engine: {event_rate:,.0f} samples/s ({steps} steps)')
+    print(f'Speed-up: {event_rate / python_rate:.1f}x')
+    print(f'Bit-identical output: {identical}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Import benchmark
+
+Measures the cold-start cost of `import pllpython.components` in fresh
+interpreters, as paid by every sweep worker process, and checks that the
+plotting, progress, test and download dependencies are not loaded by it.
+Exits with a non-zero status if the median import time exceeds the budget.
+
+Run from the repository root:
+
+    python pllpython_tutorial/benchmarks/import_benchmark.py --budget 0.5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules only needed by `Pll.show`, `Scope`, the formatters, the progress
+# bars, the `unit_test` methods, `install_tutorial` and the fused kernel.
+DEFERRED = ('matplotlib', 'bokeh', 'tqdm', 'scipy', 'pytest', 'requests',
+            'numba')
+
+PROBE = f"""
+import sys, json
+from time import perf_counter
+start = perf_counter()
+import pllpython.components
+elapsed = perf_counter() - start
+print(json.dumps({{'elapsed': elapsed,
+                  'loaded': [name for name in {DEFERRED!r} if name in sys.modules]}}))
+"""
+
+
+def measure() -> dict:
+    """Imports `pllpython.components` in a fresh interpreter."""
+    output = subprocess.run([sys.executable, '-c', PROBE], check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    median = statistics.median(run['elapsed'] for run in runs)
+    loaded = sorted({name for run in runs for name in run['loaded']})
+
+    print(f'import pllpython.components: {median * 1e3:.0f} ms '
+          f'(median of {args.repeat}, budget {args.budget * 1e3:.0f} ms)')
+    print(f'Deferred modules loaded: {loaded or "none"}')
+    if median > args.budget or loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
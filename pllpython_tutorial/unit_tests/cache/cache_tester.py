@@ -0,0 +1,73 @@
+"""Result Cache Unit Test Suite
+
+This module contains the unit tests for the `ResultCache` class and for the
+cached runs of the `Pll` class.
+
+Tests:
+    - `test_cached_run`: Checks that a second run with the same settings is
+      loaded from the cache with identical traces and final state.
+    - `test_eviction`: Checks that the least recently used entries are removed
+      once the cache grows over `max_bytes`.
+"""
+
+import copy
+import tempfile
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.utils.cache import ResultCache
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Cache_Tester', log_path=tempfile.gettempdir())
+settings.set_time(sim_time=2e-6, time_step=settings.time_step)
+settings.seed = 1234
+
+
+def test_cached_run():
+    """
+    Runs the same noisy, seeded PLL twice with a cache, then once bypassing it.
+
+    Asserts:
+        The first run stores one entry, the second run restores the same
+        traces and component state, and a bypassed run matches both.
+    """
+    run_settings = copy.deepcopy(settings)
+    run_settings.cache['path'] = tempfile.mkdtemp()
+    cache = ResultCache.from_settings(run_settings)
+
+    first = Pll(settings=run_settings)
+    first.start_and_monitor(save=False, progress=False)
+    assert len(cache.entries()) == 1
+
+    second = Pll(settings=run_settings)
+    second.start_and_monitor(save=False, progress=False)
+    third = Pll(settings=run_settings)
+    third.start_and_monitor(save=False, progress=False, bypass_cache=True)
+
+    for pll in (second, third):
+        assert np.array_equal(pll.output, first.output)
+        assert np.array_equal(pll.components['lpd'].io['output_a'],
+                              first.components['lpd'].io['output_a'])
+        assert pll.feedback == first.feedback
+        assert pll.samples == first.samples
+        assert pll.components['vco'].get_state() == first.components['vco'].get_state()
+    assert np.allclose(second.time_array, first.time_array)
+
+
+def test_eviction():
+    """
+    Stores entries in a cache that only holds about two of them.
+
+    Asserts:
+        The oldest entries are evicted and a touched entry is kept.
+    """
+    cache = ResultCache(path=tempfile.mkdtemp(), max_bytes=2_500)
+    arrays = {'trace': np.random.default_rng(0).random(100)}
+    keys = [ResultCache.key(settings, index=index) for index in range(4)]
+    cache.store(keys[0], arrays)
+    cache.store(keys[1], arrays)
+    assert cache.load(keys[0]) is not None
+    cache.store(keys[2], arrays)
+
+    assert cache.load(keys[1]) is None
+    assert np.array_equal(cache.load(keys[0])['trace'], arrays['trace'])
+    assert sum(size for _, size, _ in cache.entries()) <= cache.max_bytes
@@ -0,0 +1,62 @@
+"""Calculator Unit Test Suite
+
+This module contains the unit tests for the jitter extraction of the
+`Calculator` class.
+
+Tests:
+    - `test_interpolated_jitter`: Checks that the transitions interpolated with
+      the VCO phase give the jitter of a modulated VCO independently of the time
+      step, also from memory-mapped traces.
+"""
+
+import os
+import tempfile
+import numpy as np
+from pllpython.components.vco import Vco
+from pllpython.utils.calculator import Calculator
+from pllpython.utils.settings import Settings
+
+
+def run_vco(time_step: float, modulation: float) -> tuple:
+    """Runs a noise-free VCO with a sine-modulated control voltage."""
+    settings = Settings(name='Calculator_Tester', time_step=time_step, sim_time=2e-6)
+    settings.set_vco_parameter(parameter='fo', value=1.03e9)
+    time = np.arange(settings.sample_count) * time_step
+    vco = Vco(settings=settings)
+    vco.start(input_array=0.2 + modulation * np.sin(2 * np.pi * 5e6 * time))
+    return Calculator(settings=settings), vco
+
+
+def test_interpolated_jitter():
+    """
+    Measures the jitter of a constant and of a modulated VCO at a fine and at a
+    coarse time step.
+
+    Asserts:
+        Interpolated transitions give no jitter for the constant VCO, the same
+        jitter at both time steps for the modulated one, unlike transitions on
+        the sample grid, and the same values from memory-mapped traces.
+    """
+    calculator, vco = run_vco(time_step=1e-10, modulation=0)
+    assert calculator.calculate_jitter(vco.io['output'], plot=False)[0] > 1e-2
+    assert calculator.calculate_jitter(vco.io['output'], plot=False,
+                                       phase=vco.phase_trace())[0] < 1e-6
+
+    fine = run_vco(time_step=1e-11, modulation=0.05)
+    coarse = run_vco(time_step=1e-10, modulation=0.05)
+    expected, _ = fine[0].calculate_jitter(fine[1].io['output'], plot=False,
+                                           phase=fine[1].phase_trace())
+    on_grid, _ = coarse[0].calculate_jitter(coarse[1].io['output'], plot=False)
+    calculator, vco = coarse
+    jitter, std_dev = calculator.calculate_jitter(vco.io['output'], plot=False,
+                                                  phase=vco.phase_trace())
+    assert abs(jitter / expected - 1) < 1e-3
+    assert abs(on_grid / expected - 1) > 0.5
+
+    folder = tempfile.mkdtemp()
+    np.save(os.path.join(folder, 'output.npy'), np.asarray(vco.io['output']))
+    np.save(os.path.join(folder, 'phase.npy'), vco.phase_trace())
+    mapped = calculator.calculate_jitter(
+        np.load(os.path.join(folder, 'output.npy'), mmap_mode='r'), plot=False,
+        phase=np.load(os.path.join(folder, 'phase.npy'), mmap_mode='r'))
+    assert mapped == (jitter, std_dev)
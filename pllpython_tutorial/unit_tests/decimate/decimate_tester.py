@@ -0,0 +1,79 @@
+"""Decimation Unit Test Suite
+
+This module contains the unit tests for `pllpython.utils.decimate`, which
+reduces long traces before `Pll.show` and `Scope` plot them.
+
+Tests:
+    - `test_decimation`: Checks that every mode keeps the budget, the
+      extremes, the end points and, for two-level signals, every edge.
+    - `test_scope_budget`: Checks that a multi-million-sample trace is added to
+      a `Scope` quickly and with at most `max_points` points.
+"""
+
+import time
+import numpy as np
+import pytest
+from pllpython.utils.decimate import decimate, CHUNK_SIZE
+from pllpython.utils.edges import EdgeTrace
+from pllpython.utils.scope import Scope
+
+
+def test_decimation():
+    """
+    Decimates a noisy sine and a square wave spanning several chunks.
+
+    Asserts:
+        The kept samples are within budget and keep the features of the trace.
+    """
+    rng = np.random.default_rng(1)
+    count = 2 * CHUNK_SIZE + 17
+    analog = np.sin(np.arange(count) / 5e4) + rng.normal(0, 0.01, count)
+    analog[123456] = 5.0
+
+    indices, values = decimate(analog, 1000, 'minmax')
+    assert len(indices) <= 1000
+    assert np.array_equal(values, analog[indices])
+    assert values.max() == 5.0 and values.min() == analog.min()
+
+    indices, values = decimate(analog, 1000, 'lttb')
+    assert len(indices) == 1000
+    assert indices[0] == 0 and indices[-1] == count - 1
+    assert np.all(np.diff(indices) > 0)
+    assert np.array_equal(values, analog[indices])
+
+    square = np.resize([0.0, 1.2], 300).repeat(rng.integers(1, 20000, 300))[:count]
+    for trace in (square, EdgeTrace.from_dense(square, low=0.0, high=1.2)):
+        indices, values = decimate(trace, 1000, 'digital')
+        assert len(indices) <= 1000
+        # Holding every kept sample until the next one redraws the trace.
+        held = values[np.searchsorted(indices, np.arange(count), 'right') - 1]
+        assert np.array_equal(held, square)
+    indices, values = decimate(square, 100, 'digital')
+    assert len(indices) <= 100
+
+    with pytest.raises(ValueError):
+        decimate(analog, 1000, 'stride')
+
+
+def test_scope_budget():
+    """
+    Adds a 5-million-sample trace to a local and a web scope.
+
+    Asserts:
+        Both keep at most `max_points` points and take well under a second.
+    """
+    count = 5_000_000
+    time_array = np.arange(count) * 1e-12
+    trace = np.sin(np.arange(count) / 1e5)
+    for plot_type in ('local', 'web'):
+        scope = Scope(max_points=2000)
+        # Imports the plotting library outside of the timed call.
+        scope.add_signal(time_array[:10], trace[:10], name='Warm up', plot_type=plot_type)
+        start = time.perf_counter()
+        scope.add_signal(time_array, trace, name='Trace', plot_type=plot_type,
+                         decimation='lttb' if plot_type == 'web' else 'minmax')
+        assert time.perf_counter() - start < 1
+        if plot_type == 'local':
+            assert len(scope.local_figures[1]['y']) <= 2000
+        else:
+            assert len(scope.web_figures[1].renderers[0].data_source.data['y']) <= 2000
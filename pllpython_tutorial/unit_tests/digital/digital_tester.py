@@ -0,0 +1,79 @@
+"""Digital Buffer Unit Test Suite
+
+This module contains the unit tests for `DigitalBuffer`, the compact storage of
+the two-level traces enabled by `settings.storage['digital']`.
+
+Tests:
+    - `test_encodings`: Checks that both encodings give back the appended
+      samples, whole and sliced, one sample or one array at a time.
+    - `test_compact_pll`: Checks that python and fused runs with compact
+      digital traces match the dense runs in a fraction of the memory.
+"""
+
+import copy
+import tempfile
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.utils.digital import DigitalBuffer, STAGE_SIZE
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Digital_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=1e-6, time_step=settings.time_step)
+settings.seed = 3
+
+
+def test_encodings():
+    """
+    Fills buffers with random square waves across several stages.
+
+    Asserts:
+        The decoded samples and windows equal the appended ones.
+    """
+    rng = np.random.default_rng(0)
+    periods = np.repeat(rng.integers(1, 200, 4000), 2)
+    dense = np.resize([0.0, 1.2], len(periods)).repeat(periods)[:3 * STAGE_SIZE + 5]
+    for encoding in ('packed', 'rle'):
+        buffer = DigitalBuffer(levels=(0.0, 1.2), encoding=encoding)
+        for value in dense[:100]:
+            buffer.append(value)
+        buffer.extend(dense[100:STAGE_SIZE + 3])
+        for value in dense[STAGE_SIZE + 3:STAGE_SIZE + 11]:
+            buffer.append(value)
+        buffer.extend(dense[STAGE_SIZE + 11:])
+
+        assert len(buffer) == len(dense)
+        assert np.array_equal(buffer.view(), dense)
+        for start, stop in ((0, 10), (7, STAGE_SIZE + 9), (len(dense) - 20, len(dense))):
+            assert np.array_equal(buffer[start:stop], dense[start:stop])
+        assert buffer[-1] == dense[-1]
+        assert np.array_equal(np.asarray(buffer.to_edges()), dense)
+        assert buffer.nbytes < dense.nbytes / 8
+
+
+def test_compact_pll():
+    """
+    Runs the same PLL with dense, packed and run-length encoded traces.
+
+    Asserts:
+        The traces are equal and the compact ones use less memory.
+    """
+    for engine in ('python', 'fused'):
+        dense = Pll(settings=settings)
+        dense.start_and_monitor(engine=engine, save=False, progress=False,
+                                bypass_cache=True)
+        for encoding in ('packed', 'rle'):
+            compact_settings = copy.deepcopy(settings)
+            compact_settings.storage['digital'] = encoding
+            compact = Pll(settings=compact_settings)
+            compact.start_and_monitor(engine=engine, save=False, progress=False,
+                                      bypass_cache=True)
+
+            for name, key in (('vco', 'output'), ('div', 'output'),
+                              ('lpd', 'output_a'), ('lpd', 'output_b')):
+                buffer = compact.components[name].io[key]
+                reference = dense.components[name].io[key]
+                assert isinstance(buffer, DigitalBuffer)
+                assert np.array_equal(buffer, reference)
+                assert buffer.nbytes < np.asarray(reference).nbytes
+            assert np.array_equal(compact.components['lf'].io['output'],
+                                  dense.components['lf'].io['output'])
@@ -8,6 +8,7 @@ it behaves as expected when processing an input signal and generating the output
 Test methods:
 -------------
 - `test_n_60`: Tests the divider with `n = 60` using reference and target data.
+- `test_vectorized_start`: Checks that `start` and `divide_edges` match the per-sample `_process` loop.
 - `test_show`: Displays the results using the `Scope` class based on the plot mode setting.
 
 """
@@ -87,6 +88,43 @@ def test_n_60():
     assert mse_out.item() > 94 or cc > 94
 
 
+def test_vectorized_start():
+    """Compare the vectorized `start` and `divide_edges` with `_process`.
+
+    Random vdd/vss inputs, with a few samples at neither level, are divided
+    with small values of `n` from random initial states.
+
+    **Raises**:
+        AssertionError: If the outputs, output edges or final states differ.
+    """
+    rng = np.random.default_rng(0)
+    vec_settings = Settings(name='Divider_Tester', log_path='./logs')
+    levels = [vec_settings.vdd, vec_settings.vss, 0.5]
+    for trial in range(64):
+        vec_settings.divider['n'] = int(rng.integers(1, 5))
+        samples = rng.choice(levels, size=int(rng.integers(1, 200)), p=[.45, .45, .1])
+        state = {'transition_count': int(rng.integers(0, 2 * vec_settings.divider['n'])),
+                 'ton': bool(trial & 1), 'last_sample': levels[trial % 3]}
+        reference, dut, edges = (Divider(settings=vec_settings) for _ in range(3))
+        for divider in (reference, dut, edges):
+            divider.set_state(state)
+
+        expected = np.array([reference._process(current_sample=sample)  # pylint: disable=W0212
+                             for sample in samples])
+        dut.start(input_array=samples)
+        assert np.array_equal(dut.io['output'], expected)
+        assert dut.get_state() == reference.get_state()
+
+        previous = np.concatenate(([state['last_sample']], samples[:-1]))
+        transitions = np.flatnonzero(((previous == levels[0]) & (samples == levels[1])) |
+                                     ((previous == levels[1]) & (samples == levels[0])))
+        changes = edges.divide_edges(transitions)
+        levels_after = np.append(expected, levels[0] if reference.ton else levels[1])
+        assert np.array_equal(changes, np.flatnonzero(np.diff(levels_after)) + 1)
+        assert (edges.transition_count, edges.ton) == \
+            (reference.transition_count, reference.ton)
+
+
 def test_show():
     """Show the plotted results.
 
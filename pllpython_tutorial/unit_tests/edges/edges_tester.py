@@ -0,0 +1,90 @@
+"""Edge Trace Unit Test Suite
+
+This module contains the unit tests for `EdgeTrace`, the edge-timestamp form of
+the digital traces.
+
+Tests:
+    - `test_round_trip`: Checks the dense conversion, slicing, concatenation
+      and merging against the dense arrays.
+    - `test_native_consumers`: Checks that `Lpd.start`, `Divider.start`,
+      `Calculator` and `mse` give the same results on edge traces as on the
+      dense traces of a PLL run.
+"""
+
+import tempfile
+import numpy as np
+from pllpython.components.divider import Divider
+from pllpython.components.lpd import Lpd
+from pllpython.components.pll import Pll
+from pllpython.utils.calculator import Calculator
+from pllpython.utils.comparators import mse
+from pllpython.utils.edges import EdgeTrace
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Edges_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=1e-6, time_step=settings.time_step)
+settings.seed = 5
+
+
+def test_round_trip():
+    """
+    Converts random two-level signals to edge traces and back.
+
+    Asserts:
+        Every operation matches the same operation on the dense arrays.
+    """
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        length = int(rng.integers(1, 80))
+        dense_a = (rng.random(length) < rng.random()) * 0.9
+        dense_b = (rng.random(length) < 0.5) * 0.9
+        trace_a = EdgeTrace.from_dense(dense_a, low=0, high=0.9)
+        trace_b = EdgeTrace.from_dense(dense_b, low=0, high=0.9)
+        start, stop = sorted(rng.integers(0, length + 1, 2))
+
+        assert np.array_equal(trace_a.to_dense(), dense_a)
+        assert np.array_equal(np.asarray(trace_a[start:stop]), dense_a[start:stop])
+        assert trace_a[start % length] == dense_a[start % length]
+        joined = EdgeTrace.concatenate([trace_a, trace_a[start:stop], trace_b])
+        assert np.array_equal(np.asarray(joined),
+                              np.concatenate((dense_a, dense_a[start:stop], dense_b)))
+        assert np.array_equal(np.asarray(trace_a.merge(trace_b, 'xor')) > 0,
+                              (dense_a > 0) ^ (dense_b > 0))
+
+
+def test_native_consumers():
+    """
+    Feeds the traces of a PLL run to the components and tools, dense and as
+    edge traces.
+
+    Asserts:
+        The outputs are equal, and the edge traces are much smaller.
+    """
+    pll = Pll(settings=settings)
+    pll.start_and_monitor(engine='fused', save=False, progress=False)
+    clk = np.asarray(pll.components['clk'].io['output'])
+    div = np.asarray(pll.components['div'].io['output'])
+    vco = np.asarray(pll.output)
+    edges = {name: EdgeTrace.from_dense(trace, time_step=settings.time_step,
+                                        low=settings.vss, high=settings.vdd)
+             for name, trace in (('clk', clk), ('div', div), ('vco', vco))}
+    assert edges['vco'].nbytes * 20 < vco.nbytes
+
+    dense_lpd, edge_lpd = Lpd(settings), Lpd(settings)
+    dense_lpd.start(clk, div)
+    edge_lpd.start(edges['clk'], edges['div'])
+    for key in ('output_a', 'output_b'):
+        assert isinstance(edge_lpd.io[key], EdgeTrace)
+        assert np.array_equal(np.asarray(edge_lpd.io[key]), dense_lpd.io[key])
+    assert edge_lpd.get_state() == dense_lpd.get_state()
+
+    dense_div, edge_div = Divider(settings), Divider(settings)
+    dense_div.start(vco)
+    edge_div.start(edges['vco'])
+    assert np.array_equal(np.asarray(edge_div.io['output']), dense_div.io['output'])
+    assert edge_div.get_state() == dense_div.get_state()
+
+    calculator = Calculator(settings=settings)
+    assert calculator.calculate_jitter(edges['vco'], plot=False) == \
+        calculator.calculate_jitter(vco, plot=False)
+    assert np.isclose(mse(edges['clk'], edges['div']), mse(clk, div))
@@ -0,0 +1,42 @@
+"""Import Unit Test Suite
+
+This module checks the cold-start cost of importing the package, paid by every
+sweep worker process.
+
+Tests:
+    - `test_import_budget`: Checks that `import pllpython.components` stays under
+      `IMPORT_BUDGET` seconds and does not load the deferred dependencies.
+"""
+
+import json
+import subprocess
+import sys
+
+IMPORT_BUDGET = 1.0
+DEFERRED = ('matplotlib', 'bokeh', 'tqdm', 'scipy', 'pytest', 'requests',
+            'numba')
+
+PROBE = f"""
+import sys, json
+from time import perf_counter
+start = perf_counter()
+import pllpython.components
+import pllpython.utils
+elapsed = perf_counter() - start
+print(json.dumps({{'elapsed': elapsed,
+                  'loaded': [name for name in {DEFERRED!r} if name in sys.modules]}}))
+"""
+
+
+def test_import_budget():
+    """
+    Imports the package in fresh interpreters, keeping the fastest run.
+
+    Asserts:
+        No deferred dependency is loaded and the import time is under budget.
+    """
+    runs = [json.loads(subprocess.run([sys.executable, '-c', PROBE], check=True,
+                                      capture_output=True, text=True).stdout.splitlines()[-1])
+            for _ in range(3)]
+    assert all(not run['loaded'] for run in runs), runs
+    assert min(run['elapsed'] for run in runs) < IMPORT_BUDGET
@@ -13,6 +13,8 @@ Test Methods:
   and Cross-Correlation (CC).
 - `test_rc_filter`: Tests the performance of the LoopFilter with an RC filter and variable input signals. 
   Similar to the previous test, it compares the output with a reference target signal using MSE and CC.
+- `test_process_block`: Checks that `process_block`, split in several blocks, matches the 
+  per-sample `_process` loop for first and second-order filters, with and without saturation.
 - `test_show`: Displays the results using the `Scope` class based on the plot mode setting, 
   either locally or on the web.
 """
@@ -188,6 +190,47 @@ def test_rcc_filter():
     assert mse_out.item() > 97 or cc > 97
 
 
+def test_process_block():
+    """
+    Compare `process_block` with the per-sample `_process` loop.
+
+    Random UP/DOWN pulses are filtered in three blocks by the RC and RCC filters,
+    first unsaturated and then with limits clamping part of the output.
+
+    **Assertions**:
+        - The outputs and the final states match up to floating-point rounding.
+    """
+    rng = np.random.default_rng(0)
+    input_a = (rng.random(5000) < 0.3).astype(np.uint8)
+    input_b = (rng.random(5000) < 0.3).astype(np.uint8)
+    for filter_settings in ({'R': 8400, 'C': 16e-12, 'C2': None},
+                            {'R': 6400, 'C': 16e-12, 'C2': 1.6e-12}):
+        block_settings = Settings(name='LF_Tester')
+        block_settings.lf.update(filter_settings)
+        block_settings.sample_count = len(input_a)
+        unsaturated = LoopFilter(settings=block_settings)
+        free_output = np.array([unsaturated._process(input_a=a, input_b=b)  # pylint: disable=W0212
+                                for a, b in zip(input_a, input_b)])
+        for limits in (None, (0.3, 0.7)):
+            if limits is not None:
+                block_settings.lf['min_sat'], block_settings.lf['max_sat'] = \
+                    np.quantile(free_output, limits)
+            reference = LoopFilter(settings=block_settings)
+            expected = np.array([reference._process(input_a=a, input_b=b)  # pylint: disable=W0212
+                                 for a, b in zip(input_a, input_b)])
+            dut = LoopFilter(settings=block_settings)
+            out = np.concatenate([dut.process_block(input_a[block], input_b[block])
+                                  for block in (slice(0, 1), slice(1, 3000), slice(3000, None))])
+
+            scale = np.max(np.abs(expected))
+            assert np.array_equal(dut.io['output'], out)
+            # Rounding can flip the clamping of a sample right at a limit,
+            # which the slow RCC poles take a while to forget.
+            assert np.max(np.abs(out - expected)) < 1e-4 * scale
+            assert abs(dut.output_value - reference.output_value) < 1e-6 * scale
+            assert np.allclose(dut.last_outputs, reference.last_outputs, rtol=0, atol=1e-6 * scale)
+
+
 def test_show():
     """
     Show the plotted signals based on the selected plot mode.
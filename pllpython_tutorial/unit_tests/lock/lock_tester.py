@@ -0,0 +1,69 @@
+"""Lock Detector Unit Test Suite
+
+This module contains the unit tests for the `LockDetector` class and for the
+early termination of `Pll` runs once the loop is locked.
+
+Tests:
+    - `test_block_matches_samples`: Checks that `process_block` declares lock
+      on the same sample as `_process`.
+    - `test_stop_on_lock`: Checks that `stop_on_lock` ends the run after the
+      lock time reported by a full run.
+"""
+
+import tempfile
+import numpy as np
+from pllpython.components.lock import LockDetector
+from pllpython.components.pll import Pll
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Lock_Tester', log_path=tempfile.gettempdir())
+settings.set_clk_parameter(
+    parameter='white_phase_noise_spectral_density', value=0)
+settings.set_time(sim_time=12e-6, time_step=settings.time_step)
+
+
+def test_block_matches_samples():
+    """
+    Feeds the same LPD and LF traces sample by sample and in uneven blocks.
+
+    Asserts:
+        Both detectors lock, on the same sample.
+    """
+    pll = Pll(settings=settings)
+    pll.start_and_monitor(engine='fused', save=False, progress=False)
+    lpd_a = np.asarray(pll.components['lpd'].io['output_a'])
+    lpd_b = np.asarray(pll.components['lpd'].io['output_b'])
+    lf = np.asarray(pll.components['lf'].io['output'])
+
+    sample_detector = LockDetector(settings=settings)
+    for value_a, value_b, value_lf in zip(lpd_a, lpd_b, lf):
+        sample_detector._process(value_a, value_b, value_lf)  # pylint: disable=W0212
+    block_detector = LockDetector(settings=settings)
+    for start in range(0, len(lf), 1000):
+        block_detector.process_block(lpd_a[start:start + 1000],
+                                     lpd_b[start:start + 1000],
+                                     lf[start:start + 1000])
+
+    assert sample_detector.locked
+    assert sample_detector.lock_index == block_detector.lock_index
+
+
+def test_stop_on_lock():
+    """
+    Runs the loop to the end with lock detection, then with `stop_on_lock`.
+
+    Asserts:
+        Both runs report the same lock time and the early run stops before the
+        end of the simulation, with traces as long as its time array.
+    """
+    full = Pll(settings=settings)
+    full.start(engine='fused', detect_lock=True)
+    early = Pll(settings=settings)
+    early.start_and_monitor(engine='fused', save=False, progress=False,
+                            stop_on_lock=True)
+
+    print(f'\nLock Test 2: Lock at {full.lock_time:.3e} s, stopped after '
+          f'{len(early.output)} of {settings.sample_count} samples')
+    assert full.lock_time == early.lock_time
+    assert len(early.output) < settings.sample_count
+    assert len(early.components['lf'].io['output']) == len(early.time_array)
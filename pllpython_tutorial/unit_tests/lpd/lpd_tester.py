@@ -14,6 +14,7 @@ Test Methods:
   It compares the output to target signals `lpd_variable_target_a` and `lpd_variable_target_b` and checks for accuracy.
 - `test_rc_input`: Tests the LPD with RC filter inputs (`input_a` and `input_b`). 
   It compares the output to reference target signals `rc_lpd_out_a` and `rc_lpd_out_b` and checks for accuracy.
+- `test_vectorized_start`: Checks that `start` matches the per-sample `_process` loop on random inputs and initial states.
 - `test_show`: Displays the results using the `Scope` class based on the plot mode setting, either locally or on the web.
 """
 
@@ -97,6 +98,41 @@ def test_equal_input():
     assert acc_b > 97
 
 
+def test_vectorized_start():
+    """
+    Compare the vectorized `start` with the per-sample `_process` loop.
+
+    Random 0/1 inputs, including identical ones, are processed from every
+    initial flip-flop and last-input state.
+
+    Asserts:
+        - Both outputs are identical sample by sample.
+        - The final states are identical.
+    """
+    rng = np.random.default_rng(0)
+    for trial in range(64):
+        sample_count = int(rng.integers(1, 200))
+        input_a = (rng.random(sample_count) < 0.5).astype(float)
+        input_b = input_a.copy() if trial % 4 == 0 else \
+            (rng.random(sample_count) < 0.5).astype(float)
+        state = {'ff_up_q': trial & 1, 'ff_down_q': (trial >> 1) & 1,
+                 'last_up': float((trial >> 2) & 1), 'last_down': float((trial >> 3) & 1)}
+        ref_settings = Settings('LPD_Tester')
+        ref_settings.sample_count = sample_count
+        reference = Lpd(settings=ref_settings)
+        reference.set_state(state)
+        dut = Lpd(settings=ref_settings)
+        dut.set_state(state)
+
+        expected = np.array([reference._process(input_a=a, input_b=b)  # pylint: disable=W0212
+                             for a, b in zip(input_a, input_b)])
+        dut.start(input_array_a=input_a, input_array_b=input_b)
+
+        assert np.array_equal(dut.io['output_a'], expected[:, 0])
+        assert np.array_equal(dut.io['output_b'], expected[:, 1])
+        assert dut.get_state() == reference.get_state()
+
+
 def test_show():
     """
     Display the test results using the `Scope` class based on the plot mode setting.
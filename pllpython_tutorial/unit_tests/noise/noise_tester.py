@@ -0,0 +1,135 @@
+"""Noise Source Unit Test Suite
+
+This module contains the unit tests for the `NoiseSource` class and for the
+seeded phase noise of the closed loop.
+
+Tests:
+    - `test_stream`: Checks that a seeded stream is reproducible whatever the
+      way it is read, that spawned streams differ, and that `get_state` and
+      `set_state` restore its position.
+    - `test_flicker_spectrum`: Checks the spectrum of `FlickerNoise` and that
+      its values do not depend on the block size.
+    - `test_noisy_fused_engine`: Checks that the fused engine is bit-identical
+      to the python engine with phase noise, flicker noise and a seed.
+    - `test_settings_without_flicker`: Checks that VCO and CLK settings
+      without the flicker keys run without flicker noise.
+"""
+
+import copy
+import tempfile
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.utils.noise import NoiseSource, FlickerNoise
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Noise_Tester', log_path=tempfile.gettempdir())
+settings.set_time(sim_time=1e-6, time_step=settings.time_step)
+settings.set_vco_parameter(parameter='white_phase_noise_spectral_density', value=1e-10)
+settings.set_vco_parameter(parameter='low_frequency_phase_noise', value=1e-12)
+settings.set_vco_parameter(parameter='flicker_corner', value=1e7)
+settings.seed = 11
+
+
+def test_stream():
+    """
+    Reads seeded streams one draw at a time, in blocks and across refills.
+
+    Asserts:
+        The draws do not depend on the way they are read, spawned streams are
+        reproducible and distinct, and a restored stream continues identically.
+    """
+    expected = NoiseSource(seed=5).normals(1000)
+    source = NoiseSource(seed=5, block_size=64)
+    draws = [source.normal() for _ in range(10)]
+    draws.extend(source.normals(300))
+    peeked = source.block(100)[:100].copy()
+    source.consume(100)
+    draws.extend(peeked)
+    draws.extend(source.normals(590))
+    assert np.array_equal(draws, expected)
+
+    first, second = NoiseSource(seed=5).spawn(2)
+    assert np.array_equal(first.normals(100), NoiseSource(seed=5).spawn(2)[0].normals(100))
+    assert not np.array_equal(first.normals(100), second.normals(100))
+
+    state = first.get_state()
+    following = first.normals(100_000)
+    restored = NoiseSource()
+    restored.set_state(state)
+    assert np.array_equal(restored.normals(100_000), following)
+
+
+def test_flicker_spectrum():
+    """
+    Estimates the spectrum of flicker streams and reads one in small blocks.
+
+    Asserts:
+        The spectrum follows `(2 / sample_rate) * (corner / f) ** slope`
+        within 25 % between 1 MHz and 100 MHz, and the values do not depend
+        on the block size or on a save and restore of the state.
+    """
+    # pylint: disable=C0415
+    from scipy.signal import welch
+
+    sample_rate, corner = 2e9, 1e7
+    for slope in (0.5, 1, 2):
+        values = FlickerNoise(corner=corner, slope=slope, sample_rate=sample_rate,
+                              seed=2).normals(1 << 22)
+        frequencies, spectrum = welch(values, fs=sample_rate, nperseg=1 << 17)
+        band = (frequencies >= 1e6) & (frequencies <= 1e8)
+        ratio = spectrum[band] / (2 / sample_rate * (corner / frequencies[band]) ** slope)
+        for chunk in np.array_split(ratio, 8):
+            assert abs(chunk.mean() - 1) < 0.25, (slope, chunk.mean())
+
+    flicker = FlickerNoise(corner=corner, sample_rate=sample_rate, seed=2)
+    small = FlickerNoise(corner=corner, sample_rate=sample_rate, seed=2, block_size=1000)
+    assert np.array_equal(flicker.normals(5000), [small.normal() for _ in range(5000)])
+    restored = FlickerNoise(corner=corner, sample_rate=sample_rate)
+    restored.set_state(small.get_state())
+    assert np.array_equal(flicker.normals(5000), restored.normals(5000))
+
+
+def test_noisy_fused_engine():
+    """
+    Runs the same noisy, seeded configuration with the python and fused engines,
+    with white, low-frequency and flicker noise on the VCO.
+
+    Asserts:
+        The outputs and the LF traces are identical, and a second run with the
+        same seed reproduces them.
+    """
+    reference = Pll(settings=copy.deepcopy(settings))
+    reference.start_and_monitor(engine='python', save=False, progress=False)
+    fused = Pll(settings=copy.deepcopy(settings))
+    fused.start_and_monitor(engine='fused', save=False, progress=False)
+    again = Pll(settings=copy.deepcopy(settings))
+    again.start_and_monitor(engine='fused', save=False, progress=False)
+
+    assert np.array_equal(np.asarray(reference.output), np.asarray(fused.output))
+    assert np.array_equal(np.asarray(reference.components['lf'].io['output']),
+                          np.asarray(fused.components['lf'].io['output']))
+    assert np.array_equal(np.asarray(fused.output), np.asarray(again.output))
+
+
+def test_settings_without_flicker():
+    """
+    Replaces the VCO and CLK settings with dicts from before the flicker keys.
+
+    Asserts:
+        Both engines run without flicker noise.
+    """
+    legacy = copy.deepcopy(settings)
+    legacy.set_vco_parameter('all', {'k_vco': 1e9, 'fo': 1e9,
+                                     'white_phase_noise_spectral_density': 0,
+                                     'low_frequency_phase_noise': 0,
+                                     'plot_mode': 'local', 'id': 0})
+    legacy.set_clk_parameter('all', {'k_vco': 20e6, 'fo': 0,
+                                     'white_phase_noise_spectral_density': 0,
+                                     'low_frequency_phase_noise': 0,
+                                     'plot_mode': 'local'})
+    for engine in ('python', 'fused'):
+        pll = Pll(settings=copy.deepcopy(legacy))
+        pll.start(engine=engine, bypass_cache=True)
+        assert pll.components['vco'].flicker is None
+        assert pll.components['clk'].flicker is None
+        assert len(pll.output) == legacy.sample_count
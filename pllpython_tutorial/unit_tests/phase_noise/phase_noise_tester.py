@@ -0,0 +1,72 @@
+"""Phase Noise Unit Test Suite
+
+This module contains the unit tests for the `PhaseNoiseAnalyzer` class and for
+`Calculator.phase_noise`.
+
+Tests:
+    - `test_scaling`: Checks the level of white phase noise, the integrated
+      jitter of a sinusoidal jitter tone, and that streaming the edges in
+      chunks gives the same spectrum.
+    - `test_calculator`: Checks that the RMS jitter integrated from the VCO
+      phase noise matches the tone modulating its control voltage.
+"""
+
+import numpy as np
+from pllpython.components.vco import Vco
+from pllpython.utils.calculator import Calculator
+from pllpython.utils.phase_noise import PhaseNoiseAnalyzer
+from pllpython.utils.settings import Settings
+
+PERIOD = 1e-9
+
+
+def test_scaling():
+    """
+    Analyzes a white TIE sequence, then a clock with a frequency offset and a
+    1 MHz sinusoidal jitter.
+
+    Asserts:
+        `L(f)` averages to `(2 pi f0)^2 sigma^2 T`, the jitter integrated over
+        the whole band is sigma, the tone integrates to its RMS value and the
+        result does not depend on the chunking of the edges.
+    """
+    sigma = 1e-13
+    tie = sigma * np.random.default_rng(0).standard_normal(1 << 18)
+    analyzer = PhaseNoiseAnalyzer(period=PERIOD, segment=1024)
+    for chunk in np.array_split(tie, 37):
+        analyzer.add_tie(chunk)
+    _, phase_noise = analyzer.spectrum()
+    expected = 10 * np.log10((2 * np.pi / PERIOD) ** 2 * sigma ** 2 * PERIOD)
+    assert abs(np.mean(phase_noise) - expected) < 0.2
+    assert abs(analyzer.rms_jitter([(0, 0.5 / PERIOD)])[0] / sigma - 1) < 0.01
+
+    index = np.arange(1 << 18)
+    edges = index * PERIOD * (1 + 1e-6) + 1e-12 * np.sin(2 * np.pi * 1e6 * index * PERIOD)
+    whole = PhaseNoiseAnalyzer(segment=4096, window=('kaiser', 8))
+    whole.add_edges(edges)
+    chunked = PhaseNoiseAnalyzer(period=whole.period, segment=4096, window=('kaiser', 8))
+    for chunk in np.array_split(edges, 11):
+        chunked.add_edges(chunk)
+    assert abs(whole.rms_jitter([(5e5, 2e6)])[0] / (1e-12 / np.sqrt(2)) - 1) < 0.01
+    assert np.allclose(whole.spectrum()[1], chunked.spectrum()[1])
+
+
+def test_calculator():
+    """
+    Modulates the control voltage of a noise-free VCO with a 5 MHz tone.
+
+    Asserts:
+        The jitter integrated around the tone equals the RMS time deviation
+        of the modulated edges.
+    """
+    settings = Settings(name='Phase_Noise_Tester', time_step=1e-11, sim_time=20e-6)
+    time = np.arange(settings.sample_count) * settings.time_step
+    vco = Vco(settings=settings)
+    vco.start(input_array=0.2 + 0.001 * np.sin(2 * np.pi * 5e6 * time))
+    frequencies, phase_noise, jitter = Calculator(settings=settings).phase_noise(
+        vco.io['output'], phase=vco.phase_trace(), segment=8192, bands=[(4e6, 6e6)])
+
+    # Phase deviation of k_vco * 0.001 / 5 MHz radians at 1.2 GHz.
+    expected = 1e9 * 0.001 / 5e6 / (2 * np.pi * 1.2e9) / np.sqrt(2)
+    assert abs(jitter[0] / expected - 1) < 0.05
+    assert frequencies[np.argmax(phase_noise)] == frequencies[np.argmin(abs(frequencies - 5e6))]
@@ -0,0 +1,197 @@
+"""PLL Unit Test Suite
+
+This module contains the unit tests for the `Pll` class, checking that the
+different simulation engines of the closed loop agree with the reference
+per-object engine.
+
+Tests:
+    - `test_fused_engine`: Checks that the fused engine is bit-identical to the
+      python engine for noise-free settings.
+    - `test_event_engine`: Checks that the event engine follows the python
+      engine while taking far fewer steps.
+    - `test_batch_engine`: Checks that every configuration of a batched sweep
+      matches its own fused run.
+    - `test_batch_supply_levels`: Checks that the batched divider counts the
+      same transitions as a single PLL run when `vss` is not 0.
+    - `test_checkpoint_resume`: Checks that a run resumed from a checkpoint
+      continues exactly like an uninterrupted run.
+    - `test_fork`: Checks that a forked run continues from the parent state
+      and shares the parent traces.
+"""
+
+import copy
+import os
+import tempfile
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.components.batch import TRACES, build_components, run_batch
+from pllpython.components.engine import run_fused
+from pllpython.utils.settings import Settings
+# pylint: disable=C0301
+
+settings = Settings(name='PLL_Tester', log_path=tempfile.gettempdir())
+settings.update_from_file(setting_file_path='./unit_tests/ut_sett.json')
+settings.set_time(sim_time=2e-6, time_step=settings.time_step)
+
+
+def test_fused_engine():
+    """
+    Runs the same noise-free configuration with both engines.
+
+    Every monitored node of every component, as well as the PLL output, must
+    match sample for sample.
+
+    Asserts:
+        All io traces of the fused engine equal those of the python engine.
+    """
+    reference = Pll(settings=settings)
+    reference.start_and_monitor(engine='python')
+    fused = Pll(settings=settings)
+    fused.start_and_monitor(engine='fused')
+
+    assert np.array_equal(np.asarray(reference.output, dtype=float),
+                          np.asarray(fused.output, dtype=float))
+    for name, component in reference.components.items():
+        for key, trace in component.io.items():
+            assert np.array_equal(np.asarray(trace, dtype=float),
+                                  np.asarray(fused.components[name].io[key], dtype=float)), f'{name} {key}'
+
+
+def test_event_engine():
+    """
+    Runs the same noise-free configuration with the python and event engines.
+
+    The event engine advances the loop analytically between edges, so the
+    rebuilt traces may differ by rounding, but every VCO edge must land within
+    one sample of the reference and the loop must take at least 50x fewer steps.
+
+    Asserts:
+        VCO edges match within one sample, the LF outputs agree and the number
+        of steps is at most 2% of the sample count.
+    """
+    reference = Pll(settings=settings)
+    reference.start(engine='python')
+    event = Pll(settings=settings)
+    event.start(engine='event')
+    steps = event.events.steps
+
+    ref_edges = np.flatnonzero(np.diff(np.asarray(reference.output, dtype=float)))
+    event_edges = np.flatnonzero(np.diff(np.asarray(event.output, dtype=float)))
+    lf_error = np.max(np.abs(np.asarray(reference.components['lf'].io['output'], dtype=float) -
+                             np.asarray(event.components['lf'].io['output'], dtype=float)))
+
+    print(f'\nPLL Test 2: Event engine steps: {steps} LF error: {lf_error:.2e}')
+    assert len(ref_edges) == len(event_edges)
+    assert np.max(np.abs(ref_edges - event_edges)) <= 1
+    assert lf_error < 1e-3
+    assert steps < settings.sample_count * 0.02
+
+
+def test_batch_engine():
+    """
+    Runs a sweep of the Loop Filter resistor with the batched engine.
+
+    Every configuration of the batch must follow the fused engine run of the
+    same settings sample for sample.
+
+    Asserts:
+        The batched traces of every configuration equal the fused traces.
+    """
+    values = [4000, 8400, None]
+    settings_list = []
+    for value in values:
+        swept = copy.deepcopy(settings)
+        swept.set_lf_parameter(parameter='R', value=value)
+        settings_list.append(swept)
+    traces, _ = run_batch([build_components(swept) for swept in settings_list],
+                          settings.sample_count, record=TRACES)
+
+    for index, swept in enumerate(settings_list):
+        reference, _ = run_fused(build_components(swept), settings.sample_count)
+        for key in TRACES:
+            assert np.array_equal(np.asarray(reference[key], dtype=float),
+                                  np.asarray(traces[key][index], dtype=float)), f'{values[index]} {key}'
+
+
+def test_batch_supply_levels():
+    """
+    Runs the same configuration with a non-zero `vss` batched and on its own.
+
+    Asserts:
+        Every batched trace equals the one of the python engine.
+    """
+    shifted = copy.deepcopy(settings)
+    shifted.set_vss(0.25)
+    reference = Pll(settings=shifted)
+    reference.start_and_monitor(engine='python', save=False, progress=False,
+                                bypass_cache=True)
+    traces, _ = run_batch([build_components(shifted)], shifted.sample_count, record=TRACES)
+    for key, trace in reference._io_buffers().items():
+        assert np.array_equal(np.asarray(trace, dtype=float),
+                              np.asarray(traces[key][0], dtype=float)), key
+
+
+def test_checkpoint_resume():
+    """
+    Runs a noisy loop in one go, then in two halves through a checkpoint.
+
+    The phase noise sources are seeded from `settings.seed` and their position
+    is part of the checkpoint, so the resumed half must match the uninterrupted
+    run.
+
+    Asserts:
+        The traces of the resumed run equal the second half of the full run.
+    """
+    noisy = copy.deepcopy(settings)
+    noisy.set_vco_parameter(parameter='white_phase_noise_spectral_density',
+                            value=1e-10)
+    noisy.seed = 7
+    noisy.set_time(sim_time=4e-7, time_step=settings.time_step)
+    half = copy.deepcopy(noisy)
+    half.set_time(sim_time=2e-7, time_step=settings.time_step)
+    checkpoint = os.path.join(tempfile.gettempdir(), 'pll_tester_checkpoint.npz')
+
+    full = Pll(settings=noisy)
+    full.start_and_monitor(save=False, progress=False)
+    first = Pll(settings=half)
+    first.start_and_monitor(save=False, progress=False)
+    first.save_checkpoint(checkpoint)
+    resumed = Pll(settings=half)
+    resumed.resume(checkpoint, extra_samples=half.sample_count)
+
+    assert resumed.samples == noisy.sample_count
+    assert np.array_equal(np.asarray(full.output)[half.sample_count:],
+                          np.asarray(resumed.output))
+    for name, component in full.components.items():
+        for key, trace in component.io.items():
+            assert np.array_equal(np.asarray(trace, dtype=float)[half.sample_count:],
+                                  np.asarray(resumed.components[name].io[key], dtype=float)), f'{name} {key}'
+
+
+def test_fork():
+    """
+    Forks a run without overrides and continues it, and forks it with another
+    Loop Filter resistor.
+
+    Asserts:
+        The unmodified fork continues exactly like an uninterrupted run, its
+        prefix shares memory with the parent traces, and the modified fork
+        uses the new resistor.
+    """
+    longer = copy.deepcopy(settings)
+    longer.set_time(sim_time=3e-6, time_step=settings.time_step)
+    reference = Pll(settings=longer)
+    reference.start_and_monitor(engine='fused', save=False, progress=False)
+
+    parent = Pll(settings=settings)
+    parent.start_and_monitor(engine='fused', save=False, progress=False)
+    same = parent.fork()
+    same.extend(longer.sample_count - settings.sample_count, engine='fused')
+    tweaked = parent.fork({('lf', 'R'): 6000})
+
+    assert np.shares_memory(same.prefix[0]['output'], np.asarray(parent.output))
+    assert np.array_equal(np.asarray(reference.output), same.history())
+    assert np.array_equal(np.asarray(reference.components['lf'].io['output']),
+                          same.history('lf.output'))
+    assert tweaked.components['lf'].r == 6000
+    assert parent.components['lf'].r != 6000
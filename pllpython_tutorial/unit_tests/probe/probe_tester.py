@@ -0,0 +1,83 @@
+"""Jitter Probe Unit Test Suite
+
+This module contains the unit tests for the `JitterProbe` attached to the VCO
+output with `probe_jitter=True`.
+
+Tests:
+    - `test_probe_matches_trace`: Checks the probe statistics against the
+      edges found in the full trace, for the python and fused engines.
+    - `test_none_mode`: Checks that a run in none mode gives the same probe
+      statistics while only keeping the last chunk of the traces.
+"""
+
+import copy
+import tempfile
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.utils.calculator import Calculator
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Probe_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=1e-6, time_step=settings.time_step)
+settings.seed = 11
+settings.probe['edges'] = 'both'
+settings.probe['segment'] = 256
+
+
+def test_probe_matches_trace():
+    """
+    Probes a run and finds the edges of its full trace afterwards.
+
+    Asserts:
+        Both engines probe the same edges, whose period and TIE statistics
+        match the ones computed from the trace.
+    """
+    summaries = []
+    for engine in ('python', 'fused'):
+        pll = Pll(settings=settings)
+        pll.start(engine=engine, probe_jitter=True, bypass_cache=True)
+        summaries.append(pll.probe.summary())
+
+    transitions, _ = Calculator(settings=settings)._crossings(np.array(pll.output))
+    times = transitions * settings.time_step
+    periods = np.diff(times)
+    held = times[:settings.probe['segment']]
+    tie = times - times[0] - np.arange(len(times)) * \
+        (held[-1] - held[0]) / (len(held) - 1)
+
+    assert summaries[0]['edges'] == summaries[1]['edges']
+    assert np.allclose(list(summaries[0].values()), list(summaries[1].values()))
+    probe = pll.probe
+    assert probe.count == len(times)
+    assert np.isclose(probe.period_mean, np.mean(periods))
+    assert np.isclose(probe.period_std, np.std(periods))
+    assert np.isclose(probe.tie_mean, np.mean(tie))
+    assert np.isclose(probe.tie_std, np.std(tie))
+    assert np.isclose(probe.tie_peak_to_peak, np.ptp(tie))
+    frequencies, phase_noise = probe.spectrum()
+    assert len(frequencies) == len(phase_noise) == settings.probe['segment'] // 2
+
+
+def test_none_mode():
+    """
+    Probes the same run with the traces in memory and in none mode.
+
+    Asserts:
+        The probe statistics are equal, the none mode traces only hold the
+        last chunk and the time array ends on the last sample.
+    """
+    none_settings = copy.deepcopy(settings)
+    none_settings.storage['mode'] = 'none'
+    none_settings.storage['chunk'] = 4096
+    for engine in ('python', 'fused'):
+        memory = Pll(settings=settings)
+        memory.start(engine=engine, probe_jitter=True, bypass_cache=True)
+        streamed = Pll(settings=none_settings)
+        streamed.start(engine=engine, probe_jitter=True)
+
+        assert np.allclose(list(streamed.probe.summary().values()),
+                           list(memory.probe.summary().values()))
+        assert len(streamed.output) <= 4096
+        assert np.array_equal(streamed.output,
+                              np.asarray(memory.output)[-len(streamed.output):])
+        assert np.isclose(streamed.time_array[-1], memory.time_array[-1])
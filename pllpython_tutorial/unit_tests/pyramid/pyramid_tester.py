@@ -0,0 +1,118 @@
+"""Trace Pyramid Unit Test Suite
+
+This module contains the unit tests for the min/max pyramids written next to
+the traces and for `PyramidView`, the Bokeh server view of `Pll.show`.
+
+Tests:
+    - `test_windows`: Checks that a streamed pyramid equals one built in
+      memory, and that windows keep the budget and the extremes at every zoom.
+    - `test_disk_view`: Checks that a disk mode run maps its pyramids and that
+      the view redraws the visible range when zooming.
+    - `test_show_imports`: Checks that `Pll.show` only imports the plotting
+      library of the requested plot type.
+"""
+
+import copy
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from bokeh.document import Document
+from bokeh.events import RangesUpdate
+from pllpython.components.pll import Pll
+from pllpython.utils.pyramid import TracePyramid, load_pyramids
+from pllpython.utils.settings import Settings
+from pllpython.utils.viewer import PyramidView
+from pllpython.utils.writer import TraceWriter
+
+settings = Settings(name='Pyramid_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=2e-6, time_step=settings.time_step)
+
+
+def test_windows():
+    """
+    Streams a noisy trace in uneven chunks.
+
+    Asserts:
+        Both pyramids have the same levels, and every window keeps at most
+        `points` points with the minimum and the maximum of its samples.
+    """
+    rng = np.random.default_rng(2)
+    trace = rng.normal(size=1_000_003)
+    path = os.path.join(tempfile.mkdtemp(), 'pyramid.json')
+    with TraceWriter(path, {'trace': float}, pyramid=('trace',)) as writer:
+        for start in range(0, len(trace), 40_001):
+            writer.write({'trace': trace[start:start + 40_001]})
+    pyramid = load_pyramids(path)['trace']
+    reference = TracePyramid.from_array(trace)
+    assert len(pyramid.levels) == len(reference.levels)
+    for level, expected in zip(pyramid.levels, reference.levels):
+        assert np.array_equal(level, expected)
+
+    for start, stop in ((0, len(trace)), (4_321, 912_345), (77_000, 90_000), (10, 500)):
+        indices, values = pyramid.window(start, stop, 1000)
+        assert len(indices) <= 1000
+        assert values.min() <= trace[start:stop].min()
+        assert values.max() >= trace[start:stop].max()
+    indices, values = pyramid.window(10, 500, 1000)
+    assert np.array_equal(indices, np.arange(10, 500))
+    assert np.array_equal(values, trace[10:500])
+
+
+def test_disk_view():
+    """
+    Runs a PLL in disk mode and zooms its view into one microsecond.
+
+    Asserts:
+        The pyramids are memory-mapped from the run files and the plots only
+        hold the points of the visible range.
+    """
+    disk_settings = copy.deepcopy(settings)
+    disk_settings.storage['mode'] = 'disk'
+    pll = Pll(settings=disk_settings)
+    pll.start_and_monitor(save=False, progress=False, bypass_cache=True)
+    pyramids = pll._pyramids()
+    assert list(pyramids) == ['clk', 'div', 'lpd_a', 'lpd_b', 'lf', 'vco']
+    assert isinstance(pyramids['vco'].levels[0], np.memmap)
+
+    view = PyramidView(pyramids, time_step=settings.time_step, points=500)
+    doc = Document()
+    view.make_document(doc)
+    plot = doc.roots[0].children[0][0]
+    source = plot.renderers[0].data_source
+    assert len(source.data['x']) <= 500
+    plot._trigger_event(RangesUpdate(plot, x0=1e-6, x1=1.001e-6))
+    assert len(source.data['x']) <= 500
+    assert source.data['x'].min() >= 1e-6 - 1e-9
+    assert source.data['x'].max() <= 1.001e-6 + 1e-9
+
+
+PROBE = """
+import sys, json, tempfile
+from unittest import mock
+from pllpython.components.pll import Pll
+from pllpython.utils.settings import Settings
+from pllpython.utils.viewer import PyramidView
+settings = Settings(name='Pyramid_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=1e-7, time_step=settings.time_step)
+pll = Pll(settings=settings)
+pll.start_and_monitor(save=False, progress=False, bypass_cache=True)
+with mock.patch.object(PyramidView, 'serve'):
+    pll.show(plot_type='server')
+print(json.dumps([name for name in ('matplotlib', 'bokeh') if name in sys.modules]))
+"""
+
+
+def test_show_imports():
+    """
+    Shows a run with the server view, without starting the server, in a fresh
+    interpreter.
+
+    Asserts:
+        Neither matplotlib nor Bokeh is imported.
+    """
+    output = subprocess.run([sys.executable, '-c', PROBE], check=True,
+                            capture_output=True, text=True).stdout
+    assert json.loads(output.splitlines()[-1]) == []
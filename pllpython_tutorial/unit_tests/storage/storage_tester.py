@@ -0,0 +1,74 @@
+"""Disk Storage Unit Test Suite
+
+This module contains the unit tests for the disk-backed traces enabled by
+`settings.storage['mode'] = 'disk'`.
+
+Tests:
+    - `test_disk_matches_memory`: Checks that python and fused runs stored on
+      disk give the same traces as in memory, as memory-mapped arrays.
+    - `test_chunked_tools`: Checks that `mse` and `calculate_jitter` give the
+      same results on memory-mapped traces.
+"""
+
+import copy
+import tempfile
+import numpy as np
+from pllpython.components.pll import Pll
+from pllpython.utils.calculator import Calculator
+from pllpython.utils.comparators import mse
+from pllpython.utils.settings import Settings
+
+settings = Settings(name='Storage_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=1e-6, time_step=settings.time_step)
+settings.set_clk_parameter(
+    parameter='white_phase_noise_spectral_density', value=0)
+disk_settings = copy.deepcopy(settings)
+disk_settings.storage['mode'] = 'disk'
+disk_settings.storage['chunk'] = 4096
+
+
+def test_disk_matches_memory():
+    """
+    Runs and extends the same PLL in memory and on disk.
+
+    Asserts:
+        The disk-backed traces are memory-mapped and equal to the in-memory
+        ones, including the time array of the extended run.
+    """
+    for engine in ('python', 'fused'):
+        memory = Pll(settings=settings)
+        memory.start_and_monitor(engine=engine, save=False, progress=False)
+        disk = Pll(settings=disk_settings)
+        disk.start_and_monitor(engine=engine, save=False, progress=False)
+
+        assert isinstance(disk.output.view(), np.memmap)
+        assert np.array_equal(disk.output, memory.output)
+        assert np.array_equal(disk.components['lpd'].io['output_a'],
+                              memory.components['lpd'].io['output_a'])
+        assert np.array_equal(disk.components['lf'].io['output'],
+                              memory.components['lf'].io['output'])
+
+        memory.extend(extra_samples=10_000, engine=engine)
+        disk.extend(extra_samples=10_000, engine=engine)
+        assert np.array_equal(disk.output, memory.output)
+        assert np.allclose(disk.time_array, memory.time_array)
+
+
+def test_chunked_tools():
+    """
+    Compares the jitter and the MSE of in-memory and memory-mapped traces.
+
+    Asserts:
+        Both give the same values.
+    """
+    memory = Pll(settings=settings)
+    memory.start(engine='fused')
+    disk = Pll(settings=disk_settings)
+    disk.start(engine='fused')
+    calculator = Calculator(settings=settings)
+
+    assert calculator.calculate_jitter(disk.output, plot=False) == \
+        calculator.calculate_jitter(np.array(memory.output), plot=False)
+    lf_memory = np.array(memory.components['lf'].io['output'])
+    lf_disk = disk.components['lf'].io['output'].view()
+    assert mse(lf_disk, lf_memory + 1) == mse(lf_memory, lf_memory + 1)
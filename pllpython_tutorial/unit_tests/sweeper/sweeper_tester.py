@@ -0,0 +1,39 @@
+"""Sweeper Unit Test Suite
+
+This module contains the unit tests for the `Sweeper` class.
+
+Tests:
+    - `test_parallel_grid`: Checks that a headless grid sweep over a process
+      pool returns the same metrics as the serial sweep.
+"""
+
+import tempfile
+from pllpython.components.pll import Pll
+from pllpython.utils.settings import Settings
+from pllpython.utils.sweeper import Sweeper
+
+settings = Settings(name='Sweeper_Tester', log_path=tempfile.gettempdir())
+settings.update_from_file(setting_file_path='./unit_tests/ut_sett.json')
+settings.set_time(sim_time=5e-7, time_step=settings.time_step)
+
+
+def test_parallel_grid():
+    """
+    Sweeps a 2 x 2 grid of LF and VCO parameters serially and with 2 workers.
+
+    Asserts:
+        Both sweeps return one row per grid point, in the same order and with
+        the same metrics, and no traces are saved.
+    """
+    grid = {('lf', 'R'): [6400, 8400], ('vco', 'k_vco'): [1e9, 2e9]}
+    sweeper = Sweeper(pll=Pll(settings=settings), id=0)
+    serial = sweeper.start_grid(grid=grid, headless=True, engine='fused')
+    parallel = sweeper.start_grid(grid=grid, workers=2, headless=True,
+                                  engine='fused')
+
+    assert len(serial) == 4
+    assert [row['lf.R'] for row in serial] == [6400, 6400, 8400, 8400]
+    for serial_row, parallel_row in zip(serial, parallel):
+        assert serial_row['lf_final'] == parallel_row['lf_final']
+        assert serial_row['lock_time'] == parallel_row['lock_time']
+        assert parallel_row['io_file'] is None
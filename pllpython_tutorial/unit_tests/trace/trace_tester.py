@@ -0,0 +1,76 @@
+"""Trace Buffer Unit Test Suite
+
+This module contains the unit tests for the `TraceBuffer` class.
+
+Tests:
+    - `test_ring_buffer`: Checks that a ring buffer keeps the last samples in
+      chronological order, like a deque with a `maxlen`.
+    - `test_growing_buffer`: Checks that a non-ring buffer grows and that
+      `from_array` does not copy its input.
+    - `test_wrapped_array`: Checks that writing to a buffer made by
+      `from_array` never modifies the wrapped array.
+"""
+
+import numpy as np
+from pllpython.utils.trace import TraceBuffer
+
+
+def test_ring_buffer():
+    """
+    Appends more samples than the capacity of a ring buffer.
+
+    Asserts:
+        The buffer holds the last `capacity` samples in order, rotated in
+        place.
+    """
+    buffer = TraceBuffer(4, dtype=np.uint8, ring=True)
+    for value in range(10):
+        buffer.append(value % 2)
+    buffer.extend([1, 1])
+    assert len(buffer) == 4
+    assert buffer.view().dtype == np.uint8
+    assert list(buffer) == [0, 1, 1, 1]
+
+    # The rotation keeps the storage instead of copying it.
+    buffer = TraceBuffer(1000, ring=True)
+    buffer.extend(np.arange(700.0))
+    buffer.extend(np.arange(700.0, 1300.0))
+    storage = buffer._data  # pylint: disable=W0212
+    assert np.array_equal(buffer.view(), np.arange(300.0, 1300.0))
+    assert buffer.view() is storage
+
+
+def test_growing_buffer():
+    """
+    Appends more samples than the capacity of a non-ring buffer.
+
+    Asserts:
+        Every sample is kept and wrapped arrays share memory with the buffer.
+    """
+    buffer = TraceBuffer(2)
+    buffer.extend(np.arange(5.0))
+    buffer.append(5.0)
+    assert np.array_equal(buffer.view(), np.arange(6.0))
+
+    array = np.arange(3.0)
+    assert np.shares_memory(TraceBuffer.from_array(array).view(), array)
+
+
+def test_wrapped_array():
+    """
+    Appends to, rolls over and clears buffers wrapping an array.
+
+    Asserts:
+        The wrapped array keeps its values and the buffers hold the new ones.
+    """
+    for ring in (False, True):
+        array = np.arange(4.0)
+        buffer = TraceBuffer.from_array(array, ring=ring)
+        buffer.append(99.0)
+        assert np.array_equal(array, np.arange(4.0))
+        assert buffer[-1] == 99.0
+        buffer = TraceBuffer.from_array(array, ring=ring)
+        buffer.clear()
+        buffer.append(7.0)
+        assert np.array_equal(array, np.arange(4.0))
+        assert list(buffer) == [7.0]
@@ -9,6 +9,7 @@ the input, target, and output signals using the `Scope` class, which can generat
 Tests:
     - `test_sine_1ghz`: Tests a 1 GHz sine wave input and compares the output against a reference sine wave.
     - `test_clk`: Tests a DC signal input and verifies that the frequency remains stable.
+    - `test_noisy_start`: Checks that `start` matches the per-sample `_process` loop with phase noise enabled.
     - `test_show`: Displays the results using the `Scope` class and saves the plot as an HTML file or image.
 """
 
@@ -96,6 +97,37 @@ def test_clk():
     assert mse_out > 97
 
 
+def test_noisy_start():
+    """
+    Compares `start` with the per-sample `_process` loop under phase noise.
+
+    Both paths are seeded identically, with white, low-frequency and flicker
+    phase noise, for a noisy VCO driven by a varying control voltage and for the CLK.
+
+    Asserts:
+        The outputs and the final states, including the position of the noise
+        sources, are identical.
+    """
+    noisy = Settings(name='VCO_Tester')
+    noisy.set_vco_parameter(parameter='white_phase_noise_spectral_density', value=1e-10)
+    noisy.set_vco_parameter(parameter='low_frequency_phase_noise', value=1e-12)
+    noisy.set_vco_parameter(parameter='flicker_corner', value=1e7)
+    control = 0.5 + 0.2 * np.sin(np.arange(20000) / 500)
+    for clk, inputs in ((False, control), (True, np.ones(20000))):
+        reference = Vco(settings=noisy, clk=clk)
+        dut = Vco(settings=noisy, clk=clk)
+
+        reference.seed(3)
+        dut.seed(3)
+        expected = np.array([reference._process(input_a=value)  # pylint: disable=W0212
+                             for value in inputs])
+        dut.start(input_array=inputs)
+
+        assert np.array_equal(dut.io['output'], expected)
+        for key, value in reference.get_state().items():
+            assert np.array_equal(dut.get_state()[key], value), key
+
+
 def test_show():
     """
     Displays the results of the tests using the `Scope` class and optionally saves the plot.
@@ -0,0 +1,93 @@
+"""Trace Writer Unit Test Suite
+
+This module contains the unit tests for the `TraceWriter` class and for the
+traces saved by `Pll.start_and_monitor`.
+
+Tests:
+    - `test_streamed_traces`: Checks that the traces streamed during python and
+      fused runs match the monitored io of the components.
+    - `test_csv_export`: Checks that the CSV export and the CSV format write the
+      headers on their own line followed by every sample.
+    - `test_save_io_names`: Checks that `save_io` names the nodes like the
+      traces streamed by `Pll`.
+"""
+
+import copy
+import os
+import tempfile
+import numpy as np
+from pllpython.components import pll as pll_module
+from pllpython.components.pll import Pll
+from pllpython.utils.settings import Settings
+from pllpython.utils.logger import save_io
+from pllpython.utils.writer import export_csv, load_traces, TRACE_HEADERS
+
+settings = Settings(name='Writer_Tester', log_path=tempfile.mkdtemp())
+settings.set_time(sim_time=2e-6, time_step=settings.time_step)
+
+
+def test_streamed_traces():
+    """
+    Saves python and fused runs spanning several write chunks.
+
+    Asserts:
+        The node files hold every sample of the component io, and the time
+        node matches the time step.
+    """
+    chunk = pll_module.WRITE_CHUNK
+    pll_module.WRITE_CHUNK = 4096
+    try:
+        for engine in ('python', 'fused'):
+            pll = Pll(settings=settings)
+            pll.start_and_monitor(engine=engine, progress=False)
+            traces = load_traces(pll.io_file)
+            assert np.array_equal(traces['vco'], pll.components['vco'].io['output'])
+            assert np.array_equal(traces['lpd_a'], pll.components['lpd'].io['output_a'])
+            assert np.array_equal(traces['lf'], pll.components['lf'].io['output'])
+            assert len(traces['time']) == settings.sample_count
+            assert np.allclose(np.diff(traces['time']), settings.time_step)
+    finally:
+        pll_module.WRITE_CHUNK = chunk
+
+
+def test_csv_export():
+    """
+    Exports a saved run to CSV, and saves another run in the CSV format.
+
+    Asserts:
+        Both files start with the headers followed by one row per sample.
+    """
+    pll = Pll(settings=settings)
+    pll.start_and_monitor(engine='fused', progress=False)
+    csv_settings = copy.deepcopy(settings)
+    csv_settings.log['format'] = 'csv'
+    csv_pll = Pll(settings=csv_settings)
+    csv_pll.start_and_monitor(engine='fused', progress=False)
+    assert csv_pll.io_file.endswith('.csv')
+
+    for csv_file, run in ((export_csv(pll.io_file), pll), (csv_pll.io_file, csv_pll)):
+        with open(csv_file, 'r', encoding='utf-8') as file:
+            header = file.readline()
+        assert header.strip().split(',')[0] == 'Time'
+        rows = np.loadtxt(csv_file, delimiter=',', skiprows=1)
+        assert rows.shape == (settings.sample_count, 7)
+        assert np.array_equal(rows[:, 6], run.components['vco'].io['output'])
+
+
+def test_save_io_names():
+    """
+    Saves the traces of a streamed run again with `save_io`.
+
+    Asserts:
+        Both sidecars have the same node names and the same samples.
+    """
+    pll = Pll(settings=settings)
+    pll.start_and_monitor(engine='fused', progress=False)
+    streamed = load_traces(pll.io_file)
+    path = os.path.join(tempfile.mkdtemp(), 'saved.json')
+    save_io(io_arrays=list(streamed.values()), headers=list(TRACE_HEADERS.values()),
+            io_file=path)
+    saved = load_traces(path)
+    assert list(saved) == list(streamed) == list(TRACE_HEADERS)
+    for name, values in streamed.items():
+        assert np.array_equal(saved[name], values)
@@ -1,8 +1,16 @@
+import os
+import re
 from setuptools import setup, find_packages
 
+# The version is only written in pllpython/__init__.py, which the result cache
+# also reads.
+with open(os.path.join(os.path.dirname(__file__), 'pllpython', '__init__.py'),
+          encoding='utf-8') as init_file:
+    VERSION = re.search(r"^__version__ = '([^']+)'", init_file.read(), re.M).group(1)
+
 setup(
     name='pllpython',
-    version='0.0.9',
+    version=VERSION,
     packages=find_packages(),
     install_requires=['bokeh == 3.6.3',
                       'cmake == 3.31.6',
@@ -38,6 +46,7 @@ setup(
                       'wheel == 0.45.1',
                       'xyzservices == 2025.1.0'
                       ],
+    extras_require={'fast': ['numba']},
     entry_points={
         'console_scripts': [
             'pllpython_tutorial=pllpython.utils.tutorial:install_tutorial',